@@ -0,0 +1,95 @@
+import os
+from dataclasses import dataclass, asdict
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":"))
+
+
+@dataclass(frozen=True)
+class DatabaseProfile:
+    pool_size: int
+    max_overflow: int
+    pool_recycle: int
+    pool_timeout: int
+    pool_pre_ping: bool
+    sqlite_journal_mode: str
+    sqlite_synchronous: str
+    sqlite_mmap_size: int
+    sqlite_cache_size: int
+    sqlite_busy_timeout: int
+    sqlite_foreign_keys: bool
+
+    @classmethod
+    def from_env(cls) -> "DatabaseProfile":
+        return cls(
+            pool_size=_env_int("DB_POOL_SIZE", 5),
+            max_overflow=_env_int("DB_MAX_OVERFLOW", 10),
+            pool_recycle=_env_int("DB_POOL_RECYCLE", 1800),
+            pool_timeout=_env_int("DB_POOL_TIMEOUT", 30),
+            pool_pre_ping=_env_bool("DB_POOL_PRE_PING", True),
+            sqlite_journal_mode=os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+            sqlite_synchronous=os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+            sqlite_mmap_size=_env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024),
+            sqlite_cache_size=_env_int("SQLITE_CACHE_SIZE", -64000),
+            sqlite_busy_timeout=_env_int("SQLITE_BUSY_TIMEOUT", 5000),
+            sqlite_foreign_keys=_env_bool("SQLITE_FOREIGN_KEYS", False),
+        )
+
+    def engine_kwargs(self, url: str) -> dict:
+        # In-memory SQLite uses a single shared connection, not a sized pool.
+        if _is_memory_sqlite(url):
+            return {}
+        return {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_recycle": self.pool_recycle,
+            "pool_timeout": self.pool_timeout,
+            "pool_pre_ping": self.pool_pre_ping,
+        }
+
+    def sqlite_pragmas(self) -> list[str]:
+        return [
+            f"PRAGMA journal_mode={self.sqlite_journal_mode}",
+            f"PRAGMA synchronous={self.sqlite_synchronous}",
+            f"PRAGMA mmap_size={self.sqlite_mmap_size}",
+            f"PRAGMA cache_size={self.sqlite_cache_size}",
+            f"PRAGMA busy_timeout={self.sqlite_busy_timeout}",
+            f"PRAGMA foreign_keys={'ON' if self.sqlite_foreign_keys else 'OFF'}",
+        ]
+
+    def apply(self, engine: Engine):
+        if engine.dialect.name != "sqlite":
+            return
+
+        pragmas = self.sqlite_pragmas()
+
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+    def describe(self) -> dict:
+        return asdict(self)
+
+
+def pool_status(engine: Engine) -> dict:
+    pool = engine.pool
+    status = {"class": type(pool).__name__, "status": pool.status()}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            status[name] = method()
+    return status
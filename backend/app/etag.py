@@ -0,0 +1,29 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+ETAG_HEADER = "ETag"
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return etag in candidates
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    response.headers[ETAG_HEADER] = etag
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={ETAG_HEADER: etag})
+    return None
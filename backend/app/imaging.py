@@ -0,0 +1,85 @@
+import hashlib
+import os
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+# Longest edge, in pixels, of each derivative image type.
+DERIVATIVE_SIZES = {
+    "thumbnail": 256,
+    "flashcard": 1024,
+}
+
+FORMAT_EXTENSIONS = {
+    "WEBP": ".webp",
+    "JPEG": ".jpg",
+}
+
+FORMAT_MEDIA_TYPES = {
+    "WEBP": "image/webp",
+    "JPEG": "image/jpeg",
+}
+
+
+def available() -> bool:
+    return Image is not None
+
+
+def output_format(preferred: str = "WEBP") -> str:
+    preferred = preferred.upper()
+    if preferred == "WEBP" and not features.check("webp"):
+        return "JPEG"
+    return preferred
+
+
+# Runs in a worker process: decodes the source once, then writes a
+# downscaled copy per image type into output_dir as <stem>-<type><ext>.
+# Returns (image_type, file name, media type, sha256, size) for each copy.
+# Images are never upscaled.
+def render_derivatives(
+    source_path: str,
+    output_dir: str,
+    stem: str,
+    image_types: tuple[str, ...],
+    image_format: str = "WEBP",
+    quality: int = 80
+) -> list[tuple[str, str, str, str, int]]:
+    image_format = output_format(image_format)
+    largest = max(DERIVATIVE_SIZES[image_type] for image_type in image_types)
+    os.makedirs(output_dir, exist_ok=True)
+
+    with Image.open(source_path) as source:
+        # Lets the JPEG decoder skip straight to a reduced scale for large photos.
+        source.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(source)
+        has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+        if image_format == "JPEG" or not has_alpha:
+            image = _flatten(image)
+        elif image.mode != "RGBA":
+            image = image.convert("RGBA")
+
+        rendered = []
+        for image_type in sorted(image_types, key=lambda t: DERIVATIVE_SIZES[t], reverse=True):
+            size = DERIVATIVE_SIZES[image_type]
+            # Largest first, so each smaller size is resized from the previous one.
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+            file_name = f"{stem}-{image_type}{FORMAT_EXTENSIONS[image_format]}"
+            path = os.path.join(output_dir, file_name)
+            image.save(path, image_format, quality=quality, optimize=True)
+            with open(path, "rb") as f:
+                sha256 = hashlib.sha256(f.read()).hexdigest()
+            rendered.append((image_type, file_name, FORMAT_MEDIA_TYPES[image_format], sha256, os.path.getsize(path)))
+    return rendered
+
+
+def _flatten(image: "Image.Image") -> "Image.Image":
+    if image.mode == "RGB":
+        return image
+    if image.mode in ("RGBA", "LA", "P"):
+        rgba = image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return image.convert("RGB")
@@ -0,0 +1,14 @@
+from sqlalchemy.orm import selectinload
+
+from app.models import Object, ObjectImage
+
+# Loader options for each response shape, so serializing a model never falls
+# back to lazy loading one relationship per row.
+
+OBJECT_WITH_IMAGES = (
+    selectinload(Object.images).selectinload(ObjectImage.bounding_boxes),
+)
+
+IMAGE_WITH_BOXES = (
+    selectinload(ObjectImage.bounding_boxes),
+)
@@ -1,56 +1,40 @@
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from sqlalchemy import text, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import engine, Base
-from app.routers import players_router, objects_router, game_router, progress_router, auth_router
-from app.services import cloudinary_service
-
-Base.metadata.create_all(bind=engine)
+from app.database import engine, async_engine, get_db, DATABASE_MODE, database_profile
+from app.database_profile import pool_status
+from app.migrations import run_migrations
+from app.etag import ETAG_HEADER
+from app.pagination import NEXT_CURSOR_HEADER
+from app.static_files import CachedStaticFiles
+from app.routers import (
+    players_router, objects_router, game_router, game_stream_router, progress_router, auth_router
+)
+from app.services import FakeCloudinaryService, cloudinary_service, score_cache, upload_pipeline
 
-if cloudinary_service.configure_from_env():
+if isinstance(upload_pipeline.storage, FakeCloudinaryService):
+    print("Using fake Cloudinary - image uploads will be stored under the fake-cloudinary upload folder")
+elif cloudinary_service.configure_from_env():
     print("Cloudinary configured successfully")
 else:
     print("Cloudinary not configured - image uploads will use local storage")
-def run_migrations():
-    inspector = inspect(engine)
-    
-    if 'object_images' in inspector.get_table_names():
-        columns = [col['name'] for col in inspector.get_columns('object_images')]
-        if 'image_type' not in columns:
-            with engine.connect() as conn:
-                conn.execute(text("ALTER TABLE object_images ADD COLUMN image_type VARCHAR(20) DEFAULT 'flashcard'"))
-                conn.commit()
-                print("Migration: Added image_type column to object_images table")
-    
-    if 'players' in inspector.get_table_names():
-        columns = [col['name'] for col in inspector.get_columns('players')]
-        with engine.connect() as conn:
-            if 'apple_user_id' not in columns:
-                conn.execute(text("ALTER TABLE players ADD COLUMN apple_user_id VARCHAR"))
-                conn.commit()
-                print("Migration: Added apple_user_id column to players table")
-            if 'device_id' not in columns:
-                conn.execute(text("ALTER TABLE players ADD COLUMN device_id VARCHAR"))
-                conn.commit()
-                print("Migration: Added device_id column to players table")
-            if 'email' not in columns:
-                conn.execute(text("ALTER TABLE players ADD COLUMN email VARCHAR"))
-                conn.commit()
-                print("Migration: Added email column to players table")
-            if 'is_guest' not in columns:
-                conn.execute(text("ALTER TABLE players ADD COLUMN is_guest VARCHAR DEFAULT 'false'"))
-                conn.commit()
-                print("Migration: Added is_guest column to players table")
-
-run_migrations()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    run_migrations(engine)
+    yield
+    await upload_pipeline.close()
+
 
 app = FastAPI(
     title="SpeakEasy API",
     description="Backend API for SpeakEasy - Teaching non-verbal autistic children to speak and recognize objects",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -59,15 +43,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER],
 )
 
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+app.mount("/uploads", CachedStaticFiles(directory=UPLOAD_DIR), name="uploads")
 
 app.include_router(players_router)
 app.include_router(objects_router)
 app.include_router(game_router)
+app.include_router(game_stream_router)
 app.include_router(progress_router)
 app.include_router(auth_router)
 
@@ -87,3 +73,27 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/database")
+def database_health():
+    pools = {"sync": pool_status(engine)}
+    if async_engine is not None:
+        pools["async"] = pool_status(async_engine.sync_engine)
+    
+    return {
+        "mode": DATABASE_MODE,
+        "dialect": engine.dialect.name,
+        "profile": database_profile.describe(),
+        "pools": pools
+    }
+
+
+@app.get("/health/scoring-cache")
+def scoring_cache_health():
+    return score_cache.stats()
+
+
+@app.get("/health/uploads")
+async def upload_pipeline_health(db: AsyncSession = Depends(get_db)):
+    return await upload_pipeline.stats(db)
@@ -0,0 +1,253 @@
+import argparse
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterator
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+
+import app.models  # noqa: F401
+from app.database import Base, engine
+
+metadata = MetaData()
+
+schema_version = Table(
+    "schema_version",
+    metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    statements: Callable[[Connection], list[str]]
+
+
+def _missing_columns(conn: Connection, table: str, columns: dict[str, str]) -> list[str]:
+    inspector = inspect(conn)
+    if table not in inspector.get_table_names():
+        return []
+    existing = {col["name"] for col in inspector.get_columns(table)}
+    return [
+        f"ALTER TABLE {table} ADD COLUMN {name} {definition}"
+        for name, definition in columns.items()
+        if name not in existing
+    ]
+
+
+def _legacy_columns(conn: Connection) -> list[str]:
+    return _missing_columns(conn, "object_images", {
+        "image_type": "VARCHAR(20) DEFAULT 'flashcard'",
+    }) + _missing_columns(conn, "players", {
+        "apple_user_id": "VARCHAR",
+        "device_id": "VARCHAR",
+        "email": "VARCHAR",
+        "is_guest": "VARCHAR DEFAULT 'false'",
+    })
+
+
+def _hot_path_indexes(conn: Connection) -> list[str]:
+    return [
+        "CREATE INDEX IF NOT EXISTS ix_attempt_history_player_created "
+        "ON attempt_history (player_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_object_images_object_type "
+        "ON object_images (object_id, image_type)",
+        "CREATE INDEX IF NOT EXISTS ix_bounding_boxes_object_image "
+        "ON bounding_boxes (object_image_id)",
+    ]
+
+
+def _unique_progress_pair(conn: Connection) -> list[str]:
+    # Keep only the most recently updated row of any duplicated pair before
+    # the unique index can be created.
+    return [
+        "DELETE FROM player_progress WHERE id NOT IN ("
+        "SELECT id FROM ("
+        "SELECT id, ROW_NUMBER() OVER ("
+        "PARTITION BY player_id, object_id ORDER BY updated_at DESC, id DESC"
+        ") AS row_rank FROM player_progress"
+        ") ranked WHERE row_rank = 1)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_player_progress_player_object "
+        "ON player_progress (player_id, object_id)",
+    ]
+
+
+def _review_schedule(conn: Connection) -> list[str]:
+    statements = _missing_columns(conn, "player_progress", {
+        "ease_factor": "FLOAT NOT NULL DEFAULT 2.5",
+        "interval_days": "INTEGER NOT NULL DEFAULT 0",
+        "repetitions": "INTEGER NOT NULL DEFAULT 0",
+        "next_due_at": "TIMESTAMP",
+    })
+    if not inspect(conn).has_table("player_progress"):
+        return statements
+    # Rows recorded before scheduling existed become due from their last practice.
+    return statements + [
+        "UPDATE player_progress SET next_due_at = updated_at WHERE next_due_at IS NULL",
+        "CREATE INDEX IF NOT EXISTS ix_player_progress_player_due "
+        "ON player_progress (player_id, next_due_at)",
+    ]
+
+
+def _learned_at(conn: Connection) -> list[str]:
+    statements = _missing_columns(conn, "player_progress", {"learned_at": "TIMESTAMP"})
+    if not statements:
+        return []
+    return statements + [
+        "UPDATE player_progress SET learned_at = updated_at WHERE is_learned AND learned_at IS NULL",
+    ]
+
+
+def _learned_count(conn: Connection) -> list[str]:
+    statements = _missing_columns(conn, "players", {"learned_count": "INTEGER NOT NULL DEFAULT 0"})
+    if not statements or not inspect(conn).has_table("player_progress"):
+        return statements
+    return statements + [
+        "UPDATE players SET learned_count = ("
+        "SELECT COUNT(*) FROM player_progress "
+        "WHERE player_progress.player_id = players.id AND player_progress.is_learned)",
+    ]
+
+
+def _progress_version(conn: Connection) -> list[str]:
+    return _missing_columns(conn, "players", {"progress_version": "INTEGER NOT NULL DEFAULT 0"})
+
+
+def _image_derivatives(conn: Connection) -> list[str]:
+    if not inspect(conn).has_table("object_images"):
+        return []
+    return _missing_columns(conn, "object_images", {"source_image_id": "VARCHAR"}) + [
+        "CREATE INDEX IF NOT EXISTS ix_object_images_source "
+        "ON object_images (source_image_id)",
+    ]
+
+
+def _image_blobs(conn: Connection) -> list[str]:
+    if not inspect(conn).has_table("object_images"):
+        return []
+    return _missing_columns(conn, "object_images", {"blob_sha256": "VARCHAR(64)"}) + [
+        "CREATE INDEX IF NOT EXISTS ix_object_images_blob "
+        "ON object_images (blob_sha256)",
+    ]
+
+
+def _client_attempt_ids(conn: Connection) -> list[str]:
+    if not inspect(conn).has_table("attempt_history"):
+        return []
+    return _missing_columns(conn, "attempt_history", {"client_attempt_id": "VARCHAR(64)"}) + [
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_attempt_history_player_client "
+        "ON attempt_history (player_id, client_attempt_id)",
+    ]
+
+
+def _legacy_urls(conn: Connection) -> list[str]:
+    if not inspect(conn).has_table("object_images"):
+        return []
+    return _missing_columns(conn, "object_images", {"legacy_url": "VARCHAR"}) + [
+        "CREATE INDEX IF NOT EXISTS ix_object_images_legacy_url "
+        "ON object_images (legacy_url)",
+    ]
+
+
+MIGRATIONS = [
+    Migration(1, "Add image_type and sign-in columns", _legacy_columns),
+    Migration(2, "Add hot-path indexes for history, images and bounding boxes", _hot_path_indexes),
+    Migration(3, "Add unique constraint on player_progress (player_id, object_id)", _unique_progress_pair),
+    Migration(4, "Add spaced-repetition schedule to player_progress", _review_schedule),
+    Migration(5, "Add learned_at to player_progress", _learned_at),
+    Migration(6, "Add learned_count counter to players", _learned_count),
+    Migration(7, "Add progress_version to players", _progress_version),
+    Migration(8, "Add source_image_id to object_images for derivatives", _image_derivatives),
+    Migration(9, "Add blob_sha256 to object_images for the content-addressed store", _image_blobs),
+    Migration(10, "Add client_attempt_id to attempt_history for idempotent batches", _client_attempt_ids),
+    Migration(11, "Add legacy_url to object_images so adopted uploads keep their old URLs", _legacy_urls),
+]
+
+
+def applied_versions(conn: Connection) -> set[int]:
+    if not inspect(conn).has_table(schema_version.name):
+        return set()
+    return set(conn.execute(select(schema_version.c.version)).scalars())
+
+
+# Arbitrary, but fixed: every process migrating the same Postgres database
+# takes this advisory lock.
+MIGRATION_LOCK_KEY = 0x5EA5E
+
+
+# Each API worker runs the migrations at start-up. The whole runner is one
+# transaction holding a lock, so concurrent workers wait for the first one
+# and then find nothing pending: an advisory lock released at commit on
+# Postgres, an exclusive transaction on SQLite (waiting up to busy_timeout).
+@contextmanager
+def migration_lock(engine: Engine) -> Iterator[Connection]:
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            conn.exec_driver_sql("BEGIN EXCLUSIVE")
+            yield conn
+            conn.commit()
+        return
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        yield conn
+
+
+def run_migrations(engine: Engine, dry_run: bool = False) -> list[Migration]:
+    if dry_run:
+        with engine.connect() as conn:
+            return _apply_migrations(conn, dry_run=True)
+
+    with migration_lock(engine) as conn:
+        Base.metadata.create_all(bind=conn)
+        metadata.create_all(bind=conn)
+        return _apply_migrations(conn)
+
+
+def _apply_migrations(conn: Connection, dry_run: bool = False) -> list[Migration]:
+    applied = applied_versions(conn)
+    pending = [m for m in sorted(MIGRATIONS, key=lambda m: m.version) if m.version not in applied]
+
+    for migration in pending:
+        statements = migration.statements(conn)
+        if dry_run:
+            print(f"Migration {migration.version} (pending): {migration.description}")
+            for statement in statements:
+                print(f"    {statement}")
+            continue
+
+        for statement in statements:
+            conn.execute(text(statement))
+        conn.execute(insert(schema_version).values(
+            version=migration.version,
+            description=migration.description,
+            applied_at=datetime.utcnow()
+        ))
+        print(f"Migration {migration.version}: {migration.description}")
+
+    return pending
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending SpeakEasy schema migrations")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print pending migrations and their SQL without applying them"
+    )
+
+    args = parser.parse_args()
+
+    pending = run_migrations(engine, dry_run=args.dry_run)
+    if not pending:
+        print("Schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
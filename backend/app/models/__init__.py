@@ -2,5 +2,8 @@ from app.models.player import Player
 from app.models.object import Object, ObjectImage, BoundingBox
 from app.models.attempt import AttemptHistory
 from app.models.progress import PlayerProgress
+from app.models.stats import PlayerStatistics
+from app.models.blob import StoredBlob
+from app.models.upload import UploadJobRecord
 
-__all__ = ["Player", "Object", "ObjectImage", "BoundingBox", "AttemptHistory", "PlayerProgress"]
+__all__ = ["Player", "Object", "ObjectImage", "BoundingBox", "AttemptHistory", "PlayerProgress", "PlayerStatistics", "StoredBlob", "UploadJobRecord"]
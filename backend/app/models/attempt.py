@@ -1,12 +1,16 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Integer, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Integer, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
 class AttemptHistory(Base):
     __tablename__ = "attempt_history"
+    __table_args__ = (
+        Index("ix_attempt_history_player_created", "player_id", "created_at"),
+        Index("uq_attempt_history_player_client", "player_id", "client_attempt_id", unique=True),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     player_id = Column(String, ForeignKey("players.id"), nullable=False)
@@ -18,6 +22,7 @@ class AttemptHistory(Base):
     tap_y = Column(Float, nullable=True)
     is_correct = Column(Boolean, nullable=False, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    client_attempt_id = Column(String(64), nullable=True)
 
     player = relationship("Player", back_populates="attempts")
     object = relationship("Object", back_populates="attempts")
@@ -0,0 +1,38 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, event, update
+from app.database import Base
+from app.models.object import ObjectImage
+
+
+class StoredBlob(Base):
+    __tablename__ = "stored_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    path = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)
+    media_type = Column(String, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Reference counts follow ObjectImage rows in the same flush, so they stay
+# right however the row is inserted or deleted (directly, through an
+# object's cascade, or when derivatives are replaced).
+def _adjust_ref_count(connection, sha256: str, delta: int):
+    connection.execute(
+        update(StoredBlob)
+        .where(StoredBlob.sha256 == sha256)
+        .values(ref_count=StoredBlob.ref_count + delta)
+    )
+
+
+@event.listens_for(ObjectImage, "after_insert")
+def _retain_blob(mapper, connection, target: ObjectImage):
+    if target.blob_sha256:
+        _adjust_ref_count(connection, target.blob_sha256, 1)
+
+
+@event.listens_for(ObjectImage, "after_delete")
+def _release_blob(mapper, connection, target: ObjectImage):
+    if target.blob_sha256:
+        _adjust_ref_count(connection, target.blob_sha256, -1)
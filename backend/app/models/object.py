@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Enum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
 from app.database import Base
@@ -27,11 +27,24 @@ class Object(Base):
 
 class ObjectImage(Base):
     __tablename__ = "object_images"
+    __table_args__ = (
+        Index("ix_object_images_object_type", "object_id", "image_type"),
+        Index("ix_object_images_source", "source_image_id"),
+        Index("ix_object_images_blob", "blob_sha256"),
+        Index("ix_object_images_legacy_url", "legacy_url"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     object_id = Column(String, ForeignKey("objects.id"), nullable=False)
     image_url = Column(String, nullable=False)
     image_type = Column(String, nullable=False, default=ImageType.FLASHCARD.value)
+    # Set on resized copies generated from an uploaded original.
+    source_image_id = Column(String, ForeignKey("object_images.id"), nullable=True)
+    # Set when the file lives in the content-addressed upload store (StoredBlob).
+    blob_sha256 = Column(String(64), nullable=True)
+    # The /uploads URL an adopted legacy upload had before it moved into the
+    # store; requests for it are redirected to image_url.
+    legacy_url = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     object = relationship("Object", back_populates="images")
@@ -40,6 +53,9 @@ class ObjectImage(Base):
 
 class BoundingBox(Base):
     __tablename__ = "bounding_boxes"
+    __table_args__ = (
+        Index("ix_bounding_boxes_object_image", "object_image_id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     object_image_id = Column(String, ForeignKey("object_images.id"), nullable=False)
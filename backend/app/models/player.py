@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Integer
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -14,6 +14,8 @@ class Player(Base):
     device_id = Column(String, unique=True, nullable=True, index=True)
     email = Column(String, nullable=True)
     is_guest = Column(String, default="false")
+    learned_count = Column(Integer, nullable=False, default=0)
+    progress_version = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -1,12 +1,16 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Integer, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Integer, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
 class PlayerProgress(Base):
     __tablename__ = "player_progress"
+    __table_args__ = (
+        Index("uq_player_progress_player_object", "player_id", "object_id", unique=True),
+        Index("ix_player_progress_player_due", "player_id", "next_due_at"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     player_id = Column(String, ForeignKey("players.id"), nullable=False)
@@ -15,6 +19,11 @@ class PlayerProgress(Base):
     practice_count = Column(Integer, nullable=False, default=0)
     consecutive_failed_attempts = Column(Integer, nullable=False, default=0)
     is_learned = Column(Boolean, nullable=False, default=False)
+    ease_factor = Column(Float, nullable=False, default=2.5)
+    interval_days = Column(Integer, nullable=False, default=0)
+    repetitions = Column(Integer, nullable=False, default=0)
+    next_due_at = Column(DateTime, nullable=True)
+    learned_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
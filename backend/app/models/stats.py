@@ -0,0 +1,28 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer
+from app.database import Base
+
+
+class PlayerStatistics(Base):
+    __tablename__ = "player_stats"
+
+    player_id = Column(String, ForeignKey("players.id"), primary_key=True)
+    say_word_attempts = Column(Integer, nullable=False, default=0)
+    say_word_correct = Column(Integer, nullable=False, default=0)
+    say_word_score_total = Column(Integer, nullable=False, default=0)
+    find_object_attempts = Column(Integer, nullable=False, default=0)
+    find_object_correct = Column(Integer, nullable=False, default=0)
+    find_object_score_total = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def total_attempts(self) -> int:
+        return self.say_word_attempts + self.find_object_attempts
+
+    @property
+    def correct_attempts(self) -> int:
+        return self.say_word_correct + self.find_object_correct
+
+    @property
+    def score_total(self) -> int:
+        return self.say_word_score_total + self.find_object_score_total
@@ -0,0 +1,23 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, Index
+from app.database import Base
+
+
+# Upload job state, written by the worker running the job so any worker can
+# answer a poll. object_id and image_id are not foreign keys: a job outlives
+# the object or image being deleted and then reports it as gone.
+class UploadJobRecord(Base):
+    __tablename__ = "upload_jobs"
+    __table_args__ = (
+        Index("ix_upload_jobs_status_updated", "status", "updated_at"),
+    )
+
+    id = Column(String, primary_key=True)
+    object_id = Column(String, nullable=False)
+    image_type = Column(String, nullable=False)
+    status = Column(String(20), nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(String)
+    image_id = Column(String)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,174 @@
+import gzip
+import json
+import re
+from typing import Callable, Optional
+
+import msgpack
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.exceptions import HTTPException
+
+from app.etag import ETAG_HEADER
+from app.responses import (
+    GZIP_LEVEL, JSON_MEDIA_TYPE, MIN_COMPRESS_SIZE, MSGPACK_MEDIA_TYPE, MSGPACK_SCOPE_KEY, choose_encoding
+)
+
+MSGPACK_MEDIA_TYPES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack"}
+
+# The representation suffix on msgpack ETags. A msgpack request revalidates
+# only msgpack tags: they are stripped to the handler's JSON ETag, and JSON
+# tags are dropped so a JSON body is never confirmed as current.
+_MSGPACK_ETAG_SUFFIX = re.compile(r'-msgpack(?:-gzip)?"$')
+
+# Scope key holding {JSON ETag: msgpack ETag the client sent} for the 304.
+_CLIENT_ETAGS_SCOPE_KEY = "msgpack_client_etags"
+
+
+def _media_weights(header: Optional[str]) -> dict[str, float]:
+    weights = {}
+    for part in (header or "").split(","):
+        media_type, *params = [value.strip() for value in part.split(";")]
+        if not media_type:
+            continue
+        weight = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    weight = float(param[2:])
+                except ValueError:
+                    weight = 0.0
+        weights[media_type.lower()] = weight
+    return weights
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    weights = _media_weights(accept)
+    msgpack_weight = max(weights.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES)
+    return msgpack_weight > 0 and msgpack_weight >= weights.get(JSON_MEDIA_TYPE, 0.0)
+
+
+def is_msgpack(content_type: Optional[str]) -> bool:
+    return (content_type or "").split(";")[0].strip().lower() in MSGPACK_MEDIA_TYPES
+
+
+class MsgPackRequest(Request):
+    async def json(self):
+        if not hasattr(self, "_json"):
+            self._json = msgpack.unpackb(await self.body())
+        return self._json
+
+
+def _msgpack_scope(request: Request, read_msgpack: bool, respond_msgpack: bool) -> dict:
+    scope = {**request.scope}
+    replacements: dict[bytes, Optional[bytes]] = {}
+    if read_msgpack:
+        # FastAPI only parses bodies it sees as JSON; MsgPackRequest.json() decodes them.
+        replacements[b"content-type"] = JSON_MEDIA_TYPE.encode()
+    if respond_msgpack:
+        # The handler renders identity JSON, which _to_msgpack transcodes and
+        # compresses. Cached catalog bodies are rendered as msgpack directly.
+        replacements[b"accept-encoding"] = None
+        scope[MSGPACK_SCOPE_KEY] = request.headers.get("accept-encoding", "")
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            tags, client_etags = _msgpack_if_none_match(if_none_match)
+            replacements[b"if-none-match"] = ", ".join(tags).encode("latin-1") if tags else None
+            scope[_CLIENT_ETAGS_SCOPE_KEY] = client_etags
+
+    headers = [(name, value) for name, value in request.scope["headers"] if name not in replacements]
+    headers.extend((name, value) for name, value in replacements.items() if value is not None)
+    return {**scope, "headers": headers}
+
+
+def _msgpack_if_none_match(header: str) -> tuple[list[str], dict[str, str]]:
+    tags = []
+    client_etags = {}
+    for value in header.split(","):
+        value = value.strip()
+        if value == "*":
+            tags.append(value)
+            continue
+        tag = value.removeprefix("W/")
+        suffix = _MSGPACK_ETAG_SUFFIX.search(tag)
+        if suffix:
+            json_etag = f'{tag[:suffix.start()]}"'
+            tags.append(json_etag)
+            client_etags.setdefault(json_etag, tag)
+    return tags, client_etags
+
+
+def _add_vary(headers, *names: str):
+    vary = [value.strip() for value in headers.get("vary", "").split(",") if value.strip()]
+    present = {value.lower() for value in vary}
+    vary.extend(name for name in names if name.lower() not in present)
+    headers["Vary"] = ", ".join(vary)
+
+
+def _to_msgpack(response: Response, accept_encoding: Optional[str], client_etags: dict[str, str]) -> Response:
+    _add_vary(response.headers, "Accept", "Accept-Encoding")
+    etag = response.headers.get(ETAG_HEADER)
+    if response.status_code == 304:
+        # Confirms the msgpack representation the client holds; only "*"
+        # matches without naming one.
+        if etag:
+            response.headers[ETAG_HEADER] = client_etags.get(etag, f'{etag[:-1]}-msgpack"')
+        return response
+
+    content_type = response.headers.get("content-type", "")
+    if is_msgpack(content_type) or not content_type.startswith(JSON_MEDIA_TYPE) or not getattr(response, "body", None):
+        return response
+
+    headers = {
+        name: value for name, value in response.headers.items()
+        if name not in ("content-length", "content-type", "etag")
+    }
+    body = msgpack.packb(json.loads(response.body))
+    suffix = "-msgpack"
+    if choose_encoding(accept_encoding, ["gzip", "identity"]) == "gzip" and len(body) >= MIN_COMPRESS_SIZE:
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        headers["content-encoding"] = "gzip"
+        suffix = "-msgpack-gzip"
+    # Each format and content coding is its own representation with its own ETag.
+    if etag:
+        headers[ETAG_HEADER] = f'{etag[:-1]}{suffix}"'
+
+    return Response(
+        content=body,
+        status_code=response.status_code,
+        headers=headers,
+        media_type=MSGPACK_MEDIA_TYPE,
+        background=response.background
+    )
+
+
+# Lets a router accept application/msgpack request bodies and answer with
+# application/msgpack when the Accept header prefers it. Handlers and schemas
+# are unchanged: bodies are decoded before validation and responses are
+# transcoded from the JSON the handler produced. Every response, JSON, 304
+# and error alike, carries Vary: Accept so shared caches keep formats apart.
+class MsgPackRoute(APIRoute):
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def msgpack_route_handler(request: Request) -> Response:
+            read_msgpack = is_msgpack(request.headers.get("content-type"))
+            respond_msgpack = wants_msgpack(request.headers.get("accept"))
+            accept_encoding = request.headers.get("accept-encoding")
+            if read_msgpack or respond_msgpack:
+                request = MsgPackRequest(_msgpack_scope(request, read_msgpack, respond_msgpack), request.receive)
+
+            try:
+                response = await handler(request)
+            except HTTPException as exc:
+                headers = MutableHeaders(headers=exc.headers)
+                _add_vary(headers, "Accept")
+                exc.headers = dict(headers.items())
+                raise
+
+            if respond_msgpack:
+                return _to_msgpack(response, accept_encoding, request.scope.get(_CLIENT_ETAGS_SCOPE_KEY, {}))
+            _add_vary(response.headers, "Accept")
+            return response
+
+        return msgpack_route_handler
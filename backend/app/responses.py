@@ -0,0 +1,198 @@
+import gzip
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Optional
+
+import msgpack
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+
+from app.etag import ETAG_HEADER, etag_matches
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Set by MsgPackRoute to the client's Accept-Encoding when it answers in msgpack.
+MSGPACK_SCOPE_KEY = "msgpack_accept_encoding"
+
+# Bodies smaller than this are not worth compressing.
+MIN_COMPRESS_SIZE = 512
+
+# Dynamic-content levels: gzip 9 and brotli 11 cost several times more CPU on
+# every cache miss for a few percent smaller bodies.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+# Serializes straight to JSON bytes with pydantic-core, skipping the response
+# model validation and jsonable_encoder pass FastAPI would otherwise run.
+def json_response(
+    adapter: TypeAdapter,
+    value: Any,
+    headers: Optional[dict] = None,
+    from_attributes: bool = False
+) -> Response:
+    if from_attributes:
+        value = adapter.validate_python(value, from_attributes=True)
+    return Response(content=adapter.dump_json(value), media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    identity: bytes
+    gzip: Optional[bytes] = None
+    br: Optional[bytes] = None
+    headers: dict = field(default_factory=dict)
+    media_type: str = JSON_MEDIA_TYPE
+    etag_suffix: str = ""
+
+    @classmethod
+    def encode(cls, raw: bytes, headers: Optional[dict] = None) -> "EncodedBody":
+        if len(raw) < MIN_COMPRESS_SIZE:
+            return cls(identity=raw, headers=headers or {})
+        return cls(
+            identity=raw,
+            gzip=gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0),
+            br=brotli.compress(raw, quality=BROTLI_QUALITY) if brotli is not None else None,
+            headers=headers or {}
+        )
+
+    # Same content as msgpack, gzipped like MsgPackRoute's transcoded responses.
+    def to_msgpack(self) -> "EncodedBody":
+        raw = msgpack.packb(json.loads(self.identity))
+        return EncodedBody(
+            identity=raw,
+            gzip=gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0) if len(raw) >= MIN_COMPRESS_SIZE else None,
+            headers=self.headers,
+            media_type=MSGPACK_MEDIA_TYPE,
+            etag_suffix="-msgpack"
+        )
+
+    def available(self) -> dict[str, bytes]:
+        encodings = {"identity": self.identity}
+        if self.br is not None:
+            encodings["br"] = self.br
+        if self.gzip is not None:
+            encodings["gzip"] = self.gzip
+        return encodings
+
+
+def accepted_encodings(header: Optional[str]) -> dict[str, float]:
+    weights = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+    return weights
+
+
+def choose_encoding(header: Optional[str], available: list[str]) -> str:
+    weights = accepted_encodings(header)
+    best, best_weight = "identity", 0.0
+    # Identity is always acceptable but only preferred when asked for
+    # explicitly; ties go to the earlier, smaller encoding.
+    for encoding in ("br", "gzip", "identity"):
+        if encoding not in available:
+            continue
+        if encoding == "identity":
+            weight = weights.get("identity", 0.001)
+        else:
+            weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+# Each format and content coding is a different representation, so it gets its own strong ETag.
+def encoded_etag(etag: str, encoding: str, suffix: str = "") -> str:
+    if encoding != "identity":
+        suffix += f"-{encoding}"
+    return f'{etag[:-1]}{suffix}"' if suffix else etag
+
+
+# Checked before the body is looked up or built. Every content coding of an
+# ETag carries the same content, so a client holding any of them is current.
+def encoded_not_modified(request: Request, etag: str) -> Optional[Response]:
+    for encoding in ("identity", "br", "gzip"):
+        candidate = encoded_etag(etag, encoding)
+        if etag_matches(request, candidate):
+            return Response(status_code=304, headers={ETAG_HEADER: candidate, "Vary": "Accept-Encoding"})
+    return None
+
+
+def encoded_response(body: EncodedBody, accept_encoding: Optional[str], etag: Optional[str] = None) -> Response:
+    variants = body.available()
+    encoding = choose_encoding(accept_encoding, list(variants))
+
+    headers = {**body.headers, "Vary": "Accept-Encoding"}
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    if etag:
+        headers[ETAG_HEADER] = encoded_etag(etag, encoding, body.etag_suffix)
+
+    return Response(content=variants[encoding], media_type=body.media_type, headers=headers)
+
+
+async def cached_response(
+    request: Request,
+    cache: "ResponseCache",
+    key: Hashable,
+    build: Callable[[], EncodedBody],
+    etag: str
+) -> Response:
+    not_modified = encoded_not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
+    body = await cache.get_or_build(key, build)
+    accept_encoding = request.scope.get(MSGPACK_SCOPE_KEY)
+    if accept_encoding is None:
+        accept_encoding = request.headers.get("accept-encoding")
+    else:
+        # Kept next to the JSON entry, so each snapshot transcodes a query once.
+        body = await cache.get_or_build((key, MSGPACK_MEDIA_TYPE), body.to_msgpack)
+    return encoded_response(body, accept_encoding, etag)
+
+
+# Per-snapshot LRU of encoded response bodies keyed by query shape. A new
+# catalog snapshot starts with an empty cache, so writes regenerate it.
+class ResponseCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, EncodedBody] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Misses serialize and compress in the threadpool, off the event loop.
+    async def get_or_build(self, key: Hashable, build: Callable[[], EncodedBody]) -> EncodedBody:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                return body
+
+        body = await run_in_threadpool(build)
+        with self._lock:
+            self._entries[key] = body
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.player import Player
 from app.schemas.player import AppleSignInRequest, AppleSignInResponse, PlayerResponse, GuestSignInRequest, GuestSignInResponse
@@ -8,18 +9,18 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
 @router.post("/apple", response_model=AppleSignInResponse)
-def apple_sign_in(request: AppleSignInRequest, db: Session = Depends(get_db)):
-    existing_player = db.query(Player).filter(
-        Player.apple_user_id == request.apple_user_id
-    ).first()
+async def apple_sign_in(request: AppleSignInRequest, db: AsyncSession = Depends(get_db)):
+    existing_player = await db.scalar(
+        select(Player).where(Player.apple_user_id == request.apple_user_id)
+    )
     
     if existing_player:
         if request.name and request.name != existing_player.name:
             existing_player.name = request.name
         if request.email and request.email != existing_player.email:
             existing_player.email = request.email
-        db.commit()
-        db.refresh(existing_player)
+        await db.commit()
+        await db.refresh(existing_player)
         
         return AppleSignInResponse(
             id=existing_player.id,
@@ -38,8 +39,8 @@ def apple_sign_in(request: AppleSignInRequest, db: Session = Depends(get_db)):
         email=request.email
     )
     db.add(new_player)
-    db.commit()
-    db.refresh(new_player)
+    await db.commit()
+    await db.refresh(new_player)
     
     return AppleSignInResponse(
         id=new_player.id,
@@ -53,10 +54,10 @@ def apple_sign_in(request: AppleSignInRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/player/{apple_user_id}", response_model=PlayerResponse)
-def get_player_by_apple_id(apple_user_id: str, db: Session = Depends(get_db)):
-    player = db.query(Player).filter(
-        Player.apple_user_id == apple_user_id
-    ).first()
+async def get_player_by_apple_id(apple_user_id: str, db: AsyncSession = Depends(get_db)):
+    player = await db.scalar(
+        select(Player).where(Player.apple_user_id == apple_user_id)
+    )
     
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
@@ -65,10 +66,10 @@ def get_player_by_apple_id(apple_user_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/guest", response_model=GuestSignInResponse)
-def guest_sign_in(request: GuestSignInRequest, db: Session = Depends(get_db)):
-    existing_player = db.query(Player).filter(
-        Player.device_id == request.device_id
-    ).first()
+async def guest_sign_in(request: GuestSignInRequest, db: AsyncSession = Depends(get_db)):
+    existing_player = await db.scalar(
+        select(Player).where(Player.device_id == request.device_id)
+    )
     
     if existing_player:
         return GuestSignInResponse(
@@ -89,8 +90,8 @@ def guest_sign_in(request: GuestSignInRequest, db: Session = Depends(get_db)):
         is_guest="true"
     )
     db.add(new_player)
-    db.commit()
-    db.refresh(new_player)
+    await db.commit()
+    await db.refresh(new_player)
     
     return GuestSignInResponse(
         id=new_player.id,
@@ -104,10 +105,10 @@ def guest_sign_in(request: GuestSignInRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/guest/{device_id}", response_model=PlayerResponse)
-def get_player_by_device_id(device_id: str, db: Session = Depends(get_db)):
-    player = db.query(Player).filter(
-        Player.device_id == device_id
-    ).first()
+async def get_player_by_device_id(device_id: str, db: AsyncSession = Depends(get_db)):
+    player = await db.scalar(
+        select(Player).where(Player.device_id == device_id)
+    )
     
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
@@ -1,91 +1,92 @@
-import random
+import uuid
+from datetime import datetime
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models import Object, ObjectImage, BoundingBox, Player, AttemptHistory
-from app.schemas.attempt import SayWordRequest, SayWordResponse, FindObjectRequest, FindObjectResponse
+from app.models import Player, AttemptHistory
+from app.negotiation import MsgPackRoute
+from app.schemas.attempt import (
+    SayWordRequest, SayWordResponse, FindObjectRequest, FindObjectResponse,
+    AttemptBatchItem, AttemptBatchRequest, AttemptBatchResponse, AttemptBatchResult
+)
 from app.schemas.object import ObjectResponse, ObjectImageResponse
-from app.services.scoring import ScoringService
+from app.services.catalog import CatalogSnapshot, catalog_cache
+from app.services.player_stats import PlayerStatsService
+from app.services.review_scheduler import ReviewScheduler
 
-router = APIRouter(prefix="/game", tags=["game"])
+router = APIRouter(prefix="/game", tags=["game"], route_class=MsgPackRoute)
+
+DUE_CHALLENGE_CANDIDATES = 20
 
 
 @router.post("/say-word", response_model=SayWordResponse)
-def say_word(request: SayWordRequest, db: Session = Depends(get_db)):
-    player = db.query(Player).filter(Player.id == request.player_id).first()
+async def say_word(request: SayWordRequest, db: AsyncSession = Depends(get_db)):
+    player = await db.get(Player, request.player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    obj = db.query(Object).filter(Object.id == request.object_id).first()
+    snapshot = await catalog_cache.get_with(db, object_ids=[request.object_id])
+    obj = snapshot.objects_by_id.get(request.object_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Object not found")
     
-    score, is_correct, feedback = ScoringService.score_pronunciation(
-        obj.name, request.spoken_text
+    transcripts = request.transcripts()
+    hypothesis_index, (score, is_correct, feedback) = snapshot.pronunciation.score_hypotheses(
+        obj.name,
+        [transcript.text for transcript in transcripts],
+        [transcript.confidence for transcript in transcripts]
     )
+    spoken_text = transcripts[hypothesis_index].text
     
     attempt = AttemptHistory(
         player_id=request.player_id,
         object_id=request.object_id,
         feature_type=1,
         score=score,
-        spoken_text=request.spoken_text,
+        spoken_text=spoken_text,
         is_correct=is_correct
     )
     db.add(attempt)
-    db.commit()
-    db.refresh(attempt)
+    await PlayerStatsService.record_attempt(db, attempt)
+    await db.commit()
     
     return SayWordResponse(
         score=score,
         is_correct=is_correct,
         target_word=obj.name,
-        spoken_text=request.spoken_text,
+        spoken_text=spoken_text,
         feedback=feedback,
-        attempt_id=attempt.id
+        attempt_id=attempt.id,
+        hypothesis_index=hypothesis_index
     )
 
 
 @router.post("/find-object", response_model=FindObjectResponse)
-def find_object(request: FindObjectRequest, db: Session = Depends(get_db)):
-    player = db.query(Player).filter(Player.id == request.player_id).first()
+async def find_object(request: FindObjectRequest, db: AsyncSession = Depends(get_db)):
+    player = await db.get(Player, request.player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    image = db.query(ObjectImage).filter(ObjectImage.id == request.object_image_id).first()
+    snapshot = await catalog_cache.get_with(db, image_ids=[request.object_image_id])
+    image = snapshot.images_by_id.get(request.object_image_id)
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
     
-    obj = db.query(Object).filter(Object.id == image.object_id).first()
-    
-    bounding_boxes = db.query(BoundingBox).filter(
-        BoundingBox.object_image_id == request.object_image_id
-    ).all()
+    obj = snapshot.objects_by_id[image.object_id]
     
-    if not bounding_boxes:
+    if not image.bounding_boxes:
         raise HTTPException(
             status_code=400,
             detail="This image has no bounding boxes defined"
         )
     
-    is_correct = False
-    best_score = 0
-    correct_box = None
-    
-    for box in bounding_boxes:
-        hit, score = ScoringService.check_tap_location(
-            request.tap_x, request.tap_y,
-            box.x, box.y, box.width, box.height
-        )
-        if hit and score > best_score:
-            is_correct = True
-            best_score = score
-            correct_box = box
-    
-    if not is_correct:
-        correct_box = bounding_boxes[0]
+    [(is_correct, best_score, feedback, correct_location)] = _score_taps(
+        snapshot, image, [(request.tap_x, request.tap_y)]
+    )
     
     attempt = AttemptHistory(
         player_id=request.player_id,
@@ -97,22 +98,8 @@ def find_object(request: FindObjectRequest, db: Session = Depends(get_db)):
         is_correct=is_correct
     )
     db.add(attempt)
-    db.commit()
-    db.refresh(attempt)
-    
-    if is_correct:
-        feedback = f"Great job! You found the {obj.name}!"
-    else:
-        feedback = f"Not quite! Try to find the {obj.name}."
-    
-    correct_location = None
-    if not is_correct and correct_box:
-        correct_location = {
-            "x": correct_box.x,
-            "y": correct_box.y,
-            "width": correct_box.width,
-            "height": correct_box.height
-        }
+    await PlayerStatsService.record_attempt(db, attempt)
+    await db.commit()
     
     return FindObjectResponse(
         is_correct=is_correct,
@@ -123,64 +110,253 @@ def find_object(request: FindObjectRequest, db: Session = Depends(get_db)):
     )
 
 
-@router.get("/random-object", response_model=ObjectResponse)
-def get_random_object(category: Optional[str] = None, db: Session = Depends(get_db)):
-    query = db.query(Object)
+@router.post("/attempts/batch", response_model=AttemptBatchResponse)
+async def submit_attempt_batch(request: AttemptBatchRequest, db: AsyncSession = Depends(get_db)):
+    player_ids = {item.player_id for item in request.attempts}
+    known_players = set(
+        await db.scalars(select(Player.id).where(Player.id.in_(player_ids)))
+    )
+    snapshot = await catalog_cache.get_with(
+        db,
+        object_ids={item.object_id for item in request.attempts if item.type == "say_word"},
+        image_ids={item.object_image_id for item in request.attempts if item.type == "find_object"}
+    )
+    recorded = await _recorded_attempts(db, request.attempts, known_players)
     
-    if category:
-        query = query.filter(Object.category == category)
+    results: list[Optional[AttemptBatchResult]] = [None] * len(request.attempts)
+    say_word_items = []
+    find_object_items: dict[str, list] = {}
+    repeated: list[tuple[int, int]] = []
+    seen: dict[tuple, int] = {}
+    rows = []
+    now = datetime.utcnow()
     
-    objects = query.all()
+    def reject(index: int, item_type: str, error: str):
+        results[index] = AttemptBatchResult(index=index, type=item_type, success=False, error=error)
     
-    if not objects:
-        raise HTTPException(status_code=404, detail="No objects found")
+    # Offline clients resend a batch when they never saw the response; attempts
+    # that are already recorded are reported as duplicates and not counted again.
+    def is_duplicate(index: int, item, object_id: str, feature_type: int) -> bool:
+        key = _dedupe_key(item, object_id, feature_type)
+        if key is None:
+            return False
+        if key in recorded:
+            attempt_id, score, is_correct = recorded[key]
+            results[index] = AttemptBatchResult(
+                index=index, type=item.type, success=True, duplicate=True,
+                score=score, is_correct=is_correct, attempt_id=attempt_id
+            )
+            return True
+        if key in seen:
+            repeated.append((index, seen[key]))
+            return True
+        seen[key] = index
+        return False
+    
+    for index, item in enumerate(request.attempts):
+        if item.player_id not in known_players:
+            reject(index, item.type, "Player not found")
+            continue
+        
+        if item.type == "say_word":
+            obj = snapshot.objects_by_id.get(item.object_id)
+            if not obj:
+                reject(index, item.type, "Object not found")
+                continue
+            if not is_duplicate(index, item, obj.id, 1):
+                say_word_items.append((index, item, obj))
+            continue
+        
+        image = snapshot.images_by_id.get(item.object_image_id)
+        if not image:
+            reject(index, item.type, "Image not found")
+            continue
+        if not image.bounding_boxes:
+            reject(index, item.type, "This image has no bounding boxes defined")
+            continue
+        
+        if not is_duplicate(index, item, image.object_id, 2):
+            find_object_items.setdefault(image.id, []).append((index, item))
+    
+    for image_id, items in find_object_items.items():
+        image = snapshot.images_by_id[image_id]
+        taps = _score_taps(snapshot, image, [(item.tap_x, item.tap_y) for _, item in items])
+        for (index, item), (is_correct, score, feedback, correct_location) in zip(items, taps):
+            attempt_id = str(uuid.uuid4())
+            rows.append({
+                "id": attempt_id,
+                "player_id": item.player_id,
+                "object_id": image.object_id,
+                "feature_type": 2,
+                "score": score,
+                "tap_x": item.tap_x,
+                "tap_y": item.tap_y,
+                "is_correct": is_correct,
+                "created_at": item.created_at or now,
+                "client_attempt_id": item.client_attempt_id,
+            })
+            results[index] = AttemptBatchResult(
+                index=index,
+                type=item.type,
+                success=True,
+                score=score,
+                is_correct=is_correct,
+                feedback=feedback,
+                correct_location=correct_location,
+                attempt_id=attempt_id
+            )
+    
+    scores = snapshot.pronunciation.score_pairs(
+        [(obj.name, item.spoken_text) for _, item, obj in say_word_items]
+    )
+    for (index, item, obj), (score, is_correct, feedback) in zip(say_word_items, scores):
+        attempt_id = str(uuid.uuid4())
+        rows.append({
+            "id": attempt_id,
+            "player_id": item.player_id,
+            "object_id": obj.id,
+            "feature_type": 1,
+            "score": score,
+            "spoken_text": item.spoken_text,
+            "is_correct": is_correct,
+            "created_at": item.created_at or now,
+            "client_attempt_id": item.client_attempt_id,
+        })
+        results[index] = AttemptBatchResult(
+            index=index,
+            type=item.type,
+            success=True,
+            score=score,
+            is_correct=is_correct,
+            feedback=feedback,
+            attempt_id=attempt_id
+        )
+    
+    for index, original in repeated:
+        results[index] = results[original].model_copy(update={"index": index, "duplicate": True})
+    
+    if rows:
+        try:
+            await db.execute(insert(AttemptHistory), rows)
+        except IntegrityError:
+            # A concurrent resend of the same batch recorded these keys first;
+            # retrying reports them as duplicates.
+            await db.rollback()
+            raise HTTPException(status_code=409, detail="Attempts are being recorded by another request, retry")
+        
+        totals: dict[tuple[str, int], list[int]] = {}
+        for row in rows:
+            counters = totals.setdefault((row["player_id"], row["feature_type"]), [0, 0, 0])
+            counters[0] += 1
+            counters[1] += 1 if row["is_correct"] else 0
+            counters[2] += row["score"]
+        for (player_id, feature_type), (attempts, correct, score_total) in totals.items():
+            await PlayerStatsService.record_attempts(
+                db, player_id, feature_type, attempts, correct, score_total
+            )
+        
+        await db.commit()
     
-    return random.choice(objects)
+    duplicates = sum(1 for result in results if result.duplicate)
+    return AttemptBatchResponse(
+        accepted=len(rows),
+        rejected=len(results) - len(rows) - duplicates,
+        duplicates=duplicates,
+        results=results
+    )
 
 
-@router.get("/random-image-with-boxes", response_model=ObjectImageResponse)
-def get_random_image_with_boxes(
+def _dedupe_key(item, object_id: str, feature_type: int) -> Optional[tuple]:
+    if item.client_attempt_id:
+        return (item.player_id, item.client_attempt_id)
+    if item.created_at:
+        return (item.player_id, object_id, feature_type, item.created_at)
+    return None
+
+
+# Attempts of this batch that an earlier submission already recorded, keyed
+# like _dedupe_key: by client_attempt_id, or by device timestamp for clients
+# that do not send one.
+async def _recorded_attempts(
+    db: AsyncSession, items: list[AttemptBatchItem], player_ids: set[str]
+) -> dict[tuple, tuple[str, int, bool]]:
+    client_ids = {item.client_attempt_id for item in items if item.client_attempt_id}
+    timestamps = {item.created_at for item in items if item.created_at and not item.client_attempt_id}
+    if not player_ids or not (client_ids or timestamps):
+        return {}
+    
+    rows = await db.execute(
+        select(
+            AttemptHistory.id, AttemptHistory.player_id, AttemptHistory.object_id,
+            AttemptHistory.feature_type, AttemptHistory.created_at, AttemptHistory.client_attempt_id,
+            AttemptHistory.score, AttemptHistory.is_correct
+        ).where(
+            AttemptHistory.player_id.in_(player_ids),
+            or_(AttemptHistory.client_attempt_id.in_(client_ids), AttemptHistory.created_at.in_(timestamps))
+        )
+    )
+    recorded = {}
+    for row in rows:
+        attempt = (row.id, row.score, row.is_correct)
+        if row.client_attempt_id:
+            recorded[(row.player_id, row.client_attempt_id)] = attempt
+        recorded[(row.player_id, row.object_id, row.feature_type, row.created_at)] = attempt
+    return recorded
+
+
+@router.get("/random-object", response_model=ObjectResponse)
+async def get_random_object(
     category: Optional[str] = None,
-    db: Session = Depends(get_db)
+    balanced: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
-    query = db.query(ObjectImage).join(Object).join(BoundingBox)
+    snapshot = await catalog_cache.get(db)
+    obj = snapshot.sample_object(category, balanced)
     
-    if category:
-        query = query.filter(Object.category == category)
+    if not obj:
+        raise HTTPException(status_code=404, detail="No objects found")
     
-    images = query.distinct().all()
+    return obj
+
+
+@router.get("/random-image-with-boxes", response_model=ObjectImageResponse)
+async def get_random_image_with_boxes(
+    category: Optional[str] = None,
+    balanced: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    snapshot = await catalog_cache.get(db)
+    image = snapshot.sample_find_object_image(category, balanced)
     
-    if not images:
+    if not image:
         raise HTTPException(
             status_code=404,
             detail="No images with bounding boxes found"
         )
     
-    return random.choice(images)
+    return image
 
 
 @router.get("/challenge/{player_id}")
-def get_challenge(
+async def get_challenge(
     player_id: str,
     feature_type: int = 1,
     category: Optional[str] = None,
-    db: Session = Depends(get_db)
+    balanced: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
-    player = db.query(Player).filter(Player.id == player_id).first()
+    player = await db.get(Player, player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
+    snapshot = await catalog_cache.get(db)
+    due_objects = await _due_objects(db, snapshot, player_id, category)
+    
     if feature_type == 1:
-        query = db.query(Object)
-        if category:
-            query = query.filter(Object.category == category)
-        
-        objects = query.all()
-        if not objects:
+        obj = due_objects[0] if due_objects else snapshot.sample_object(category, balanced)
+        if not obj:
             raise HTTPException(status_code=404, detail="No objects found")
         
-        obj = random.choice(objects)
-        
         image_url = None
         if obj.images:
             image_url = obj.images[0].image_url
@@ -195,19 +371,17 @@ def get_challenge(
         }
     
     elif feature_type == 2:
-        query = db.query(ObjectImage).join(Object).join(BoundingBox)
-        if category:
-            query = query.filter(Object.category == category)
-        
-        images = query.distinct().all()
-        if not images:
+        due_images = [
+            image for obj in due_objects for image in obj.images if image.bounding_boxes
+        ]
+        image = due_images[0] if due_images else snapshot.sample_find_object_image(category, balanced)
+        if not image:
             raise HTTPException(
                 status_code=404,
                 detail="No images with bounding boxes found"
             )
         
-        image = random.choice(images)
-        obj = image.object
+        obj = snapshot.objects_by_id[image.object_id]
         
         return {
             "feature_type": 2,
@@ -221,3 +395,44 @@ def get_challenge(
     
     else:
         raise HTTPException(status_code=400, detail="Invalid feature_type. Use 1 or 2.")
+
+
+# Objects whose review is due, most overdue first, read from the
+# (player_id, next_due_at) index.
+async def _due_objects(
+    db: AsyncSession,
+    snapshot: CatalogSnapshot,
+    player_id: str,
+    category: Optional[str]
+) -> list[ObjectResponse]:
+    due = await db.scalars(ReviewScheduler.due_query(player_id, DUE_CHALLENGE_CANDIDATES))
+    objects = [snapshot.objects_by_id.get(progress.object_id) for progress in due]
+    return [obj for obj in objects if obj and (not category or obj.category == category)]
+
+
+def _score_taps(
+    snapshot: CatalogSnapshot,
+    image: ObjectImageResponse,
+    taps: list[tuple[float, float]]
+) -> list[tuple[bool, int, str, Optional[dict]]]:
+    obj = snapshot.objects_by_id[image.object_id]
+    hits, scores, _ = snapshot.box_indexes[image.id].hit_test(
+        [tap_x for tap_x, _ in taps], [tap_y for _, tap_y in taps]
+    )
+    
+    results = []
+    for hit, score in zip(hits.tolist(), scores.tolist()):
+        if hit:
+            results.append((True, score, f"Great job! You found the {obj.name}!", None))
+            continue
+        
+        correct_box = image.bounding_boxes[0]
+        correct_location = {
+            "x": correct_box.x,
+            "y": correct_box.y,
+            "width": correct_box.width,
+            "height": correct_box.height
+        }
+        results.append((False, 0, f"Not quite! Try to find the {obj.name}.", correct_location))
+    
+    return results
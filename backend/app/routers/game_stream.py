@@ -0,0 +1,135 @@
+import asyncio
+import json
+from typing import Optional
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+
+from app.database import session_scope
+from app.models import Player, AttemptHistory
+from app.services.catalog import catalog_cache
+from app.services.player_stats import PlayerStatsService
+from app.services.pronunciation import normalize
+
+router = APIRouter(prefix="/game", tags=["game"])
+
+STREAM_IDLE_TIMEOUT = 30.0
+
+
+@router.websocket("/say-word/stream")
+async def say_word_stream(websocket: WebSocket, player_id: str, object_id: str):
+    async with session_scope() as db:
+        player = await db.get(Player, player_id)
+        snapshot = await catalog_cache.get_with(db, object_ids=[object_id])
+
+    if not player:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Player not found")
+        return
+    obj = snapshot.objects_by_id.get(object_id)
+    if not obj:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Object not found")
+        return
+
+    await websocket.accept()
+
+    # The attempt is the final transcript, or the last partial if the stream
+    # ends without one; a better-scoring earlier partial only triggers the
+    # early "correct" push.
+    latest: Optional[tuple[int, bool, str, str]] = None
+    correct_sent = False
+    last_text = None
+    connected = True
+    close_code = status.WS_1000_NORMAL_CLOSURE
+    close_reason = None
+
+    try:
+        while True:
+            try:
+                frame = await asyncio.wait_for(websocket.receive(), STREAM_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                break
+            if frame["type"] == "websocket.disconnect":
+                connected = False
+                break
+            if frame.get("bytes") is not None:
+                # A binary frame: the stream still ends with the last transcript so far.
+                close_code = status.WS_1003_UNSUPPORTED_DATA
+                close_reason = "Messages must be JSON text frames"
+                break
+
+            try:
+                message = json.loads(frame["text"])
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON"})
+                continue
+
+            message_type = message.get("type") if isinstance(message, dict) else None
+            text = message.get("text") if isinstance(message, dict) else None
+            if message_type not in ("partial", "final") or not isinstance(text, str):
+                await websocket.send_json({
+                    "type": "error",
+                    "detail": "Expected {\"type\": \"partial\" | \"final\", \"text\": str}"
+                })
+                continue
+
+            # Recognizers resend the same partial often; only new text is scored.
+            if normalize(text) != last_text:
+                last_text = normalize(text)
+                score, is_correct, feedback = snapshot.pronunciation.score(
+                    obj.name, text, use_cache=message_type == "final"
+                )
+                latest = (score, is_correct, feedback, text)
+
+                await websocket.send_json({
+                    "type": "correct" if is_correct and not correct_sent else "partial",
+                    "text": text,
+                    "score": score,
+                    "is_correct": is_correct,
+                    "feedback": feedback
+                })
+                correct_sent = correct_sent or is_correct
+
+            if message_type == "final":
+                break
+    except WebSocketDisconnect:
+        connected = False
+
+    attempt_id = None
+    if latest is not None:
+        # Shielded so a client hanging up mid-write still records the attempt.
+        attempt_id = await asyncio.shield(_record_stream_attempt(player_id, object_id, latest))
+
+    if not connected:
+        return
+
+    if latest is not None:
+        score, is_correct, feedback, text = latest
+        await websocket.send_json({
+            "type": "result",
+            "score": score,
+            "is_correct": is_correct,
+            "target_word": obj.name,
+            "spoken_text": text,
+            "feedback": feedback,
+            "attempt_id": attempt_id
+        })
+    await websocket.close(code=close_code, reason=close_reason)
+
+
+async def _record_stream_attempt(
+    player_id: str,
+    object_id: str,
+    transcript: tuple[int, bool, str, str]
+) -> str:
+    score, is_correct, _, text = transcript
+    async with session_scope() as db:
+        attempt = AttemptHistory(
+            player_id=player_id,
+            object_id=object_id,
+            feature_type=1,
+            score=score,
+            spoken_text=text,
+            is_correct=is_correct
+        )
+        db.add(attempt)
+        await PlayerStatsService.record_attempt(db, attempt)
+        await db.commit()
+        return attempt.id
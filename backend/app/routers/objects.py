@@ -1,105 +1,122 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
 import uuid
-import aiofiles
 
 from app.database import get_db
+from app.etag import make_etag
+from app.loaders import OBJECT_WITH_IMAGES, IMAGE_WITH_BOXES
 from app.models import Object, ObjectImage, BoundingBox
 from app.models.object import ImageType as ModelImageType
+from app.negotiation import MsgPackRoute
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, encode_cursor, decode_string_cursor
+from app.responses import EncodedBody, cached_response, json_response
 from app.schemas.object import (
     ObjectCreate, ObjectResponse, ObjectImageCreate, ObjectImageResponse,
-    BoundingBoxCreate, BoundingBoxResponse, ObjectListResponse, ImageType
+    BoundingBoxCreate, BoundingBoxResponse, ObjectListResponse, ImageType, UploadJobResponse
 )
-from app.services import cloudinary_service
+from app.services import blob_store, catalog_cache, upload_pipeline, UploadQueueFull
+from app.upload_stream import check_content_length, multipart_file_chunks, spool_upload
 
-router = APIRouter(prefix="/objects", tags=["objects"])
+router = APIRouter(prefix="/objects", tags=["objects"], route_class=MsgPackRoute)
 
-UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+OBJECT_ADAPTER = TypeAdapter(ObjectResponse)
+OBJECT_LIST_ADAPTER = TypeAdapter(List[ObjectListResponse])
+IMAGE_ADAPTER = TypeAdapter(ObjectImageResponse)
+IMAGE_LIST_ADAPTER = TypeAdapter(List[ObjectImageResponse])
+CATEGORIES_ADAPTER = TypeAdapter(List[str])
 
 
 @router.post("/", response_model=ObjectResponse)
-def create_object(obj: ObjectCreate, db: Session = Depends(get_db)):
-    existing = db.query(Object).filter(Object.name == obj.name).first()
+async def create_object(obj: ObjectCreate, db: AsyncSession = Depends(get_db)):
+    existing = await db.scalar(select(Object).where(Object.name == obj.name))
     if existing:
         raise HTTPException(status_code=400, detail="Object with this name already exists")
     
     db_object = Object(name=obj.name, category=obj.category)
     db.add(db_object)
-    db.commit()
-    db.refresh(db_object)
-    return db_object
+    await db.commit()
+    
+    snapshot = await catalog_cache.rebuild(db)
+    return snapshot.objects_by_id[db_object.id]
 
 
 @router.get("/", response_model=List[ObjectListResponse])
-def list_objects(
+async def list_objects(
+    request: Request,
     category: str = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    skip: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    query = db.query(Object)
-    
-    if category:
-        query = query.filter(Object.category == category)
-    
-    objects = query.offset(skip).limit(limit).all()
+    snapshot = await catalog_cache.get(db)
+    after = decode_string_cursor(cursor) if cursor else None
     
-    result = []
-    for obj in objects:
-        thumbnail_url = None
-        flashcard_url = None
-        for img in obj.images:
-            if img.image_type == "thumbnail" and not thumbnail_url:
-                thumbnail_url = img.image_url
-            elif img.image_type == "flashcard" and not flashcard_url:
-                flashcard_url = img.image_url
-        
-        result.append(ObjectListResponse(
-            id=obj.id,
-            name=obj.name,
-            category=obj.category,
-            image_count=len(obj.images),
-            thumbnail_url=thumbnail_url,
-            flashcard_url=flashcard_url
-        ))
+    def build() -> EncodedBody:
+        objects, next_key = snapshot.object_page(category, after, skip, limit)
+        headers = {NEXT_CURSOR_HEADER: encode_cursor(*next_key)} if next_key else {}
+        return EncodedBody.encode(OBJECT_LIST_ADAPTER.dump_json(objects), headers)
     
-    return result
+    return await cached_response(
+        request, snapshot.responses, ("list", category, skip, limit, cursor), build,
+        make_etag(snapshot.version, request.url)
+    )
 
 
-@router.get("/categories")
-def list_categories(db: Session = Depends(get_db)):
-    categories = db.query(Object.category).distinct().all()
-    return [c[0] for c in categories]
+@router.get("/categories", response_model=List[str])
+async def list_categories(request: Request, db: AsyncSession = Depends(get_db)):
+    snapshot = await catalog_cache.get(db)
+    return await cached_response(
+        request, snapshot.responses, ("categories",),
+        lambda: EncodedBody.encode(CATEGORIES_ADAPTER.dump_json(list(snapshot.categories))),
+        make_etag(snapshot.version, request.url)
+    )
 
 
 @router.get("/{object_id}", response_model=ObjectResponse)
-def get_object(object_id: str, db: Session = Depends(get_db)):
-    obj = db.query(Object).filter(Object.id == object_id).first()
+async def get_object(object_id: str, request: Request, db: AsyncSession = Depends(get_db)):
+    snapshot = await catalog_cache.get_with(db, object_ids=[object_id])
+    obj = snapshot.objects_by_id.get(object_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Object not found")
-    return obj
+    
+    return await cached_response(
+        request, snapshot.responses, ("object", object_id),
+        lambda: EncodedBody.encode(OBJECT_ADAPTER.dump_json(obj)),
+        make_etag(snapshot.version, request.url)
+    )
 
 
 @router.delete("/{object_id}")
-def delete_object(object_id: str, db: Session = Depends(get_db)):
-    obj = db.query(Object).filter(Object.id == object_id).first()
+async def delete_object(object_id: str, db: AsyncSession = Depends(get_db)):
+    obj = await db.get(Object, object_id, options=OBJECT_WITH_IMAGES)
     if not obj:
         raise HTTPException(status_code=404, detail="Object not found")
     
-    db.delete(obj)
-    db.commit()
+    blob_sha256s = [image.blob_sha256 for image in obj.images]
+    # source_image_id has no relationship for the unit of work to order by,
+    # so derivatives are flushed away before their originals.
+    for image in [image for image in obj.images if image.source_image_id]:
+        obj.images.remove(image)
+    await db.flush()
+    await db.delete(obj)
+    await db.commit()
+    await blob_store.collect(db, blob_sha256s)
+    await catalog_cache.rebuild(db)
     return {"message": "Object deleted successfully"}
 
 
 @router.post("/{object_id}/images", response_model=ObjectImageResponse)
-def add_object_image(
+async def add_object_image(
     object_id: str,
     image_data: ObjectImageCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    obj = db.query(Object).filter(Object.id == object_id).first()
+    obj = await db.get(Object, object_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Object not found")
     
@@ -109,8 +126,8 @@ def add_object_image(
         image_type=image_data.image_type.value
     )
     db.add(db_image)
-    db.commit()
-    db.refresh(db_image)
+    await db.commit()
+    await db.refresh(db_image)
     
     if image_data.bounding_boxes:
         for box in image_data.bounding_boxes:
@@ -122,105 +139,146 @@ def add_object_image(
                 height=box.height
             )
             db.add(db_box)
-        db.commit()
-        db.refresh(db_image)
+        await db.commit()
     
-    return db_image
+    snapshot = await catalog_cache.rebuild(db)
+    return snapshot.images_by_id[db_image.id]
 
 
 @router.get("/{object_id}/images", response_model=List[ObjectImageResponse])
-def get_object_images(
+async def get_object_images(
     object_id: str,
     image_type: Optional[ImageType] = Query(None, description="Filter by image type"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    obj = db.query(Object).filter(Object.id == object_id).first()
+    snapshot = await catalog_cache.get_with(db, object_ids=[object_id])
+    obj = snapshot.objects_by_id.get(object_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Object not found")
     
-    query = db.query(ObjectImage).filter(ObjectImage.object_id == object_id)
-    
+    images = obj.images
     if image_type:
-        query = query.filter(ObjectImage.image_type == image_type.value)
+        images = [img for img in images if img.image_type == image_type.value]
     
-    return query.all()
+    return json_response(IMAGE_LIST_ADAPTER, images)
+
+
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"]
+                }
+            },
+            "image/*": {"schema": {"type": "string", "format": "binary"}}
+        }
+    }
+}
+
+
+def _upload_queue_full() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Too many uploads in progress, try again shortly",
+        headers={"Retry-After": "5"}
+    )
 
 
-@router.post("/{object_id}/images/upload", response_model=ObjectImageResponse)
+# The body is read here rather than through a File() parameter, which would
+# buffer the whole form first, so the size limit and image check apply while
+# either a multipart or a raw image/* body streams to disk.
+@router.post(
+    "/{object_id}/images/upload",
+    response_model=UploadJobResponse,
+    status_code=202,
+    openapi_extra=UPLOAD_REQUEST_BODY
+)
 async def upload_object_image(
     object_id: str,
-    file: UploadFile = File(...),
+    request: Request,
     image_type: ImageType = Query(ImageType.FLASHCARD, description="Type of image"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    obj = db.query(Object).filter(Object.id == object_id).first()
+    obj = await db.get(Object, object_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Object not found")
+    if upload_pipeline.is_full:
+        raise _upload_queue_full()
     
-    content = await file.read()
-    
-    if cloudinary_service.is_configured:
-        folder = f"speakeasy/{obj.category}/{image_type.value}"
-        public_id = f"{obj.name.lower().replace(' ', '_')}_{uuid.uuid4().hex[:8]}"
-        
-        try:
-            result = cloudinary_service.upload_image(
-                file_data=content,
-                folder=folder,
-                public_id=public_id
-            )
-            image_url = result["url"]
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to upload to Cloudinary: {str(e)}")
+    check_content_length(request)
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        upload = await spool_upload(multipart_file_chunks(request), upload_pipeline.spool_dir)
+    elif content_type.startswith("image/"):
+        upload = await spool_upload(request.stream(), upload_pipeline.spool_dir)
     else:
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
-        file_ext = os.path.splitext(file.filename)[1] if file.filename else ".jpg"
-        file_name = f"{uuid.uuid4()}{file_ext}"
-        file_path = os.path.join(UPLOAD_DIR, file_name)
-        
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(content)
-        
-        image_url = f"/uploads/{file_name}"
+        raise HTTPException(status_code=415, detail="Send multipart/form-data or an image/* body")
     
-    db_image = ObjectImage(
-        object_id=object_id,
-        image_url=image_url,
-        image_type=image_type.value
-    )
-    db.add(db_image)
-    db.commit()
-    db.refresh(db_image)
+    try:
+        job = await upload_pipeline.submit(
+            object_id=object_id,
+            image_type=image_type.value,
+            upload=upload,
+            folder=f"speakeasy/{obj.category}/{image_type.value}",
+            public_id=f"{obj.name.lower().replace(' ', '_')}_{uuid.uuid4().hex[:8]}"
+        )
+    except UploadQueueFull:
+        os.remove(upload.path)
+        raise _upload_queue_full()
     
-    return db_image
+    return job
+
+
+@router.get("/uploads/{job_id}", response_model=UploadJobResponse)
+async def get_upload_job(job_id: str, db: AsyncSession = Depends(get_db)):
+    job = await upload_pipeline.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    return job
 
 
 @router.get("/images/{image_id}", response_model=ObjectImageResponse)
-def get_object_image(image_id: str, db: Session = Depends(get_db)):
-    image = db.query(ObjectImage).filter(ObjectImage.id == image_id).first()
+async def get_object_image(image_id: str, db: AsyncSession = Depends(get_db)):
+    snapshot = await catalog_cache.get_with(db, image_ids=[image_id])
+    image = snapshot.images_by_id.get(image_id)
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
-    return image
+    return json_response(IMAGE_ADAPTER, image)
 
 
 @router.delete("/images/{image_id}")
-def delete_object_image(image_id: str, db: Session = Depends(get_db)):
-    image = db.query(ObjectImage).filter(ObjectImage.id == image_id).first()
+async def delete_object_image(image_id: str, db: AsyncSession = Depends(get_db)):
+    image = await db.get(ObjectImage, image_id, options=IMAGE_WITH_BOXES)
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
     
-    db.delete(image)
-    db.commit()
+    derivatives = await db.scalars(
+        select(ObjectImage).options(*IMAGE_WITH_BOXES).where(ObjectImage.source_image_id == image_id)
+    )
+    blob_sha256s = [image.blob_sha256]
+    for derivative in derivatives.all():
+        blob_sha256s.append(derivative.blob_sha256)
+        await db.delete(derivative)
+    # Flushed first: the unit of work cannot order rows by source_image_id.
+    await db.flush()
+    await db.delete(image)
+    await db.commit()
+    await blob_store.collect(db, blob_sha256s)
+    await catalog_cache.rebuild(db)
     return {"message": "Image deleted successfully"}
 
 
 @router.post("/images/{image_id}/bounding-boxes", response_model=BoundingBoxResponse)
-def add_bounding_box(
+async def add_bounding_box(
     image_id: str,
     box: BoundingBoxCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    image = db.query(ObjectImage).filter(ObjectImage.id == image_id).first()
+    image = await db.get(ObjectImage, image_id)
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
     
@@ -232,18 +290,20 @@ def add_bounding_box(
         height=box.height
     )
     db.add(db_box)
-    db.commit()
-    db.refresh(db_box)
+    await db.commit()
+    await db.refresh(db_box)
+    await catalog_cache.rebuild(db)
     
     return db_box
 
 
 @router.delete("/bounding-boxes/{box_id}")
-def delete_bounding_box(box_id: str, db: Session = Depends(get_db)):
-    box = db.query(BoundingBox).filter(BoundingBox.id == box_id).first()
+async def delete_bounding_box(box_id: str, db: AsyncSession = Depends(get_db)):
+    box = await db.get(BoundingBox, box_id)
     if not box:
         raise HTTPException(status_code=404, detail="Bounding box not found")
     
-    db.delete(box)
-    db.commit()
+    await db.delete(box)
+    await db.commit()
+    await catalog_cache.rebuild(db)
     return {"message": "Bounding box deleted successfully"}
@@ -1,101 +1,124 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select, delete, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models import Player, AttemptHistory
+from app.models import Player, AttemptHistory, PlayerStatistics
+from app.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, encode_cursor, decode_datetime_cursor, set_next_cursor
+)
+from app.responses import json_response
 from app.schemas.player import PlayerCreate, PlayerResponse, PlayerStats
 from app.schemas.attempt import AttemptResponse
+from app.services.player_stats import PlayerStatsService
 
 router = APIRouter(prefix="/players", tags=["players"])
 
+ATTEMPT_LIST_ADAPTER = TypeAdapter(List[AttemptResponse])
+
 
 @router.post("/", response_model=PlayerResponse)
-def create_player(player: PlayerCreate, db: Session = Depends(get_db)):
+async def create_player(player: PlayerCreate, db: AsyncSession = Depends(get_db)):
     db_player = Player(name=player.name)
     db.add(db_player)
-    db.commit()
-    db.refresh(db_player)
+    await db.commit()
+    await db.refresh(db_player)
     return db_player
 
 
 @router.get("/", response_model=List[PlayerResponse])
-def list_players(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    players = db.query(Player).offset(skip).limit(limit).all()
+async def list_players(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    query = select(Player).order_by(Player.created_at, Player.id)
+    
+    if cursor:
+        created_at, player_id = decode_datetime_cursor(cursor)
+        query = query.where(tuple_(Player.created_at, Player.id) > tuple_(created_at, player_id))
+    
+    players = (await db.scalars(query.offset(skip).limit(limit + 1))).all()
+    
+    if len(players) > limit:
+        players = players[:limit]
+        set_next_cursor(response, encode_cursor(players[-1].created_at, players[-1].id))
+    
     return players
 
 
 @router.get("/{player_id}", response_model=PlayerResponse)
-def get_player(player_id: str, db: Session = Depends(get_db)):
-    player = db.query(Player).filter(Player.id == player_id).first()
+async def get_player(player_id: str, db: AsyncSession = Depends(get_db)):
+    player = await db.get(Player, player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     return player
 
 
 @router.get("/{player_id}/history", response_model=List[AttemptResponse])
-def get_player_history(
+async def get_player_history(
     player_id: str,
     feature_type: int = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    skip: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    player = db.query(Player).filter(Player.id == player_id).first()
+    player = await db.get(Player, player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    query = db.query(AttemptHistory).filter(AttemptHistory.player_id == player_id)
+    query = select(AttemptHistory).where(AttemptHistory.player_id == player_id)
     
     if feature_type is not None:
-        query = query.filter(AttemptHistory.feature_type == feature_type)
+        query = query.where(AttemptHistory.feature_type == feature_type)
+    
+    if cursor:
+        created_at, attempt_id = decode_datetime_cursor(cursor)
+        query = query.where(
+            tuple_(AttemptHistory.created_at, AttemptHistory.id) < tuple_(created_at, attempt_id)
+        )
+    
+    attempts = (await db.scalars(
+        query.order_by(AttemptHistory.created_at.desc(), AttemptHistory.id.desc())
+        .offset(skip)
+        .limit(limit + 1)
+    )).all()
+    
+    headers = {}
+    if len(attempts) > limit:
+        attempts = attempts[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(attempts[-1].created_at, attempts[-1].id)
     
-    attempts = query.order_by(AttemptHistory.created_at.desc()).offset(skip).limit(limit).all()
-    return attempts
+    return json_response(ATTEMPT_LIST_ADAPTER, attempts, headers, from_attributes=True)
 
 
 @router.get("/{player_id}/stats", response_model=PlayerStats)
-def get_player_stats(player_id: str, db: Session = Depends(get_db)):
-    player = db.query(Player).filter(Player.id == player_id).first()
-    if not player:
+async def get_player_stats(player_id: str, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(Player, PlayerStatistics)
+        .outerjoin(PlayerStatistics, PlayerStatistics.player_id == Player.id)
+        .where(Player.id == player_id)
+    )
+    row = result.first()
+    if not row:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    attempts = db.query(AttemptHistory).filter(AttemptHistory.player_id == player_id).all()
-    
-    total_attempts = len(attempts)
-    correct_attempts = sum(1 for a in attempts if a.is_correct)
-    
-    say_word_attempts = [a for a in attempts if a.feature_type == 1]
-    find_object_attempts = [a for a in attempts if a.feature_type == 2]
-    
-    say_word_correct = sum(1 for a in say_word_attempts if a.is_correct)
-    find_object_correct = sum(1 for a in find_object_attempts if a.is_correct)
-    
-    total_score = sum(a.score for a in attempts)
-    average_score = total_score / total_attempts if total_attempts > 0 else 0
-    accuracy_percentage = (correct_attempts / total_attempts * 100) if total_attempts > 0 else 0
-    
-    return PlayerStats(
-        player_id=player_id,
-        player_name=player.name,
-        total_attempts=total_attempts,
-        correct_attempts=correct_attempts,
-        accuracy_percentage=round(accuracy_percentage, 2),
-        say_word_attempts=len(say_word_attempts),
-        say_word_correct=say_word_correct,
-        find_object_attempts=len(find_object_attempts),
-        find_object_correct=find_object_correct,
-        average_score=round(average_score, 2)
-    )
+    player, stats = row
+    return PlayerStatsService.to_response(player, stats)
 
 
 @router.delete("/{player_id}")
-def delete_player(player_id: str, db: Session = Depends(get_db)):
-    player = db.query(Player).filter(Player.id == player_id).first()
+async def delete_player(player_id: str, db: AsyncSession = Depends(get_db)):
+    player = await db.get(Player, player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    db.delete(player)
-    db.commit()
+    await db.execute(delete(PlayerStatistics).where(PlayerStatistics.player_id == player_id))
+    await db.delete(player)
+    await db.commit()
     return {"message": "Player deleted successfully"}
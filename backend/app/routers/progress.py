@@ -1,111 +1,124 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.database import get_db
-from app.models.progress import PlayerProgress
+from app.etag import ETAG_HEADER, make_etag, not_modified
+from app.responses import json_response
 from app.models.player import Player
-from app.models.object import Object
+from app.models.progress import PlayerProgress
+from app.negotiation import MsgPackRoute
 from app.schemas.progress import (
     ProgressResponse,
     RecordProgressRequest,
     RecordProgressResponse,
     ProgressSummary,
+    ProgressSummaryExpansion,
 )
+from app.services.catalog import catalog_cache
+from app.services.progress import ProgressService
+from app.services.review_scheduler import ReviewScheduler
 
-router = APIRouter(prefix="/progress", tags=["progress"])
-
+router = APIRouter(prefix="/progress", tags=["progress"], route_class=MsgPackRoute)
 
-def get_or_create_player(db: Session, player_id: str) -> Player:
-    player = db.query(Player).filter(Player.id == player_id).first()
-    if not player:
-        player = Player(id=player_id, name=f"Player_{player_id[:8]}")
-        db.add(player)
-        db.commit()
-        db.refresh(player)
-    return player
+PROGRESS_LIST_ADAPTER = TypeAdapter(List[ProgressResponse])
 
 
 @router.post("/record", response_model=RecordProgressResponse)
-def record_progress(request: RecordProgressRequest, db: Session = Depends(get_db)):
-    get_or_create_player(db, request.player_id)
-    
-    obj = db.query(Object).filter(Object.id == request.object_id).first()
-    if not obj:
+async def record_progress(request: RecordProgressRequest, db: AsyncSession = Depends(get_db)):
+    snapshot = await catalog_cache.get_with(db, object_ids=[request.object_id])
+    if request.object_id not in snapshot.objects_by_id:
         raise HTTPException(status_code=404, detail=f"Object {request.object_id} not found")
     
-    progress = db.query(PlayerProgress).filter(
-        PlayerProgress.player_id == request.player_id,
-        PlayerProgress.object_id == request.object_id
-    ).first()
-    
-    if not progress:
-        progress = PlayerProgress(
-            player_id=request.player_id,
-            object_id=request.object_id,
-            last_rating=0.0,
-            practice_count=0,
-            consecutive_failed_attempts=0,
-            is_learned=False
-        )
-        db.add(progress)
-    
-    progress.last_rating = request.rating
-    progress.practice_count += 1
+    await ProgressService.touch_player(db, request.player_id)
+    progress, newly_learned = await ProgressService.record(
+        db, request.player_id, request.object_id, request.rating
+    )
+    await db.commit()
     
-    if request.rating >= 4.0:
-        progress.consecutive_failed_attempts = 0
-        if not progress.is_learned:
-            progress.is_learned = True
+    if ReviewScheduler.is_passing(request.rating):
+        if newly_learned:
             message = "Congratulations! You learned this word!"
         else:
             message = "Great job! Keep it up!"
     else:
-        progress.consecutive_failed_attempts += 1
         if progress.consecutive_failed_attempts >= 3:
             message = "Let me help you practice this word."
         else:
             message = "Keep trying! You're doing great!"
     
-    db.commit()
-    db.refresh(progress)
-    
     return RecordProgressResponse(
         success=True,
         is_learned=progress.is_learned,
         last_rating=progress.last_rating,
         practice_count=progress.practice_count,
         consecutive_failed_attempts=progress.consecutive_failed_attempts,
+        interval_days=progress.interval_days,
+        next_due_at=progress.next_due_at,
         message=message
     )
 
 
 @router.get("/{player_id}", response_model=List[ProgressResponse])
-def get_player_progress(player_id: str, db: Session = Depends(get_db)):
-    progress_list = db.query(PlayerProgress).filter(
+async def get_player_progress(
+    player_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
+    version = await db.scalar(select(Player.progress_version).where(Player.id == player_id))
+    if version is not None:
+        cached = not_modified(request, response, make_etag(player_id, version, request.url))
+        if cached:
+            return cached
+    
+    progress_list = await db.scalars(select(PlayerProgress).where(
         PlayerProgress.player_id == player_id
-    ).all()
-    return progress_list
+    ))
+    headers = {ETAG_HEADER: response.headers[ETAG_HEADER]} if version is not None else None
+    return json_response(PROGRESS_LIST_ADAPTER, progress_list.all(), headers, from_attributes=True)
 
 
-@router.get("/{player_id}/{object_id}", response_model=Optional[ProgressResponse])
-def get_object_progress(player_id: str, object_id: str, db: Session = Depends(get_db)):
-    progress = db.query(PlayerProgress).filter(
-        PlayerProgress.player_id == player_id,
-        PlayerProgress.object_id == object_id
-    ).first()
-    return progress
+@router.get("/{player_id}/due", response_model=List[ProgressResponse])
+async def get_due_progress(
+    player_id: str,
+    limit: int = Query(10, ge=1, le=100),
+    include_upcoming: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    due = await db.scalars(ReviewScheduler.due_query(
+        player_id, limit, include_upcoming=include_upcoming
+    ))
+    return due.all()
 
 
 @router.get("/{player_id}/summary", response_model=ProgressSummary)
-def get_progress_summary(player_id: str, db: Session = Depends(get_db)):
-    progress_list = db.query(PlayerProgress).filter(
-        PlayerProgress.player_id == player_id
-    ).all()
+async def get_progress_summary(
+    player_id: str,
+    request: Request,
+    response: Response,
+    expand: List[ProgressSummaryExpansion] = Query([], description="Optional sections to include"),
+    db: AsyncSession = Depends(get_db)
+):
+    counters = (await db.execute(
+        select(Player.learned_count, Player.progress_version).where(Player.id == player_id)
+    )).first()
+    total_learned = 0
+    if counters:
+        total_learned, version = counters
+        cached = not_modified(request, response, make_etag(player_id, version, request.url))
+        if cached:
+            return cached
     
-    total_learned = sum(1 for p in progress_list if p.is_learned)
     total_stars = total_learned
     
-    progress_by_object = {p.object_id: p for p in progress_list}
+    progress_by_object = None
+    if ProgressSummaryExpansion.PROGRESS_BY_OBJECT in expand:
+        progress_list = await db.scalars(select(PlayerProgress).where(
+            PlayerProgress.player_id == player_id
+        ))
+        progress_by_object = {p.object_id: p for p in progress_list}
     
     return ProgressSummary(
         player_id=player_id,
@@ -115,10 +128,17 @@ def get_progress_summary(player_id: str, db: Session = Depends(get_db)):
     )
 
 
+@router.get("/{player_id}/{object_id}", response_model=Optional[ProgressResponse])
+async def get_object_progress(player_id: str, object_id: str, db: AsyncSession = Depends(get_db)):
+    progress = await db.scalar(select(PlayerProgress).where(
+        PlayerProgress.player_id == player_id,
+        PlayerProgress.object_id == object_id
+    ))
+    return progress
+
+
 @router.delete("/{player_id}")
-def reset_player_progress(player_id: str, db: Session = Depends(get_db)):
-    db.query(PlayerProgress).filter(
-        PlayerProgress.player_id == player_id
-    ).delete()
-    db.commit()
+async def reset_player_progress(player_id: str, db: AsyncSession = Depends(get_db)):
+    await ProgressService.reset(db, player_id)
+    await db.commit()
     return {"success": True, "message": "Progress reset successfully"}
@@ -1,13 +1,15 @@
 from app.schemas.player import PlayerCreate, PlayerResponse, PlayerStats
 from app.schemas.object import (
     ObjectCreate, ObjectResponse, ObjectImageCreate, ObjectImageResponse,
-    BoundingBoxCreate, BoundingBoxResponse
+    BoundingBoxCreate, BoundingBoxResponse, UploadJobResponse, UploadJobStatus
+)
+from app.schemas.attempt import (
+    AttemptCreate, AttemptResponse, SayWordRequest, SpeechHypothesis, FindObjectRequest
 )
-from app.schemas.attempt import AttemptCreate, AttemptResponse, SayWordRequest, FindObjectRequest
 
 __all__ = [
     "PlayerCreate", "PlayerResponse", "PlayerStats",
     "ObjectCreate", "ObjectResponse", "ObjectImageCreate", "ObjectImageResponse",
-    "BoundingBoxCreate", "BoundingBoxResponse",
-    "AttemptCreate", "AttemptResponse", "SayWordRequest", "FindObjectRequest"
+    "BoundingBoxCreate", "BoundingBoxResponse", "UploadJobResponse", "UploadJobStatus",
+    "AttemptCreate", "AttemptResponse", "SayWordRequest", "SpeechHypothesis", "FindObjectRequest"
 ]
@@ -1,6 +1,6 @@
-from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from typing import Annotated, List, Literal, Optional, Union
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 
 class AttemptCreate(BaseModel):
@@ -26,14 +26,32 @@ class AttemptResponse(BaseModel):
     is_correct: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SpeechHypothesis(BaseModel):
+    text: str
+    confidence: Optional[float] = Field(None, ge=0, le=1, description="Recognizer confidence (0-1)")
 
 
 class SayWordRequest(BaseModel):
     player_id: str
     object_id: str
-    spoken_text: str
+    spoken_text: Optional[str] = None
+    hypotheses: Optional[List[SpeechHypothesis]] = Field(
+        None, min_length=1, max_length=10, description="Recognizer n-best list, most likely first"
+    )
+
+    @model_validator(mode="after")
+    def require_transcript(self):
+        if self.spoken_text is None and not self.hypotheses:
+            raise ValueError("Either spoken_text or hypotheses is required")
+        return self
+
+    def transcripts(self) -> list[SpeechHypothesis]:
+        if self.hypotheses:
+            return self.hypotheses
+        return [SpeechHypothesis(text=self.spoken_text)]
 
 
 class SayWordResponse(BaseModel):
@@ -43,6 +61,7 @@ class SayWordResponse(BaseModel):
     spoken_text: str
     feedback: str
     attempt_id: str
+    hypothesis_index: int = 0
 
 
 class FindObjectRequest(BaseModel):
@@ -58,3 +77,62 @@ class FindObjectResponse(BaseModel):
     feedback: str
     correct_location: Optional[dict] = None
     attempt_id: str
+
+
+# Fields shared by offline attempts. Device timestamps are stored as naive UTC,
+# like the server's own utcnow() ones; an offset-aware value would be rejected
+# by Postgres TIMESTAMP columns and sort wrongly on SQLite.
+class BatchItemBase(BaseModel):
+    player_id: str
+    created_at: Optional[datetime] = Field(None, description="When the attempt happened on the device")
+    client_attempt_id: Optional[str] = Field(
+        None, min_length=1, max_length=64,
+        description="Idempotency key; an attempt resent with the same key is only recorded once"
+    )
+
+    @field_validator("created_at")
+    @classmethod
+    def naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
+class SayWordBatchItem(BatchItemBase):
+    type: Literal["say_word"]
+    object_id: str
+    spoken_text: str
+
+
+class FindObjectBatchItem(BatchItemBase):
+    type: Literal["find_object"]
+    object_image_id: str
+    tap_x: float = Field(..., ge=0, le=1, description="X coordinate of tap (0-1 normalized)")
+    tap_y: float = Field(..., ge=0, le=1, description="Y coordinate of tap (0-1 normalized)")
+
+
+AttemptBatchItem = Annotated[Union[SayWordBatchItem, FindObjectBatchItem], Field(discriminator="type")]
+
+
+class AttemptBatchRequest(BaseModel):
+    attempts: List[AttemptBatchItem] = Field(..., min_length=1, max_length=500)
+
+
+class AttemptBatchResult(BaseModel):
+    index: int
+    type: str
+    success: bool
+    error: Optional[str] = None
+    score: Optional[int] = None
+    is_correct: Optional[bool] = None
+    feedback: Optional[str] = None
+    correct_location: Optional[dict] = None
+    attempt_id: Optional[str] = None
+    duplicate: bool = False
+
+
+class AttemptBatchResponse(BaseModel):
+    accepted: int
+    rejected: int
+    duplicates: int = 0
+    results: List[AttemptBatchResult]
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ImageType(str, Enum):
@@ -26,8 +26,7 @@ class BoundingBoxResponse(BaseModel):
     height: float
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class ObjectImageCreate(BaseModel):
@@ -41,11 +40,13 @@ class ObjectImageResponse(BaseModel):
     object_id: str
     image_url: str
     image_type: str
+    source_image_id: Optional[str] = None
     created_at: datetime
     bounding_boxes: List[BoundingBoxResponse] = []
+    # Resized copies of an original; empty on the copies themselves.
+    derivatives: List["ObjectImageResponse"] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class ObjectCreate(BaseModel):
@@ -60,8 +61,7 @@ class ObjectResponse(BaseModel):
     created_at: datetime
     images: List[ObjectImageResponse] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class ObjectListResponse(BaseModel):
@@ -72,5 +72,28 @@ class ObjectListResponse(BaseModel):
     thumbnail_url: Optional[str] = None
     flashcard_url: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+class UploadJobStatus(str, Enum):
+    QUEUED = "queued"
+    UPLOADING = "uploading"
+    RETRYING = "retrying"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class UploadJobResponse(BaseModel):
+    job_id: str
+    object_id: str
+    image_type: str
+    status: UploadJobStatus
+    attempts: int
+    error: Optional[str] = None
+    image: Optional[ObjectImageResponse] = None
+    derivatives: List[ObjectImageResponse] = []
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
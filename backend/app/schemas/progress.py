@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from enum import Enum
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
 
@@ -9,6 +10,11 @@ class ProgressBase(BaseModel):
     practice_count: int = 0
     consecutive_failed_attempts: int = 0
     is_learned: bool = False
+    ease_factor: float = 2.5
+    interval_days: int = 0
+    repetitions: int = 0
+    next_due_at: Optional[datetime] = None
+    learned_at: Optional[datetime] = None
 
 
 class ProgressCreate(BaseModel):
@@ -23,15 +29,18 @@ class ProgressResponse(ProgressBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ProgressSummaryExpansion(str, Enum):
+    PROGRESS_BY_OBJECT = "progress_by_object"
 
 
 class ProgressSummary(BaseModel):
     player_id: str
     total_learned: int
     total_stars: int
-    progress_by_object: dict[str, ProgressResponse]
+    progress_by_object: Optional[dict[str, ProgressResponse]] = None
 
 
 class RecordProgressRequest(BaseModel):
@@ -46,4 +55,6 @@ class RecordProgressResponse(BaseModel):
     last_rating: float
     practice_count: int
     consecutive_failed_attempts: int
+    interval_days: int
+    next_due_at: Optional[datetime]
     message: str
@@ -1,4 +1,19 @@
-from app.services.scoring import ScoringService
+from app.services.scoring import ScoringService, BoxIndex
+from app.services.score_cache import ScoreCache, score_cache
+from app.services.pronunciation import PronunciationEngine, PronunciationScores, PronunciationTarget
 from app.services.cloudinary_service import CloudinaryService, cloudinary_service
+from app.services.fake_cloudinary import FakeCloudinaryService
+from app.services.blob_store import BlobStore, blob_store
+from app.services.catalog import CatalogCache, CatalogSnapshot, catalog_cache
+from app.services.player_stats import PlayerStatsService
+from app.services.progress import ProgressService
+from app.services.review_scheduler import ReviewScheduler
+from app.services.derivatives import DerivativeService, derivative_service
+from app.services.upload_pipeline import UploadJob, UploadPipeline, UploadQueueFull, upload_pipeline
 
-__all__ = ["ScoringService", "CloudinaryService", "cloudinary_service"]
+__all__ = [
+    "ScoringService", "BoxIndex", "CloudinaryService", "cloudinary_service", "FakeCloudinaryService",
+    "PronunciationEngine", "PronunciationScores", "PronunciationTarget", "ScoreCache", "score_cache",
+    "CatalogCache", "CatalogSnapshot", "catalog_cache", "PlayerStatsService", "ProgressService",
+    "ReviewScheduler", "BlobStore", "blob_store", "DerivativeService", "derivative_service", "UploadJob", "UploadPipeline", "UploadQueueFull", "upload_pipeline"
+]
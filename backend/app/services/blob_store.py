@@ -0,0 +1,82 @@
+import os
+import shutil
+import uuid
+from typing import Iterable
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import dialect_insert
+from app.models import StoredBlob
+
+BLOBS_DIR = "blobs"
+
+
+# Content-addressed store for local uploads: each distinct file is kept once
+# under UPLOAD_DIR/blobs/<sha[:2]>/<sha><ext>, however many ObjectImage rows
+# point at it. StoredBlob.ref_count tracks those rows (see app.models.blob),
+# and a file is removed only once its count drops to zero.
+class BlobStore:
+    def __init__(self, upload_dir: str = "uploads"):
+        self.upload_dir = upload_dir
+
+    def relative_path(self, sha256: str, extension: str) -> str:
+        return f"{BLOBS_DIR}/{sha256[:2]}/{sha256}{extension}"
+
+    def url(self, relative_path: str) -> str:
+        return f"/uploads/{relative_path}"
+
+    def absolute_path(self, relative_path: str) -> str:
+        return os.path.join(self.upload_dir, *relative_path.split("/"))
+
+    def put(self, source_path: str, sha256: str, extension: str) -> str:
+        relative_path = self.relative_path(sha256, extension)
+        path = self.absolute_path(relative_path)
+        if os.path.exists(path):
+            return relative_path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Stage next to the destination and rename, so readers never see a
+        # partial file; hard-link when the source is on the same filesystem.
+        staging = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.link(source_path, staging)
+        except OSError:
+            shutil.copyfile(source_path, staging)
+        os.replace(staging, path)
+        return relative_path
+
+    async def register(self, db: AsyncSession, sha256: str, relative_path: str, size: int, media_type: str):
+        # References are counted when the ObjectImage row is inserted in the
+        # same transaction, so a new blob starts at zero.
+        insert = dialect_insert(db)
+        await db.execute(
+            insert(StoredBlob)
+            .values(sha256=sha256, path=relative_path, size=size, media_type=media_type, ref_count=0)
+            .on_conflict_do_nothing(index_elements=[StoredBlob.sha256])
+        )
+
+    async def collect(self, db: AsyncSession, sha256s: Iterable[str]) -> int:
+        sha256s = [sha256 for sha256 in set(sha256s) if sha256]
+        if not sha256s:
+            return 0
+
+        # Rows are deleted before files, and uploaders re-check their file
+        # after committing, so a concurrent upload of the same bytes keeps it.
+        result = await db.execute(
+            delete(StoredBlob)
+            .where(StoredBlob.sha256.in_(sha256s), StoredBlob.ref_count <= 0)
+            .returning(StoredBlob.path)
+        )
+        paths = result.scalars().all()
+        await db.commit()
+
+        for relative_path in paths:
+            try:
+                os.remove(self.absolute_path(relative_path))
+            except FileNotFoundError:
+                pass
+        return len(paths)
+
+
+blob_store = BlobStore(upload_dir=os.getenv("UPLOAD_DIR", "uploads"))
@@ -0,0 +1,316 @@
+import asyncio
+import bisect
+import hashlib
+import os
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Collection, Mapping, Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.loaders import OBJECT_WITH_IMAGES
+from app.responses import ResponseCache
+from app.models import Object, ObjectImage
+from app.schemas.object import (
+    ObjectResponse, ObjectImageResponse, BoundingBoxResponse, ObjectListResponse
+)
+from app.services.pronunciation import PronunciationEngine
+from app.services.sampling import SamplingIndex
+from app.services.score_cache import score_cache
+from app.services.scoring import BoxIndex
+
+_OBJECTS_ADAPTER = TypeAdapter(tuple[ObjectResponse, ...])
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    objects: tuple[ObjectResponse, ...]
+    objects_by_id: Mapping[str, ObjectResponse]
+    objects_by_category: Mapping[str, tuple[ObjectResponse, ...]]
+    images_by_id: Mapping[str, ObjectImageResponse]
+    images_by_type: Mapping[str, tuple[ObjectImageResponse, ...]]
+    derivative_urls: Mapping[tuple[str, str], str]
+    box_indexes: Mapping[str, BoxIndex]
+    object_list: tuple[ObjectListResponse, ...]
+    object_list_by_category: Mapping[str, tuple[ObjectListResponse, ...]]
+    object_list_keys: tuple[tuple[str, str], ...]
+    object_list_keys_by_category: Mapping[str, tuple[tuple[str, str], ...]]
+    categories: tuple[str, ...]
+    pronunciation: PronunciationEngine
+    version: str
+    playable_objects: SamplingIndex[ObjectResponse]
+    balanced_playable_objects: SamplingIndex[ObjectResponse]
+    playable_objects_by_category: Mapping[str, SamplingIndex[ObjectResponse]]
+    playable_images: SamplingIndex[ObjectImageResponse]
+    balanced_playable_images: SamplingIndex[ObjectImageResponse]
+    playable_images_by_category: Mapping[str, SamplingIndex[ObjectImageResponse]]
+    built_at: float
+    responses: ResponseCache = field(default_factory=ResponseCache, compare=False)
+
+    def sample_object(self, category: Optional[str] = None, balanced: bool = False) -> Optional[ObjectResponse]:
+        if category:
+            index = self.playable_objects_by_category.get(category)
+        elif balanced:
+            index = self.balanced_playable_objects
+        else:
+            index = self.playable_objects
+        return index.sample() if index else None
+
+    def sample_find_object_image(
+        self, category: Optional[str] = None, balanced: bool = False
+    ) -> Optional[ObjectImageResponse]:
+        if category:
+            index = self.playable_images_by_category.get(category)
+        elif balanced:
+            index = self.balanced_playable_images
+        else:
+            index = self.playable_images
+        return index.sample() if index else None
+
+    def object_page(
+        self,
+        category: Optional[str] = None,
+        after: Optional[tuple[str, str]] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> tuple[list[ObjectListResponse], Optional[tuple[str, str]]]:
+        if category:
+            items = self.object_list_by_category.get(category, ())
+            keys = self.object_list_keys_by_category.get(category, ())
+        else:
+            items = self.object_list
+            keys = self.object_list_keys
+
+        start = bisect.bisect_right(keys, after) if after else 0
+        start += skip
+        page = list(items[start:start + limit])
+        next_key = keys[start + limit - 1] if page and start + limit < len(items) else None
+        return page, next_key
+
+    @classmethod
+    def build(cls, db_objects: list[Object]) -> "CatalogSnapshot":
+        db_objects = sorted(db_objects, key=lambda obj: (obj.name, obj.id))
+        objects = []
+        object_list = []
+        by_category: dict[str, list[ObjectResponse]] = {}
+        list_by_category: dict[str, list[ObjectListResponse]] = {}
+        images_by_id: dict[str, ObjectImageResponse] = {}
+        images_by_type: dict[str, list[ObjectImageResponse]] = {}
+        box_indexes: dict[str, BoxIndex] = {}
+        playable_images: dict[str, list[ObjectImageResponse]] = {}
+
+        for db_obj in db_objects:
+            # Derivatives are nested under their original rather than listed
+            # as images of their own; images_by_id still has every row.
+            derivatives: dict[str, list[ObjectImageResponse]] = {}
+            for db_image in db_obj.images:
+                if db_image.source_image_id:
+                    derivative = _image_response(db_image)
+                    derivatives.setdefault(db_image.source_image_id, []).append(derivative)
+                    images_by_id[derivative.id] = derivative
+
+            images = []
+            for db_image in db_obj.images:
+                if db_image.source_image_id:
+                    continue
+                image = _image_response(db_image, derivatives.get(db_image.id, []))
+                images.append(image)
+                images_by_id[image.id] = image
+                images_by_type.setdefault(image.image_type, []).append(image)
+                if image.bounding_boxes:
+                    box_indexes[image.id] = BoxIndex(
+                        [(box.x, box.y, box.width, box.height) for box in image.bounding_boxes]
+                    )
+                    playable_images.setdefault(db_obj.category, []).append(image)
+
+            obj = ObjectResponse(
+                id=db_obj.id,
+                name=db_obj.name,
+                category=db_obj.category,
+                created_at=db_obj.created_at,
+                images=images
+            )
+            objects.append(obj)
+            by_category.setdefault(obj.category, []).append(obj)
+
+            list_item = _list_item(obj)
+            object_list.append(list_item)
+            list_by_category.setdefault(obj.category, []).append(list_item)
+
+        # (original URL, image type) -> URL of the derivative of that type, for
+        # /uploads/...?variant= requests.
+        derivative_urls = {
+            (images_by_id[image.source_image_id].image_url, image.image_type): image.image_url
+            for image in images_by_id.values()
+            if image.source_image_id in images_by_id
+        }
+
+        objects = tuple(objects)
+        return cls(
+            objects=objects,
+            objects_by_id=MappingProxyType({obj.id: obj for obj in objects}),
+            objects_by_category=_freeze(by_category),
+            images_by_id=MappingProxyType(images_by_id),
+            images_by_type=_freeze(images_by_type),
+            derivative_urls=MappingProxyType(derivative_urls),
+            box_indexes=MappingProxyType(box_indexes),
+            object_list=tuple(object_list),
+            object_list_by_category=_freeze(list_by_category),
+            object_list_keys=tuple((item.name, item.id) for item in object_list),
+            object_list_keys_by_category=MappingProxyType({
+                category: tuple((item.name, item.id) for item in items)
+                for category, items in list_by_category.items()
+            }),
+            categories=tuple(sorted(by_category)),
+            pronunciation=PronunciationEngine((obj.name for obj in objects), cache=score_cache),
+            playable_objects=SamplingIndex(objects),
+            balanced_playable_objects=_balanced_index(by_category),
+            playable_objects_by_category=MappingProxyType(
+                {category: SamplingIndex(items) for category, items in by_category.items()}
+            ),
+            playable_images=SamplingIndex([img for items in playable_images.values() for img in items]),
+            balanced_playable_images=_balanced_index(playable_images),
+            playable_images_by_category=MappingProxyType(
+                {category: SamplingIndex(items) for category, items in playable_images.items()}
+            ),
+            version=hashlib.sha256(_OBJECTS_ADAPTER.dump_json(objects)).hexdigest(),
+            built_at=time.monotonic()
+        )
+
+
+def _image_response(db_image, derivatives: Optional[list[ObjectImageResponse]] = None) -> ObjectImageResponse:
+    return ObjectImageResponse(
+        id=db_image.id,
+        object_id=db_image.object_id,
+        image_url=db_image.image_url,
+        image_type=db_image.image_type,
+        source_image_id=db_image.source_image_id,
+        created_at=db_image.created_at,
+        bounding_boxes=[BoundingBoxResponse.model_validate(box) for box in db_image.bounding_boxes],
+        derivatives=derivatives or []
+    )
+
+
+def _list_item(obj: ObjectResponse) -> ObjectListResponse:
+    return ObjectListResponse(
+        id=obj.id,
+        name=obj.name,
+        category=obj.category,
+        image_count=len(obj.images),
+        thumbnail_url=_preferred_url(obj.images, "thumbnail"),
+        flashcard_url=_preferred_url(obj.images, "flashcard")
+    )
+
+
+# The first image of a type, preferring resized derivatives over originals
+# so the grid downloads device-sized files.
+def _preferred_url(images: list[ObjectImageResponse], image_type: str) -> Optional[str]:
+    fallback = None
+    for img in images:
+        for derivative in img.derivatives:
+            if derivative.image_type == image_type:
+                return derivative.image_url
+        if img.image_type == image_type:
+            fallback = fallback or img.image_url
+    return fallback
+
+
+# Weights each item by 1 / (size of its category) so every category is
+# equally likely, however unevenly the catalog is populated.
+def _balanced_index(groups: dict[str, list]) -> SamplingIndex:
+    items = []
+    weights = []
+    for group in groups.values():
+        items.extend(group)
+        weights.extend([1.0 / len(group)] * len(group))
+    return SamplingIndex(items, weights if items else None)
+
+
+def _freeze(groups: dict[str, list]) -> Mapping[str, tuple]:
+    return MappingProxyType({key: tuple(items) for key, items in groups.items()})
+
+
+class CatalogCache:
+    def __init__(self, ttl_seconds: float = 0):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and not self._is_expired(snapshot):
+            return snapshot
+
+        async with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and not self._is_expired(snapshot):
+                return snapshot
+            return await self._load(db)
+
+    # Writes rebuild the snapshot only on the worker that made them, so other
+    # workers can lack a new object or image until their snapshot expires. A
+    # miss is checked against the database, and the snapshot reloaded if the
+    # row exists; ids that exist nowhere cost one indexed query, not a reload.
+    async def get_with(
+        self,
+        db: AsyncSession,
+        object_ids: Collection[str] = (),
+        image_ids: Collection[str] = ()
+    ) -> CatalogSnapshot:
+        snapshot = await self.get(db)
+        if _contains(snapshot, object_ids, image_ids):
+            return snapshot
+
+        missing_objects = [object_id for object_id in object_ids if object_id not in snapshot.objects_by_id]
+        missing_images = [image_id for image_id in image_ids if image_id not in snapshot.images_by_id]
+        exists = (
+            missing_objects
+            and await db.scalar(select(Object.id).where(Object.id.in_(missing_objects)).limit(1))
+        ) or (
+            missing_images
+            and await db.scalar(select(ObjectImage.id).where(ObjectImage.id.in_(missing_images)).limit(1))
+        )
+        if not exists:
+            return snapshot
+
+        async with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and _contains(snapshot, object_ids, image_ids):
+                return snapshot
+            return await self._load(db)
+
+    async def rebuild(self, db: AsyncSession) -> CatalogSnapshot:
+        async with self._lock:
+            return await self._load(db)
+
+    def invalidate(self):
+        self._snapshot = None
+
+    async def _load(self, db: AsyncSession) -> CatalogSnapshot:
+        result = await db.execute(
+            select(Object)
+            .options(*OBJECT_WITH_IMAGES)
+            .execution_options(populate_existing=True)
+        )
+        db_objects = result.scalars().all()
+        snapshot = CatalogSnapshot.build(db_objects)
+        if self._snapshot is not None:
+            score_cache.invalidate_targets(self._snapshot.pronunciation.words - snapshot.pronunciation.words)
+        self._snapshot = snapshot
+        return snapshot
+
+    def _is_expired(self, snapshot: CatalogSnapshot) -> bool:
+        return self.ttl_seconds > 0 and time.monotonic() - snapshot.built_at > self.ttl_seconds
+
+
+def _contains(snapshot: CatalogSnapshot, object_ids: Collection[str], image_ids: Collection[str]) -> bool:
+    return (
+        all(object_id in snapshot.objects_by_id for object_id in object_ids)
+        and all(image_id in snapshot.images_by_id for image_id in image_ids)
+    )
+
+
+catalog_cache = CatalogCache(ttl_seconds=float(os.getenv("CATALOG_CACHE_TTL", "300")))
@@ -2,7 +2,7 @@ import os
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
-from typing import Optional
+from typing import Optional, Union
 
 
 class CloudinaryService:
@@ -44,7 +44,7 @@ class CloudinaryService:
     
     def upload_image(
         self,
-        file_data: bytes,
+        file_data: Union[bytes, str],
         folder: str = "speakeasy",
         public_id: Optional[str] = None,
         resource_type: str = "image",
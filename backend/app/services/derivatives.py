@@ -0,0 +1,150 @@
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import imaging
+from app.models import ObjectImage
+from app.models.object import ImageType
+from app.services.blob_store import BlobStore, blob_store
+from app.upload_stream import SPOOL_DIR
+
+# Derivative types generated from an uploaded original of each type. Find-object
+# scenes are left at full size so taps line up with their bounding boxes.
+DERIVATIVE_TYPES = {
+    ImageType.FLASHCARD.value: (ImageType.THUMBNAIL.value, ImageType.FLASHCARD.value),
+    ImageType.THUMBNAIL.value: (ImageType.THUMBNAIL.value,),
+}
+
+
+# Renders thumbnail and flashcard-sized copies of locally stored uploads in a
+# process pool, so decoding and resizing never holds the GIL of the API
+# process, stores them in the blob store and registers them as ObjectImage
+# rows pointing at their source.
+class DerivativeService:
+    def __init__(
+        self,
+        upload_dir: str = "uploads",
+        workers: int = 2,
+        image_format: str = "WEBP",
+        quality: int = 80,
+        enabled: bool = True,
+        blobs: Optional[BlobStore] = None,
+        spool_dir: str = SPOOL_DIR
+    ):
+        self.upload_dir = upload_dir
+        self.blobs = blobs if blobs is not None else blob_store
+        self.spool_dir = spool_dir
+        self.workers = workers
+        # Checked here rather than in the worker, where an unknown format would
+        # fail every render instead of the start-up.
+        self.image_format = image_format.upper()
+        if self.image_format not in imaging.FORMAT_EXTENSIONS:
+            allowed = " or ".join(repr(name.lower()) for name in imaging.FORMAT_EXTENSIONS)
+            raise ValueError(f"DERIVATIVE_FORMAT must be {allowed}, got {image_format!r}")
+        self.quality = quality
+        self.enabled = enabled and imaging.available()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls) -> "DerivativeService":
+        return cls(
+            upload_dir=os.getenv("UPLOAD_DIR", "uploads"),
+            workers=int(os.getenv("DERIVATIVE_WORKERS", "2")),
+            image_format=os.getenv("DERIVATIVE_FORMAT", "webp"),
+            quality=int(os.getenv("DERIVATIVE_QUALITY", "80")),
+            enabled=os.getenv("DERIVATIVES", "true").lower() not in ("0", "false", "no")
+        )
+
+    def source_path(self, image: ObjectImage) -> Optional[str]:
+        if not image.image_url.startswith("/uploads/"):
+            return None
+        path = os.path.join(self.upload_dir, *image.image_url[len("/uploads/"):].split("/"))
+        return path if os.path.isfile(path) else None
+
+    def wants(self, image: ObjectImage) -> bool:
+        return (
+            self.enabled
+            and image.source_image_id is None
+            and image.image_type in DERIVATIVE_TYPES
+            and self.source_path(image) is not None
+        )
+
+    async def create_for_image(self, db: AsyncSession, image: ObjectImage) -> list[ObjectImage]:
+        if not self.wants(image):
+            return []
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+        output_dir = tempfile.mkdtemp(dir=self.spool_dir)
+
+        def put(file_name: str, sha256: str) -> str:
+            return self.blobs.put(os.path.join(output_dir, file_name), sha256, os.path.splitext(file_name)[1])
+
+        try:
+            rendered = await self._render(image, output_dir)
+
+            derivatives = []
+            for image_type, file_name, media_type, sha256, size in rendered:
+                relative_path = await asyncio.to_thread(put, file_name, sha256)
+                await self.blobs.register(db, sha256, relative_path, size, media_type)
+                derivatives.append(ObjectImage(
+                    object_id=image.object_id,
+                    image_url=self.blobs.url(relative_path),
+                    image_type=image_type,
+                    source_image_id=image.id,
+                    blob_sha256=sha256
+                ))
+            db.add_all(derivatives)
+            await db.commit()
+
+            # A concurrent collect() may have removed an identical blob that
+            # was unreferenced until this commit; put it back.
+            for _, file_name, _, sha256, _ in rendered:
+                await asyncio.to_thread(put, file_name, sha256)
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+        return derivatives
+
+    async def _render(self, image: ObjectImage, output_dir: str) -> list[tuple[str, str, str, str, int]]:
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        try:
+            return await loop.run_in_executor(
+                pool,
+                imaging.render_derivatives,
+                self.source_path(image),
+                output_dir,
+                image.id,
+                DERIVATIVE_TYPES[image.image_type],
+                self.image_format,
+                self.quality
+            )
+        except BrokenProcessPool:
+            # A crashed worker (e.g. killed while decoding) breaks the whole
+            # pool; start a fresh one for the next image.
+            if self._executor is pool:
+                self._executor = None
+            pool.shutdown(wait=False)
+            raise
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers only import app.imaging, not the running app.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+
+derivative_service = DerivativeService.from_env()
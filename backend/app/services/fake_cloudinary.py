@@ -0,0 +1,73 @@
+import os
+import random
+import shutil
+import threading
+import time
+from typing import Optional, Union
+
+
+# Drop-in stand-in for CloudinaryService that stores uploads on local disk and
+# can inject latency and failures, so the upload pipeline can be exercised
+# without network access or credentials.
+class FakeCloudinaryService:
+    def __init__(
+        self,
+        root_dir: str,
+        url_prefix: str = "/uploads/fake-cloudinary",
+        latency_seconds: float = 0,
+        failure_rate: float = 0
+    ):
+        self.root_dir = root_dir
+        self.url_prefix = url_prefix.rstrip("/")
+        self.latency_seconds = latency_seconds
+        self.failure_rate = failure_rate
+        self.uploads = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    @property
+    def is_configured(self) -> bool:
+        return True
+
+    def upload_image(
+        self,
+        file_data: Union[bytes, str],
+        folder: str = "speakeasy",
+        public_id: Optional[str] = None,
+        resource_type: str = "image",
+        transformation: Optional[dict] = None
+    ) -> dict:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        if self.failure_rate and random.random() < self.failure_rate:
+            with self._lock:
+                self.failures += 1
+            raise ConnectionError("Simulated Cloudinary upload failure")
+
+        public_id = f"{folder}/{public_id or os.urandom(8).hex()}"
+        path = os.path.join(self.root_dir, *public_id.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Like the real uploader, file_data is either the image bytes or a local file path.
+        if isinstance(file_data, str):
+            shutil.copyfile(file_data, path)
+        else:
+            with open(path, "wb") as f:
+                f.write(file_data)
+
+        with self._lock:
+            self.uploads += 1
+        return {
+            "public_id": public_id,
+            "url": f"{self.url_prefix}/{public_id}",
+            "width": None,
+            "height": None,
+            "format": None,
+            "bytes": os.path.getsize(path),
+        }
+
+    def delete_image(self, public_id: str) -> bool:
+        path = os.path.join(self.root_dir, *public_id.split("/"))
+        if not os.path.exists(path):
+            return False
+        os.remove(path)
+        return True
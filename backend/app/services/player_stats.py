@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, delete, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import dialect_insert
+from app.models import Player, AttemptHistory, PlayerStatistics
+from app.schemas.player import PlayerStats
+
+FEATURE_COLUMNS = {
+    1: ("say_word_attempts", "say_word_correct", "say_word_score_total"),
+    2: ("find_object_attempts", "find_object_correct", "find_object_score_total"),
+}
+
+COUNTER_COLUMNS = [column for columns in FEATURE_COLUMNS.values() for column in columns]
+
+
+class PlayerStatsService:
+    @staticmethod
+    async def record_attempts(
+        db: AsyncSession,
+        player_id: str,
+        feature_type: int,
+        attempts: int,
+        correct: int,
+        score_total: int
+    ):
+        attempts_col, correct_col, score_col = FEATURE_COLUMNS[feature_type]
+        increments = {attempts_col: attempts, correct_col: correct, score_col: score_total}
+
+        table = PlayerStatistics.__table__
+        values = {column: 0 for column in COUNTER_COLUMNS}
+        values.update(increments)
+
+        stmt = dialect_insert(db)(table).values(
+            player_id=player_id, updated_at=datetime.utcnow(), **values
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.player_id],
+            set_={
+                **{column: table.c[column] + stmt.excluded[column] for column in increments},
+                "updated_at": stmt.excluded.updated_at,
+            }
+        )
+        await db.execute(stmt)
+
+    @staticmethod
+    async def record_attempt(db: AsyncSession, attempt: AttemptHistory):
+        await PlayerStatsService.record_attempts(
+            db,
+            attempt.player_id,
+            attempt.feature_type,
+            attempts=1,
+            correct=1 if attempt.is_correct else 0,
+            score_total=attempt.score
+        )
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, player_id: Optional[str] = None) -> int:
+        query = select(
+            AttemptHistory.player_id,
+            AttemptHistory.feature_type,
+            func.count(AttemptHistory.id),
+            func.sum(case((AttemptHistory.is_correct, 1), else_=0)),
+            func.coalesce(func.sum(AttemptHistory.score), 0)
+        ).group_by(AttemptHistory.player_id, AttemptHistory.feature_type)
+
+        delete_query = delete(PlayerStatistics)
+        if player_id:
+            query = query.where(AttemptHistory.player_id == player_id)
+            delete_query = delete_query.where(PlayerStatistics.player_id == player_id)
+
+        rows: dict[str, dict] = {}
+        for row_player_id, feature_type, attempts, correct, score_total in await db.execute(query):
+            if feature_type not in FEATURE_COLUMNS:
+                continue
+            row = rows.setdefault(row_player_id, {column: 0 for column in COUNTER_COLUMNS})
+            attempts_col, correct_col, score_col = FEATURE_COLUMNS[feature_type]
+            row[attempts_col] = attempts
+            row[correct_col] = correct or 0
+            row[score_col] = score_total
+
+        await db.execute(delete_query)
+        now = datetime.utcnow()
+        db.add_all(
+            PlayerStatistics(player_id=row_player_id, updated_at=now, **row)
+            for row_player_id, row in rows.items()
+        )
+        await db.commit()
+        return len(rows)
+
+    @staticmethod
+    def to_response(player: Player, stats: Optional[PlayerStatistics]) -> PlayerStats:
+        if stats is None:
+            stats = PlayerStatistics(**{column: 0 for column in COUNTER_COLUMNS})
+
+        total_attempts = stats.total_attempts
+        average_score = stats.score_total / total_attempts if total_attempts > 0 else 0
+        accuracy_percentage = (stats.correct_attempts / total_attempts * 100) if total_attempts > 0 else 0
+
+        return PlayerStats(
+            player_id=player.id,
+            player_name=player.name,
+            total_attempts=total_attempts,
+            correct_attempts=stats.correct_attempts,
+            accuracy_percentage=round(accuracy_percentage, 2),
+            say_word_attempts=stats.say_word_attempts,
+            say_word_correct=stats.say_word_correct,
+            find_object_attempts=stats.find_object_attempts,
+            find_object_correct=stats.find_object_correct,
+            average_score=round(average_score, 2)
+        )
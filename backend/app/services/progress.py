@@ -0,0 +1,95 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Row, delete, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import dialect_insert
+from app.models import Player, PlayerProgress
+from app.services.review_scheduler import ReviewScheduler
+
+
+class ProgressService:
+    # Creates the player on first use and otherwise bumps its progress
+    # version, which the progress ETags are derived from.
+    @staticmethod
+    async def touch_player(db: AsyncSession, player_id: str):
+        table = Player.__table__
+        stmt = dialect_insert(db)(table).values(
+            id=player_id, name=f"Player_{player_id[:8]}", progress_version=1
+        )
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={"progress_version": table.c.progress_version + 1}
+        ))
+
+    @staticmethod
+    async def record(
+        db: AsyncSession,
+        player_id: str,
+        object_id: str,
+        rating: float,
+        now: Optional[datetime] = None
+    ) -> tuple[Row, bool]:
+        now = now or datetime.utcnow()
+        passing = ReviewScheduler.is_passing(rating)
+        table = PlayerProgress.__table__
+
+        stmt = dialect_insert(db)(table).values(
+            player_id=player_id,
+            object_id=object_id,
+            last_rating=rating,
+            practice_count=1,
+            consecutive_failed_attempts=0 if passing else 1,
+            is_learned=passing,
+            learned_at=now if passing else None,
+            created_at=now,
+            updated_at=now,
+            **ReviewScheduler.initial_values(rating, now)
+        )
+
+        # Counters are incremented against the stored row, so concurrent
+        # records for the same word cannot lose an update.
+        changes = {
+            "last_rating": stmt.excluded.last_rating,
+            "practice_count": table.c.practice_count + 1,
+            "updated_at": now,
+            **ReviewScheduler.update_values(table, rating, now, db.get_bind().dialect.name),
+        }
+        if passing:
+            changes["consecutive_failed_attempts"] = 0
+            changes["is_learned"] = True
+            changes["learned_at"] = func.coalesce(table.c.learned_at, now)
+        else:
+            changes["consecutive_failed_attempts"] = table.c.consecutive_failed_attempts + 1
+
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.player_id, table.c.object_id],
+            set_=changes
+        ).returning(
+            table.c.is_learned,
+            table.c.last_rating,
+            table.c.practice_count,
+            table.c.consecutive_failed_attempts,
+            table.c.interval_days,
+            table.c.next_due_at,
+            table.c.learned_at
+        )
+
+        row = (await db.execute(stmt)).one()
+        newly_learned = passing and row.learned_at == now
+        if newly_learned:
+            await db.execute(
+                update(Player)
+                .where(Player.id == player_id)
+                .values(learned_count=Player.learned_count + 1)
+            )
+        return row, newly_learned
+
+    @staticmethod
+    async def reset(db: AsyncSession, player_id: str):
+        await db.execute(delete(PlayerProgress).where(PlayerProgress.player_id == player_id))
+        await db.execute(
+            update(Player)
+            .where(Player.id == player_id)
+            .values(learned_count=0, progress_version=Player.progress_version + 1)
+        )
@@ -0,0 +1,203 @@
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+from Levenshtein import ratio
+from rapidfuzz import process
+from rapidfuzz.distance import Indel
+
+from app.services.score_cache import ScoreCache
+from app.services.scoring import ScoringService
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def normalize(text: str) -> str:
+    return text.lower().strip()
+
+
+def _soundex(token: str) -> str:
+    letters = [char for char in token if "a" <= char <= "z"]
+    if not letters:
+        return ""
+
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], "")
+    for char in letters[1:]:
+        digit = _SOUNDEX_CODES.get(char, "")
+        if digit and digit != previous:
+            code += digit
+        if char not in "hw":
+            previous = digit
+    return (code + "000")[:4]
+
+
+def phonetic_key(text: str) -> str:
+    return " ".join(filter(None, (_soundex(token) for token in normalize(text).split())))
+
+
+@dataclass(frozen=True)
+class PronunciationTarget:
+    word: str
+    normalized: str
+    phonetic: str
+    feedback: tuple[str, ...]
+
+    @classmethod
+    def from_word(cls, word: str) -> "PronunciationTarget":
+        return cls(
+            word=word,
+            normalized=normalize(word),
+            phonetic=phonetic_key(word),
+            feedback=ScoringService.pronunciation_feedback(word)
+        )
+
+    def result(self, score: int, perfect: bool) -> tuple[int, bool, str]:
+        if perfect:
+            return 100, True, ScoringService.PERFECT_FEEDBACK
+        return (
+            score,
+            score >= ScoringService.CORRECT_THRESHOLD,
+            self.feedback[ScoringService.feedback_tier(score)]
+        )
+
+
+@dataclass(frozen=True)
+class PronunciationScores:
+    spoken_texts: tuple[str, ...]
+    targets: tuple[PronunciationTarget, ...]
+    scores: np.ndarray
+    perfect: np.ndarray
+    phonetic_matches: np.ndarray
+
+    @property
+    def is_correct(self) -> np.ndarray:
+        return self.perfect | (self.scores >= ScoringService.CORRECT_THRESHOLD)
+
+    def feedback(self, row: int, column: int) -> str:
+        if self.perfect[row, column]:
+            return ScoringService.PERFECT_FEEDBACK
+        tier = ScoringService.feedback_tier(int(self.scores[row, column]))
+        return self.targets[column].feedback[tier]
+
+
+# Scores agree with ScoringService.score_pronunciation: Indel normalized
+# similarity is the same measure as Levenshtein.ratio.
+class PronunciationEngine:
+    def __init__(self, words: Iterable[str] = (), cache: Optional[ScoreCache] = None):
+        self._targets = {word: PronunciationTarget.from_word(word) for word in words}
+        self.cache = cache
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def target(self, word: str) -> PronunciationTarget:
+        target = self._targets.get(word)
+        return target if target is not None else PronunciationTarget.from_word(word)
+
+    @property
+    def words(self) -> frozenset[str]:
+        return frozenset(self._targets)
+
+    # use_cache=False for one-off text such as streamed partials, which would
+    # only push reusable answers out of the cache.
+    def score(self, target_word: str, spoken_text: str, use_cache: bool = True) -> tuple[int, bool, str]:
+        target = self.target(target_word)
+        spoken = normalize(spoken_text)
+        if spoken == target.normalized:
+            return target.result(100, True)
+
+        cache = self.cache if use_cache else None
+        if cache is not None:
+            cached = cache.get(target_word, spoken)
+            if cached is not None:
+                return cached
+
+        result = target.result(int(ratio(target.normalized, spoken) * 100), False)
+        if cache is not None:
+            cache.put(target_word, spoken, result)
+        return result
+
+    def score_hypotheses(
+        self,
+        target_word: str,
+        spoken_texts: Sequence[str],
+        confidences: Optional[Sequence[Optional[float]]] = None
+    ) -> tuple[int, tuple[int, bool, str]]:
+        if len(spoken_texts) == 1:
+            return 0, self.score(target_word, spoken_texts[0])
+
+        # Best score wins; ties go to the more confident, then higher ranked, hypothesis.
+        column = self.score_matrix(spoken_texts, [target_word])
+        scores = column.scores[:, 0]
+        confidence = np.array(
+            [value or 0.0 for value in confidences] if confidences else [0.0] * len(spoken_texts),
+            dtype=np.float64
+        )
+        best = int(np.lexsort((np.arange(len(scores)), -confidence, -scores))[0])
+        return best, column.targets[0].result(int(scores[best]), bool(column.perfect[best, 0]))
+
+    def score_pairs(self, pairs: Sequence[tuple[str, str]]) -> list[tuple[int, bool, str]]:
+        if not pairs:
+            return []
+
+        targets = [self.target(target_word) for target_word, _ in pairs]
+        spoken = [normalize(spoken_text) for _, spoken_text in pairs]
+        results: list[Optional[tuple[int, bool, str]]] = [None] * len(pairs)
+
+        pending: dict[tuple[str, str], list[int]] = {}
+        for index, (target, text) in enumerate(zip(targets, spoken)):
+            if text == target.normalized:
+                results[index] = target.result(100, True)
+            elif (target.word, text) in pending:
+                pending[(target.word, text)].append(index)
+            elif self.cache is not None and (cached := self.cache.get(target.word, text)) is not None:
+                results[index] = cached
+            else:
+                pending[(target.word, text)] = [index]
+
+        if pending:
+            similarity = process.cpdist(
+                [text for _, text in pending],
+                [self.target(word).normalized for word, _ in pending],
+                scorer=Indel.normalized_similarity,
+                dtype=np.float64
+            )
+            scores = (similarity * 100).astype(np.int64).tolist()
+            for ((word, text), indexes), score in zip(pending.items(), scores):
+                result = targets[indexes[0]].result(score, False)
+                for index in indexes:
+                    results[index] = result
+                if self.cache is not None:
+                    self.cache.put(word, text, result)
+
+        return results
+
+    def score_matrix(
+        self, spoken_texts: Sequence[str], target_words: Sequence[str]
+    ) -> PronunciationScores:
+        targets = tuple(self.target(target_word) for target_word in target_words)
+        spoken = [normalize(spoken_text) for spoken_text in spoken_texts]
+        normalized_targets = [target.normalized for target in targets]
+
+        similarity = process.cdist(
+            spoken, normalized_targets, scorer=Indel.normalized_similarity, dtype=np.float64
+        )
+        perfect = np.array(spoken, dtype=object)[:, None] == np.array(normalized_targets, dtype=object)
+        spoken_phonetic = np.array([phonetic_key(text) or None for text in spoken], dtype=object)
+        target_phonetic = np.array([target.phonetic for target in targets], dtype=object)
+
+        return PronunciationScores(
+            spoken_texts=tuple(spoken_texts),
+            targets=targets,
+            scores=np.where(perfect, 100, (similarity * 100).astype(np.int64)),
+            perfect=perfect.astype(bool),
+            phonetic_matches=(spoken_phonetic[:, None] == target_phonetic).astype(bool)
+        )
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import Integer, Interval, Select, Table, case, cast, func, select
+from sqlalchemy.sql import ColumnElement
+
+from app.models import PlayerProgress
+
+
+# SM-2 style scheduling. Ratings are on the app's 0-5 star scale, and a rating
+# that marks a word as learned also counts as a successful review. The update
+# is built as SQL so it can run inside the progress upsert against the stored
+# row, without reading it first.
+class ReviewScheduler:
+    PASSING_RATING = 4.0
+    MAX_RATING = 5.0
+    DEFAULT_EASE = 2.5
+    MIN_EASE = 1.3
+    FIRST_INTERVAL_DAYS = 1
+    SECOND_INTERVAL_DAYS = 6
+
+    @staticmethod
+    def is_passing(rating: float) -> bool:
+        return rating >= ReviewScheduler.PASSING_RATING
+
+    @staticmethod
+    def ease_delta(rating: float) -> float:
+        missed = ReviewScheduler.MAX_RATING - min(max(rating, 0.0), ReviewScheduler.MAX_RATING)
+        return 0.1 - missed * (0.08 + missed * 0.02)
+
+    @staticmethod
+    def initial_values(rating: float, now: datetime) -> dict:
+        passing = ReviewScheduler.is_passing(rating)
+        return {
+            "ease_factor": max(ReviewScheduler.MIN_EASE, ReviewScheduler.DEFAULT_EASE + ReviewScheduler.ease_delta(rating)),
+            "interval_days": ReviewScheduler.FIRST_INTERVAL_DAYS,
+            "repetitions": 1 if passing else 0,
+            "next_due_at": now + timedelta(days=ReviewScheduler.FIRST_INTERVAL_DAYS),
+        }
+
+    @staticmethod
+    def update_values(table: Table, rating: float, now: datetime, dialect: str) -> dict:
+        ease = table.c.ease_factor + ReviewScheduler.ease_delta(rating)
+
+        if ReviewScheduler.is_passing(rating):
+            grown = _round_half_up(table.c.interval_days * table.c.ease_factor, dialect)
+            interval = case(
+                (table.c.repetitions == 0, ReviewScheduler.FIRST_INTERVAL_DAYS),
+                (table.c.repetitions == 1, ReviewScheduler.SECOND_INTERVAL_DAYS),
+                (grown < 1, 1),
+                else_=grown
+            )
+            repetitions = table.c.repetitions + 1
+        else:
+            interval = ReviewScheduler.FIRST_INTERVAL_DAYS
+            repetitions = 0
+
+        return {
+            "ease_factor": case((ease < ReviewScheduler.MIN_EASE, ReviewScheduler.MIN_EASE), else_=ease),
+            "interval_days": interval,
+            "repetitions": repetitions,
+            "next_due_at": _add_days(now, interval, dialect),
+        }
+
+    @staticmethod
+    def due_query(
+        player_id: str,
+        limit: int,
+        now: Optional[datetime] = None,
+        include_upcoming: bool = False
+    ) -> Select:
+        query = select(PlayerProgress).where(
+            PlayerProgress.player_id == player_id,
+            PlayerProgress.next_due_at.is_not(None)
+        )
+        if not include_upcoming:
+            query = query.where(PlayerProgress.next_due_at <= (now or datetime.utcnow()))
+        return query.order_by(PlayerProgress.next_due_at).limit(limit)
+
+
+def _round_half_up(value: ColumnElement, dialect: str) -> ColumnElement:
+    # Intervals are positive, so truncating value + 0.5 rounds half up. SQLite
+    # truncates on CAST; Postgres rounds, so it needs an explicit FLOOR.
+    if dialect == "postgresql":
+        return cast(func.floor(value + 0.5), Integer)
+    return cast(value + 0.5, Integer)
+
+
+def _add_days(now: datetime, days, dialect: str) -> ColumnElement:
+    if dialect == "postgresql":
+        return now + func.make_interval(0, 0, 0, days, type_=Interval)
+    if dialect == "sqlite":
+        return func.strftime(
+            "%Y-%m-%d %H:%M:%f", now.strftime("%Y-%m-%d %H:%M:%S.%f"), func.printf("+%d days", days)
+        )
+    raise NotImplementedError(f"Review scheduling is not supported on {dialect}")
@@ -0,0 +1,59 @@
+import random
+from typing import Generic, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+# Weighted picks use a Vose alias table built once per index, so both
+# uniform and weighted sampling are O(1).
+class SamplingIndex(Generic[T]):
+    def __init__(self, items: Sequence[T], weights: Optional[Sequence[float]] = None):
+        self.items = tuple(items)
+        self._probability: Optional[tuple[float, ...]] = None
+        self._alias: Optional[tuple[int, ...]] = None
+
+        if weights is not None:
+            if len(weights) != len(self.items):
+                raise ValueError("weights must have one entry per item")
+            self._build_alias_table(weights)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __bool__(self) -> bool:
+        return bool(self.items)
+
+    def sample(self, rng: random.Random = random) -> T:
+        if not self.items:
+            raise IndexError("cannot sample from an empty index")
+
+        index = rng.randrange(len(self.items))
+        if self._probability is None or rng.random() < self._probability[index]:
+            return self.items[index]
+        return self.items[self._alias[index]]
+
+    def _build_alias_table(self, weights: Sequence[float]):
+        total = float(sum(weights))
+        if any(w < 0 for w in weights) or total <= 0:
+            raise ValueError("weights must be non-negative with a positive sum")
+
+        n = len(weights)
+        scaled = [w * n / total for w in weights]
+        probability = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            probability[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+
+        self._probability = tuple(probability)
+        self._alias = tuple(alias)
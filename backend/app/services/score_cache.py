@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from app.services.scoring import ScoringService
+
+ScoreResult = tuple[int, bool, str]
+
+
+def _scoring_rules() -> tuple:
+    return (
+        ScoringService.CORRECT_THRESHOLD,
+        ScoringService.PERFECT_FEEDBACK,
+        ScoringService.FEEDBACK_TIERS,
+    )
+
+
+# LRU memo of pronunciation results keyed on (target word, normalized spoken
+# text). Entries also expire after ttl_seconds, and the whole cache is dropped
+# if the thresholds or feedback tiers on ScoringService change.
+class ScoreCache:
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, str], tuple[float, ScoreResult]] = OrderedDict()
+        self._rules = _scoring_rules()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, target_word: str, spoken: str) -> Optional[ScoreResult]:
+        if self.max_entries <= 0:
+            return None
+
+        key = (target_word, spoken)
+        with self._lock:
+            self._check_rules()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, result = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, target_word: str, spoken: str, result: ScoreResult):
+        if self.max_entries <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else 0
+        with self._lock:
+            self._check_rules()
+            self._entries[(target_word, spoken)] = (expires_at, result)
+            self._entries.move_to_end((target_word, spoken))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def invalidate_targets(self, target_words: Iterable[str]):
+        target_words = set(target_words)
+        if not target_words:
+            return
+        with self._lock:
+            for key in [key for key in self._entries if key[0] in target_words]:
+                del self._entries[key]
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _check_rules(self):
+        rules = _scoring_rules()
+        if rules != self._rules:
+            self._entries.clear()
+            self._rules = rules
+            self.invalidations += 1
+
+
+score_cache = ScoreCache(
+    max_entries=int(os.getenv("SCORE_CACHE_SIZE", "10000")),
+    ttl_seconds=float(os.getenv("SCORE_CACHE_TTL", "3600"))
+)
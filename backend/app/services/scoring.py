@@ -1,39 +1,60 @@
+import math
+from typing import Sequence
+
+import numpy as np
 from Levenshtein import ratio
 
+TAP_TOLERANCE = 0.05
+
 
 class ScoringService:
+    CORRECT_THRESHOLD = 80
+    PERFECT_FEEDBACK = "Perfect! You said it correctly!"
+    FEEDBACK_TIERS = (
+        (90, "Excellent! Very close to perfect!"),
+        (80, "Great job! That's correct!"),
+        (60, "Good try! The word is '{target_word}'. Try again!"),
+        (40, "Keep practicing! The word is '{target_word}'."),
+        (0, "Let's try again! The word is '{target_word}'."),
+    )
+
     @staticmethod
     def score_pronunciation(target_word: str, spoken_text: str) -> tuple[int, bool, str]:
         target_lower = target_word.lower().strip()
         spoken_lower = spoken_text.lower().strip()
         
         if target_lower == spoken_lower:
-            return 100, True, "Perfect! You said it correctly!"
+            return 100, True, ScoringService.PERFECT_FEEDBACK
         
         similarity = ratio(target_lower, spoken_lower)
         score = int(similarity * 100)
         
-        is_correct = score >= 80
-        
-        if score >= 90:
-            feedback = "Excellent! Very close to perfect!"
-        elif score >= 80:
-            feedback = "Great job! That's correct!"
-        elif score >= 60:
-            feedback = f"Good try! The word is '{target_word}'. Try again!"
-        elif score >= 40:
-            feedback = f"Keep practicing! The word is '{target_word}'."
-        else:
-            feedback = f"Let's try again! The word is '{target_word}'."
+        is_correct = score >= ScoringService.CORRECT_THRESHOLD
+        feedback = ScoringService.pronunciation_feedback(target_word)[
+            ScoringService.feedback_tier(score)
+        ]
         
         return score, is_correct, feedback
 
+    @staticmethod
+    def feedback_tier(score: int) -> int:
+        for tier, (minimum, _) in enumerate(ScoringService.FEEDBACK_TIERS):
+            if score >= minimum:
+                return tier
+        return len(ScoringService.FEEDBACK_TIERS) - 1
+
+    @staticmethod
+    def pronunciation_feedback(target_word: str) -> tuple[str, ...]:
+        return tuple(
+            message.format(target_word=target_word) for _, message in ScoringService.FEEDBACK_TIERS
+        )
+
     @staticmethod
     def check_tap_location(
         tap_x: float, tap_y: float,
         box_x: float, box_y: float,
         box_width: float, box_height: float,
-        tolerance: float = 0.05
+        tolerance: float = TAP_TOLERANCE
     ) -> tuple[bool, int]:
         expanded_x = max(0, box_x - tolerance)
         expanded_y = max(0, box_y - tolerance)
@@ -60,3 +81,102 @@ class ScoringService:
             return True, score
         
         return False, 0
+
+    @staticmethod
+    def check_tap_locations(
+        tap_x: Sequence[float], tap_y: Sequence[float],
+        boxes: Sequence[Sequence[float]],
+        tolerance: float = TAP_TOLERANCE
+    ) -> tuple[np.ndarray, np.ndarray]:
+        taps_x = np.asarray(tap_x, dtype=np.float64)[:, None]
+        taps_y = np.asarray(tap_y, dtype=np.float64)[:, None]
+        bounds = _box_bounds(np.asarray(boxes, dtype=np.float64).reshape(-1, 4), tolerance)
+        return _hit_scores(taps_x, taps_y, *bounds)
+
+
+# Expanded hit areas plus the centre and half-diagonal of each box, computed
+# with the same operations as check_tap_location so results agree exactly.
+def _box_bounds(boxes: np.ndarray, tolerance: float) -> tuple[np.ndarray, ...]:
+    box_x, box_y, box_width, box_height = boxes.T
+    expanded_x = np.maximum(0, box_x - tolerance)
+    expanded_y = np.maximum(0, box_y - tolerance)
+    expanded_width = np.minimum(1 - expanded_x, box_width + 2 * tolerance)
+    expanded_height = np.minimum(1 - expanded_y, box_height + 2 * tolerance)
+    center_x = box_x + box_width / 2
+    center_y = box_y + box_height / 2
+    max_distance = np.sqrt((box_width / 2) ** 2 + (box_height / 2) ** 2)
+    return (
+        expanded_x, expanded_y,
+        expanded_x + expanded_width, expanded_y + expanded_height,
+        center_x, center_y, max_distance
+    )
+
+
+def _hit_scores(
+    taps_x: np.ndarray, taps_y: np.ndarray,
+    min_x: np.ndarray, min_y: np.ndarray, max_x: np.ndarray, max_y: np.ndarray,
+    center_x: np.ndarray, center_y: np.ndarray, max_distance: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    hits = (min_x <= taps_x) & (taps_x <= max_x) & (min_y <= taps_y) & (taps_y <= max_y)
+    distance = np.sqrt((taps_x - center_x) ** 2 + (taps_y - center_y) ** 2)
+    has_area = max_distance > 0
+    accuracy = np.maximum(0, 1 - distance / np.where(has_area, max_distance, 1))
+    scores = np.where(has_area, (70 + accuracy * 30).astype(np.int64), 100)
+    return hits, np.where(hits, scores, 0)
+
+
+class BoxIndex:
+    def __init__(self, boxes: Sequence[Sequence[float]], tolerance: float = TAP_TOLERANCE):
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self.tolerance = tolerance
+        self._bounds = _box_bounds(self.boxes, tolerance)
+
+        # Uniform grid over the unit square; each cell lists the boxes whose
+        # expanded area overlaps it, in their original order.
+        self.grid_size = max(1, min(16, math.isqrt(len(self.boxes))))
+        min_x, min_y, max_x, max_y = self._bounds[:4]
+        first_col, last_col = self._cells(min_x), self._cells(max_x)
+        first_row, last_row = self._cells(min_y), self._cells(max_y)
+
+        cells: dict[int, list[int]] = {}
+        for box in range(len(self.boxes)):
+            for row in range(first_row[box], last_row[box] + 1):
+                for col in range(first_col[box], last_col[box] + 1):
+                    cells.setdefault(row * self.grid_size + col, []).append(box)
+        self._cells_to_boxes = {cell: np.array(boxes, dtype=np.intp) for cell, boxes in cells.items()}
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def _cells(self, values: np.ndarray) -> np.ndarray:
+        cells = np.floor(np.asarray(values, dtype=np.float64) * self.grid_size).astype(np.intp)
+        return np.clip(cells, 0, self.grid_size - 1)
+
+    def hit_test(
+        self, tap_x: Sequence[float], tap_y: Sequence[float]
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (is_correct, best_score, box_position) for each tap.
+
+        box_position is -1 for a miss. Ties go to the earliest box, as with a
+        loop that only keeps strictly better scores.
+        """
+        taps_x = np.asarray(tap_x, dtype=np.float64).reshape(-1)
+        taps_y = np.asarray(tap_y, dtype=np.float64).reshape(-1)
+        best_score = np.zeros(len(taps_x), dtype=np.int64)
+        box_position = np.full(len(taps_x), -1, dtype=np.intp)
+
+        tap_cells = self._cells(taps_y) * self.grid_size + self._cells(taps_x)
+        for cell in np.unique(tap_cells):
+            candidates = self._cells_to_boxes.get(int(cell))
+            if candidates is None:
+                continue
+            taps = np.flatnonzero(tap_cells == cell)
+            bounds = [bound[candidates] for bound in self._bounds]
+            hits, scores = _hit_scores(taps_x[taps, None], taps_y[taps, None], *bounds)
+            best = scores.argmax(axis=1)
+            rows = np.arange(len(taps))
+            found = hits[rows, best]
+            best_score[taps[found]] = scores[rows, best][found]
+            box_position[taps[found]] = candidates[best[found]]
+
+        return box_position >= 0, best_score, box_position
@@ -0,0 +1,303 @@
+import asyncio
+import os
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import session_scope
+from app.models import Object, ObjectImage, UploadJobRecord
+from app.schemas.object import ObjectImageResponse, UploadJobResponse, UploadJobStatus
+from app.services.catalog import catalog_cache
+from app.services.blob_store import BlobStore, blob_store
+from app.services.cloudinary_service import cloudinary_service
+from app.services.derivatives import DerivativeService, derivative_service
+from app.services.fake_cloudinary import FakeCloudinaryService
+from app.upload_stream import SPOOL_DIR, SpooledUpload
+
+
+class UploadQueueFull(Exception):
+    pass
+
+
+@dataclass
+class UploadJob:
+    job_id: str
+    object_id: str
+    image_type: str
+    status: UploadJobStatus = UploadJobStatus.QUEUED
+    attempts: int = 0
+    error: Optional[str] = None
+    image: Optional[ObjectImageResponse] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+
+    def update(self, status: UploadJobStatus, error: Optional[str] = None):
+        self.status = status
+        self.error = error
+        self.updated_at = datetime.utcnow()
+
+
+# Runs image uploads off the event loop. The blocking storage call (Cloudinary
+# HTTPS upload or a local disk write) goes to a bounded thread pool, failed
+# attempts are retried with jittered exponential backoff, and the ObjectImage
+# row is only created once the upload has succeeded. Local uploads then get
+# resized derivatives. At most max_pending jobs are queued or running on each
+# worker; past that, submit() raises UploadQueueFull. Job state is kept in the
+# upload_jobs table, so a poll can land on any worker, and finished jobs are
+# forgotten after job_retention seconds.
+class UploadPipeline:
+    def __init__(
+        self,
+        storage=None,
+        derivatives: Optional[DerivativeService] = None,
+        blobs: Optional[BlobStore] = None,
+        spool_dir: str = SPOOL_DIR,
+        workers: int = 4,
+        max_pending: int = 32,
+        max_attempts: int = 3,
+        retry_delay: float = 0.5,
+        job_retention: float = 86400
+    ):
+        self.storage = storage if storage is not None else cloudinary_service
+        self.derivatives = derivatives if derivatives is not None else derivative_service
+        self.blobs = blobs if blobs is not None else blob_store
+        self.spool_dir = spool_dir
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.job_retention = job_retention
+        self._tasks: set[asyncio.Task] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls) -> "UploadPipeline":
+        storage = None
+        if os.getenv("CLOUDINARY_FAKE", "").lower() in ("1", "true", "yes"):
+            storage = FakeCloudinaryService(
+                root_dir=os.path.join(os.getenv("UPLOAD_DIR", "uploads"), "fake-cloudinary"),
+                latency_seconds=float(os.getenv("CLOUDINARY_FAKE_LATENCY", "0")),
+                failure_rate=float(os.getenv("CLOUDINARY_FAKE_FAILURE_RATE", "0"))
+            )
+        return cls(
+            storage=storage,
+            workers=int(os.getenv("UPLOAD_WORKERS", "4")),
+            max_pending=int(os.getenv("UPLOAD_QUEUE_SIZE", "32")),
+            max_attempts=int(os.getenv("UPLOAD_MAX_ATTEMPTS", "3")),
+            retry_delay=float(os.getenv("UPLOAD_RETRY_DELAY", "0.5")),
+            job_retention=float(os.getenv("UPLOAD_JOB_RETENTION", "86400"))
+        )
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    @property
+    def is_full(self) -> bool:
+        return self.pending >= self.max_pending
+
+    async def get(self, db: AsyncSession, job_id: str) -> Optional[UploadJobResponse]:
+        record = await db.get(UploadJobRecord, job_id)
+        if record is None:
+            return None
+        image = None
+        if record.image_id:
+            snapshot = await catalog_cache.get_with(db, image_ids=[record.image_id])
+            image = snapshot.images_by_id.get(record.image_id)
+        return UploadJobResponse(
+            job_id=record.id,
+            object_id=record.object_id,
+            image_type=record.image_type,
+            status=record.status,
+            attempts=record.attempts,
+            error=record.error,
+            image=image,
+            derivatives=image.derivatives if image else [],
+            created_at=record.created_at,
+            updated_at=record.updated_at
+        )
+
+    async def submit(
+        self,
+        object_id: str,
+        image_type: str,
+        upload: SpooledUpload,
+        folder: str,
+        public_id: str
+    ) -> UploadJob:
+        if self.is_full:
+            raise UploadQueueFull(f"{self.pending} uploads already pending")
+
+        job = UploadJob(job_id=str(uuid.uuid4()), object_id=object_id, image_type=image_type)
+        async with session_scope() as db:
+            await db.execute(delete(UploadJobRecord).where(
+                UploadJobRecord.status.in_([UploadJobStatus.COMPLETED.value, UploadJobStatus.FAILED.value]),
+                UploadJobRecord.updated_at < job.created_at - timedelta(seconds=self.job_retention)
+            ))
+            db.add(UploadJobRecord(
+                id=job.job_id,
+                object_id=object_id,
+                image_type=image_type,
+                status=job.status.value,
+                attempts=job.attempts,
+                created_at=job.created_at,
+                updated_at=job.updated_at
+            ))
+            await db.commit()
+        task = asyncio.create_task(self._run(job, upload, folder, public_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def close(self):
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.derivatives.close()
+
+    async def stats(self, db: AsyncSession) -> dict:
+        if isinstance(self.storage, FakeCloudinaryService):
+            storage = "fake-cloudinary"
+        else:
+            storage = "cloudinary" if self.storage.is_configured else "local"
+        counts = {status.value: 0 for status in UploadJobStatus}
+        rows = await db.execute(
+            select(UploadJobRecord.status, func.count()).group_by(UploadJobRecord.status)
+        )
+        counts.update({status: count for status, count in rows.all()})
+        return {
+            "storage": storage,
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "jobs": counts,
+        }
+
+    async def _set_status(self, job: UploadJob, status: UploadJobStatus, error: Optional[str] = None):
+        job.update(status, error)
+        async with session_scope() as db:
+            await db.execute(update(UploadJobRecord).where(UploadJobRecord.id == job.job_id).values(
+                status=job.status.value,
+                attempts=job.attempts,
+                error=job.error,
+                image_id=job.image.id if job.image else None,
+                updated_at=job.updated_at
+            ))
+            await db.commit()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="upload")
+        return self._executor
+
+    async def _run(self, job: UploadJob, upload: SpooledUpload, folder: str, public_id: str):
+        try:
+            await self._upload(job, upload, folder, public_id)
+        finally:
+            if os.path.exists(upload.path):
+                os.remove(upload.path)
+
+    async def _upload(self, job: UploadJob, upload: SpooledUpload, folder: str, public_id: str):
+        loop = asyncio.get_running_loop()
+        while True:
+            job.attempts += 1
+            await self._set_status(job, UploadJobStatus.UPLOADING)
+            try:
+                image_url = await loop.run_in_executor(self._pool(), self._store, upload, folder, public_id)
+                break
+            except Exception as e:
+                if job.attempts >= self.max_attempts:
+                    await self._set_status(
+                        job, UploadJobStatus.FAILED, f"Upload failed after {job.attempts} attempt(s): {e}"
+                    )
+                    return
+                await self._set_status(job, UploadJobStatus.RETRYING, str(e))
+                await asyncio.sleep(self._backoff(job.attempts))
+
+        try:
+            job.image, created = await self._create_image(job, image_url, upload)
+        except Exception as e:
+            await self._set_status(job, UploadJobStatus.FAILED, f"Failed to save image: {e}")
+            return
+        if job.image is None:
+            await self._set_status(job, UploadJobStatus.FAILED, "Object not found")
+            return
+
+        error = None
+        if created and not self.storage.is_configured:
+            await self._set_status(job, UploadJobStatus.PROCESSING)
+            try:
+                await self._create_derivatives(job.image.id)
+            except Exception as e:
+                error = f"Image saved, but derivatives failed: {e}"
+        await self._set_status(job, UploadJobStatus.COMPLETED, error)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps retries from a burst of failed uploads from lining up.
+        return random.uniform(0, self.retry_delay * 2 ** (attempt - 1))
+
+    # The spooled file is read from disk by the storage backend, or linked
+    # into the local blob store, so the image is never held in memory.
+    def _store(self, upload: SpooledUpload, folder: str, public_id: str) -> str:
+        if self.storage.is_configured:
+            return self.storage.upload_image(file_data=upload.path, folder=folder, public_id=public_id)["url"]
+        return self.blobs.url(self.blobs.put(upload.path, upload.sha256, upload.extension))
+
+    async def _create_image(
+        self, job: UploadJob, image_url: str, upload: SpooledUpload
+    ) -> tuple[Optional[ObjectImageResponse], bool]:
+        blob_sha256 = None if self.storage.is_configured else upload.sha256
+        async with session_scope() as db:
+            if await db.get(Object, job.object_id) is None:
+                return None, False
+
+            if blob_sha256:
+                # Re-uploading the same file for the same object and type
+                # (e.g. a retrying script) returns the existing image.
+                existing = await db.scalar(select(ObjectImage.id).where(
+                    ObjectImage.object_id == job.object_id,
+                    ObjectImage.image_type == job.image_type,
+                    ObjectImage.blob_sha256 == blob_sha256,
+                    ObjectImage.source_image_id.is_(None)
+                ))
+                if existing:
+                    snapshot = await catalog_cache.get_with(db, image_ids=[existing])
+                    return snapshot.images_by_id.get(existing), False
+
+                relative_path = self.blobs.relative_path(upload.sha256, upload.extension)
+                await self.blobs.register(db, blob_sha256, relative_path, upload.size, upload.media_type)
+
+            db_image = ObjectImage(
+                object_id=job.object_id,
+                image_url=image_url,
+                image_type=job.image_type,
+                blob_sha256=blob_sha256
+            )
+            db.add(db_image)
+            await db.commit()
+            if blob_sha256:
+                # A concurrent collect() may have removed the identical blob
+                # while it was unreferenced; put it back from the spool file.
+                await asyncio.to_thread(self.blobs.put, upload.path, upload.sha256, upload.extension)
+
+            snapshot = await catalog_cache.rebuild(db)
+            return snapshot.images_by_id[db_image.id], True
+
+    async def _create_derivatives(self, image_id: str):
+        async with session_scope() as db:
+            db_image = await db.get(ObjectImage, image_id)
+            if db_image is None or not self.derivatives.wants(db_image):
+                return
+            await self.derivatives.create_for_image(db, db_image)
+            await catalog_cache.rebuild(db)
+
+
+upload_pipeline = UploadPipeline.from_env()
@@ -0,0 +1,153 @@
+import mimetypes
+import os
+import re
+from email.utils import parsedate
+from typing import Optional
+from urllib.parse import parse_qs
+
+from sqlalchemy import select
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, RedirectResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.database import session_scope
+from app.models import ObjectImage
+from app.responses import choose_encoding
+from app.services.blob_store import BLOBS_DIR
+from app.services.catalog import catalog_cache
+
+# Blob URLs change whenever their bytes do, so clients can keep them for a
+# year without revalidating. Anything else is revalidated with its ETag.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+# Precompressed copies stored next to a file, e.g. scene.svg.br.
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+_BLOB_PATH = re.compile(rf"^{BLOBS_DIR}/[0-9a-f]{{2}}/(?P<sha256>[0-9a-f]{{64}})\.[a-z0-9]+$")
+
+# Uploads stored before the blob store: <uuid4><extension of the client's
+# filename> at the top of UPLOAD_DIR. Only these can have been adopted, so
+# other missing paths never reach the database.
+_LEGACY_PATH = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}(?:\.[^/]*)?$")
+
+
+def _variant(scope: Scope) -> Optional[str]:
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("variant")
+    return values[0] if values else None
+
+
+# StaticFiles for UPLOAD_DIR. On top of Starlette's Range, If-Range and
+# If-None-Match handling it:
+# - marks content-addressed blobs immutable, with their SHA-256 as ETag,
+# - answers If-Match and If-Unmodified-Since with 412 when they fail,
+# - serves a .br/.gz sidecar when one exists and the client accepts it,
+# - serves the derivative of an original for ?variant=thumbnail|flashcard,
+#   falling back to the original when there is none,
+# - redirects the old URL of a legacy upload adopted into the blob store to
+#   its blob, query string included,
+# - refuses dot segments and anything under blobs/ that is not a blob, so
+#   hidden and half-written files are never served.
+class CachedStaticFiles(StaticFiles):
+    def __init__(self, *, directory: str, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.root = os.path.realpath(directory)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        relative_path = path.replace(os.sep, "/")
+        if any(part.startswith(".") for part in relative_path.split("/")):
+            raise HTTPException(status_code=404)
+        if relative_path.startswith(f"{BLOBS_DIR}/") and not _BLOB_PATH.match(relative_path):
+            raise HTTPException(status_code=404)
+
+        variant = _variant(scope)
+        if variant:
+            async with session_scope() as db:
+                snapshot = await catalog_cache.get(db)
+            variant_url = snapshot.derivative_urls.get((f"/uploads/{relative_path}", variant))
+            if variant_url:
+                path = os.path.join(*variant_url[len("/uploads/"):].split("/"))
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as exc:
+            if exc.status_code != 404 or not _LEGACY_PATH.match(relative_path):
+                raise
+            redirect = await self.adopted_url(f"/uploads/{relative_path}", scope)
+            if redirect is None:
+                raise
+            return redirect
+
+    # Looked up in the database rather than the catalog snapshot, which does
+    # not see adoptions made by scripts.gc_blobs until it is rebuilt.
+    async def adopted_url(self, legacy_url: str, scope: Scope) -> Optional[Response]:
+        async with session_scope() as db:
+            image_url = await db.scalar(
+                select(ObjectImage.image_url).where(ObjectImage.legacy_url == legacy_url).limit(1)
+            )
+        if image_url is None:
+            return None
+        query_string = scope.get("query_string", b"").decode("latin-1")
+        return RedirectResponse(f"{image_url}?{query_string}" if query_string else image_url, status_code=301)
+
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        relative_path = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+        blob = _BLOB_PATH.match(relative_path)
+        variant = _variant(scope)
+
+        headers = {
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if blob and not variant else REVALIDATE_CACHE_CONTROL
+        }
+        if variant:
+            headers["Content-Location"] = f"/uploads/{relative_path}"
+
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+        sidecars = [
+            encoding for encoding, suffix in PRECOMPRESSED_SUFFIXES.items()
+            if os.path.isfile(full_path + suffix)
+        ]
+        encoding = "identity"
+        if sidecars:
+            headers["Vary"] = "Accept-Encoding"
+            encoding = choose_encoding(request_headers.get("accept-encoding"), sidecars + ["identity"])
+            if encoding != "identity":
+                full_path += PRECOMPRESSED_SUFFIXES[encoding]
+                stat_result = os.stat(full_path)
+                headers["Content-Encoding"] = encoding
+
+        if blob:
+            # Each content coding is a different representation, so it gets its own strong ETag.
+            sha256 = blob.group("sha256")
+            headers["ETag"] = f'"{sha256}"' if encoding == "identity" else f'"{sha256}-{encoding}"'
+
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result
+        )
+        if self.is_precondition_failed(response.headers, request_headers):
+            return Response(status_code=412, headers={"ETag": response.headers["etag"]})
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def is_precondition_failed(self, response_headers: Headers, request_headers: Headers) -> bool:
+        if if_match := request_headers.get("if-match"):
+            if if_match.strip() == "*":
+                return False
+            # If-Match uses the strong comparison, so weak tags never match.
+            return response_headers["etag"] not in [tag.strip() for tag in if_match.split(",")]
+
+        if_unmodified_since = parsedate(request_headers.get("if-unmodified-since", ""))
+        last_modified = parsedate(response_headers["last-modified"])
+        return if_unmodified_since is not None and last_modified is not None and last_modified > if_unmodified_since
@@ -0,0 +1,38 @@
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.database import engine as sync_engine, async_engine
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def assert_max_queries(limit: int, engine: Optional[Engine] = None):
+    if engine is None:
+        engine = async_engine.sync_engine if async_engine is not None else sync_engine
+
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+    if counter.count > limit:
+        executed = "\n".join(f"  {statement}" for statement in counter.statements)
+        raise AssertionError(
+            f"Expected at most {limit} queries, {counter.count} were executed:\n{executed}"
+        )
@@ -0,0 +1,188 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException, Request
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", str(20 * 1024 * 1024)))
+SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or os.path.join(tempfile.gettempdir(), "speakeasy-uploads")
+
+# Leading bytes of the image formats we accept, with the media type and
+# extension they are stored under. The client's filename and Content-Type
+# are never trusted.
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png", ".png"),
+    (b"GIF87a", "image/gif", ".gif"),
+    (b"GIF89a", "image/gif", ".gif"),
+)
+SNIFF_SIZE = 12
+
+
+def sniff_image(head: bytes) -> Optional[tuple[str, str]]:
+    for signature, media_type, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return media_type, extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp", ".webp"
+    return None
+
+
+@dataclass(frozen=True)
+class SpooledUpload:
+    path: str
+    size: int
+    sha256: str
+    media_type: str
+    extension: str
+
+
+def check_content_length(request: Request, max_bytes: int = MAX_UPLOAD_SIZE):
+    # Rejects oversized requests before any of the body is read. Multipart
+    # framing adds a little on top of the file itself.
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + UPLOAD_CHUNK_SIZE:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+
+
+class _MultipartFileField:
+    def __init__(self, field_name: str):
+        self.field_name = field_name.encode()
+        self.found = False
+        self.in_file = False
+        self.chunks: list[bytes] = []
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self):
+        self._disposition = b""
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        # Only the file is kept; every other part is dropped as it is parsed.
+        if self.in_file:
+            self.chunks.append(data[start:end])
+
+    def on_part_end(self):
+        self.in_file = False
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        if not self.found and options.get(b"name") == self.field_name and b"filename" in options:
+            self.found = self.in_file = True
+
+
+# Yields the bytes of one file field of a multipart/form-data body as they
+# arrive, so spool_upload checks the size limit and the image signature while
+# the request streams in, exactly as for a raw body. The whole body, framing
+# and other fields included, is also held to the limit, which covers chunked
+# requests that send no Content-Length.
+async def multipart_file_chunks(
+    request: Request,
+    field_name: str = "file",
+    max_bytes: int = MAX_UPLOAD_SIZE
+) -> AsyncIterator[bytes]:
+    _, params = parse_options_header(request.headers.get("content-type"))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise HTTPException(status_code=400, detail="Missing boundary in multipart body")
+
+    field = _MultipartFileField(field_name)
+    parser = MultipartParser(boundary, field.callbacks())
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_bytes + UPLOAD_CHUNK_SIZE:
+                raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+            parser.write(chunk)
+            if field.chunks:
+                data = b"".join(field.chunks)
+                field.chunks.clear()
+                yield data
+        parser.finalize()
+    except FormParserError:
+        raise HTTPException(status_code=400, detail="Invalid multipart body")
+
+    if not field.found:
+        raise HTTPException(status_code=400, detail="Missing file field")
+
+
+# Streams an upload to a temp file in spool_dir one chunk at a time, checking
+# the size limit and the image signature and hashing the content as the bytes
+# arrive, so memory use per upload stays at one chunk whatever the file size.
+async def spool_upload(
+    chunks: AsyncIterator[bytes],
+    spool_dir: str,
+    max_bytes: int = MAX_UPLOAD_SIZE
+) -> SpooledUpload:
+    os.makedirs(spool_dir, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=spool_dir, suffix=".part")
+    os.close(fd)
+
+    size = 0
+    digest = hashlib.sha256()
+    head = b""
+    sniffed = None
+    try:
+        async with aiofiles.open(path, "wb") as f:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+                if sniffed is None:
+                    head += chunk[:SNIFF_SIZE]
+                    if len(head) >= SNIFF_SIZE:
+                        sniffed = _sniff_or_reject(head)
+                digest.update(chunk)
+                await f.write(chunk)
+
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Uploaded file is empty")
+        if sniffed is None:
+            sniffed = _sniff_or_reject(head)
+    except BaseException:
+        await aiofiles.os.remove(path)
+        raise
+
+    media_type, extension = sniffed
+    return SpooledUpload(
+        path=path, size=size, sha256=digest.hexdigest(), media_type=media_type, extension=extension
+    )
+
+
+def _sniff_or_reject(head: bytes) -> tuple[str, str]:
+    sniffed = sniff_image(head)
+    if sniffed is None:
+        raise HTTPException(status_code=415, detail="Upload is not a JPEG, PNG, GIF or WebP image")
+    return sniffed
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Compare JSON and MessagePack encoding for typical API payloads.
+
+Builds representative responses (a say-word result, a batch of attempt
+results, a player's progress list and a page of the object catalog) and
+reports encode time and body size, raw and gzipped, for each format.
+"transcode" is the path the API takes when a client asks for msgpack:
+the JSON the handler rendered is decoded and re-packed.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_msgpack [--repeat 2000] [--rows 100]
+"""
+
+import argparse
+import gzip
+import json
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+import msgpack
+from pydantic import TypeAdapter
+
+from app.schemas.attempt import AttemptBatchResponse, AttemptBatchResult, SayWordResponse
+from app.schemas.object import ObjectListResponse
+from app.schemas.progress import ProgressResponse
+
+
+def _id() -> str:
+    return str(uuid.uuid4())
+
+
+def payloads(rows: int) -> dict[str, tuple[TypeAdapter, object]]:
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    player_id = _id()
+
+    say_word = SayWordResponse(
+        score=87, is_correct=True, target_word="Elephant", spoken_text="elefant",
+        feedback="Great job! Almost perfect!", attempt_id=_id()
+    )
+    batch = AttemptBatchResponse(
+        accepted=rows,
+        rejected=0,
+        results=[
+            AttemptBatchResult(
+                index=i, type="find_object", success=True, score=92, is_correct=True,
+                feedback="Great job! You found it!",
+                correct_location={"x": 0.41, "y": 0.37, "width": 0.2, "height": 0.18},
+                attempt_id=_id()
+            )
+            for i in range(rows)
+        ]
+    )
+    progress = [
+        ProgressResponse(
+            id=_id(), player_id=player_id, object_id=_id(), last_rating=4.5,
+            practice_count=i % 12, consecutive_failed_attempts=i % 3, is_learned=i % 2 == 0,
+            ease_factor=2.36, interval_days=6, repetitions=2,
+            next_due_at=now + timedelta(days=6), learned_at=now if i % 2 == 0 else None,
+            created_at=now, updated_at=now
+        )
+        for i in range(rows)
+    ]
+    objects = [
+        ObjectListResponse(
+            id=_id(), name=f"Object {i}", category="Animals", image_count=3,
+            thumbnail_url=f"https://res.cloudinary.com/demo/image/upload/speakeasy/animals/thumbnail/object_{i}.jpg",
+            flashcard_url=f"https://res.cloudinary.com/demo/image/upload/speakeasy/animals/flashcard/object_{i}.jpg"
+        )
+        for i in range(rows)
+    ]
+
+    return {
+        "say-word": (TypeAdapter(SayWordResponse), say_word),
+        "attempt batch": (TypeAdapter(AttemptBatchResponse), batch),
+        "progress list": (TypeAdapter(List[ProgressResponse]), progress),
+        "object page": (TypeAdapter(List[ObjectListResponse]), objects),
+    }
+
+
+def _time(fn, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=repeat, repeat=3)) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON against MessagePack encoding")
+    parser.add_argument("--repeat", type=int, default=2000, help="Encodes per timing run")
+    parser.add_argument("--rows", type=int, default=100, help="Rows in list payloads")
+
+    args = parser.parse_args()
+
+    print(f"{'payload':<15} {'format':<10} {'encode us':>10} {'bytes':>8} {'gzip':>8}")
+    for name, (adapter, value) in payloads(args.rows).items():
+        json_body = adapter.dump_json(value)
+        msgpack_body = msgpack.packb(adapter.dump_python(value, mode="json"))
+        assert msgpack.unpackb(msgpack_body) == json.loads(json_body)
+
+        results = [
+            ("json", json_body, lambda: adapter.dump_json(value)),
+            ("msgpack", msgpack_body, lambda: msgpack.packb(adapter.dump_python(value, mode="json"))),
+            ("transcode", msgpack_body, lambda: msgpack.packb(json.loads(adapter.dump_json(value)))),
+        ]
+        for label, body, encode in results:
+            print(
+                f"{name:<15} {label:<10} {_time(encode, args.repeat):>10.1f} "
+                f"{len(body):>8} {len(gzip.compress(body, mtime=0)):>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Garbage-collect the content-addressed upload store (UPLOAD_DIR/blobs).
+
+Deleting images through the API already removes blobs nothing references
+any more. This command repairs everything else: it recounts each blob's
+references from object_images, removes unreferenced blobs, removes files
+under blobs/ that have no stored_blobs row (left behind by a crash between
+writing the file and committing the row) once they are older than the grace
+period, and reports blobs whose file is missing.
+
+With --adopt-legacy, local uploads stored before the blob store existed
+(/uploads/<uuid>.<ext>) are first hashed and moved into it, so identical
+files are kept once. Each image remembers its old URL, which the static file
+server redirects to the blob, so links clients already hold keep working.
+
+Usage (from the backend directory):
+    python -m scripts.gc_blobs [--adopt-legacy] [--grace-period 3600] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import time
+
+from sqlalchemy import func, select, update
+
+from app.database import engine, session_scope
+from app.migrations import run_migrations
+from app.models import ObjectImage, StoredBlob
+from app.services.blob_store import BLOBS_DIR, blob_store
+from app.upload_stream import SNIFF_SIZE, UPLOAD_CHUNK_SIZE, sniff_image
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_SIZE)
+        digest.update(head)
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest(), head
+
+
+async def adopt_legacy(db, dry_run):
+    images = (await db.scalars(
+        select(ObjectImage).where(
+            ObjectImage.blob_sha256.is_(None),
+            ObjectImage.image_url.startswith("/uploads/"),
+            ObjectImage.image_url.not_like(f"/uploads/{BLOBS_DIR}/%")
+        )
+    )).all()
+    images_by_url = {}
+    for image in images:
+        images_by_url.setdefault(image.image_url, []).append(image)
+
+    adopted = 0
+    for image_url, url_images in images_by_url.items():
+        path = blob_store.absolute_path(image_url[len("/uploads/"):])
+        if not os.path.isfile(path):
+            print(f"Skipping {image_url}: file not found")
+            continue
+        sha256, head = _hash_file(path)
+        sniffed = sniff_image(head)
+        if sniffed is None:
+            print(f"Skipping {image_url}: not a supported image")
+            continue
+        media_type, extension = sniffed
+        relative_path = blob_store.relative_path(sha256, extension)
+        if dry_run:
+            print(f"Would adopt {image_url} as {blob_store.url(relative_path)}")
+            adopted += 1
+            continue
+
+        await asyncio.to_thread(blob_store.put, path, sha256, extension)
+        await blob_store.register(db, sha256, relative_path, os.path.getsize(path), media_type)
+        for image in url_images:
+            image.legacy_url = image_url
+            image.image_url = blob_store.url(relative_path)
+            image.blob_sha256 = sha256
+        # Updated rows are not counted by the insert/delete listeners.
+        await db.execute(
+            update(StoredBlob)
+            .where(StoredBlob.sha256 == sha256)
+            .values(ref_count=StoredBlob.ref_count + len(url_images))
+        )
+        await db.commit()
+        # Only once every row using it has moved, so nothing is left dangling.
+        os.remove(path)
+        adopted += 1
+        print(f"Adopted {image_url} as {blob_store.url(relative_path)}")
+    return adopted
+
+
+async def recount(db, dry_run):
+    counts = dict((await db.execute(
+        select(ObjectImage.blob_sha256, func.count())
+        .where(ObjectImage.blob_sha256.is_not(None))
+        .group_by(ObjectImage.blob_sha256)
+    )).all())
+    blobs = (await db.execute(select(StoredBlob.sha256, StoredBlob.ref_count))).all()
+
+    fixed = 0
+    for sha256, ref_count in blobs:
+        actual = counts.pop(sha256, 0)
+        if ref_count == actual:
+            continue
+        print(f"{sha256}: ref_count {ref_count}, actually referenced {actual} time(s)")
+        fixed += 1
+        if not dry_run:
+            await db.execute(update(StoredBlob).where(StoredBlob.sha256 == sha256).values(ref_count=actual))
+    if not dry_run:
+        await db.commit()
+
+    for sha256 in counts:
+        print(f"{sha256}: referenced by object_images but has no stored_blobs row")
+    return fixed
+
+
+async def collect_unreferenced(db, dry_run):
+    unreferenced = (await db.scalars(select(StoredBlob.sha256).where(StoredBlob.ref_count <= 0))).all()
+    if dry_run:
+        for sha256 in unreferenced:
+            print(f"Would remove unreferenced blob {sha256}")
+        return len(unreferenced)
+    return await blob_store.collect(db, unreferenced)
+
+
+async def check_files(db, grace_period, dry_run):
+    known = set((await db.scalars(select(StoredBlob.path))).all())
+    for relative_path in sorted(known):
+        if not os.path.isfile(blob_store.absolute_path(relative_path)):
+            print(f"Missing file for blob {relative_path}")
+
+    removed = 0
+    root = os.path.join(blob_store.upload_dir, BLOBS_DIR)
+    cutoff = time.time() - grace_period
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            path = os.path.join(dir_path, file_name)
+            relative_path = os.path.relpath(path, blob_store.upload_dir).replace(os.sep, "/")
+            # Recent files may belong to an upload that has not committed yet.
+            if relative_path in known or os.path.getmtime(path) > cutoff:
+                continue
+            if dry_run:
+                print(f"Would remove orphaned file {relative_path}")
+            else:
+                os.remove(path)
+            removed += 1
+    return removed
+
+
+async def gc(adopt, grace_period, dry_run):
+    async with session_scope() as db:
+        adopted = await adopt_legacy(db, dry_run) if adopt else 0
+        fixed = await recount(db, dry_run)
+        collected = await collect_unreferenced(db, dry_run)
+        orphaned = await check_files(db, grace_period, dry_run)
+    return adopted, fixed, collected, orphaned
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Garbage-collect the content-addressed upload store")
+    parser.add_argument(
+        "--adopt-legacy",
+        action="store_true",
+        help="Move local uploads stored before the blob store into it first"
+    )
+    parser.add_argument(
+        "--grace-period",
+        type=int,
+        default=3600,
+        help="Seconds before a file without a stored_blobs row is removed (default: 3600)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report what would change without touching the database or files"
+    )
+
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    StoredBlob.__table__.create(bind=engine, checkfirst=True)
+
+    adopted, fixed, collected, orphaned = asyncio.run(gc(args.adopt_legacy, args.grace_period, args.dry_run))
+
+    summary = (
+        f"adopted {adopted} legacy file(s), fixed {fixed} reference count(s), "
+        f"removed {collected} unreferenced blob(s) and {orphaned} orphaned file(s)"
+    )
+    print(f"Would have {summary}" if args.dry_run else summary.capitalize())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Generate thumbnail and flashcard-sized derivatives for existing local uploads.
+
+New uploads get derivatives as part of the upload pipeline. Run this once to
+backfill images uploaded before that, or after changing DERIVATIVE_FORMAT or
+DERIVATIVE_QUALITY (with --force, which replaces existing derivatives).
+Running servers list the new images once their catalog cache expires
+(CATALOG_CACHE_TTL).
+
+Usage (from the backend directory):
+    python -m scripts.generate_derivatives [--object-id OBJECT_ID] [--force] [--dry-run]
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from app.database import engine, session_scope
+from app.loaders import IMAGE_WITH_BOXES
+from app.migrations import run_migrations
+from app.models import ObjectImage, StoredBlob
+from app.services.blob_store import blob_store
+from app.services.derivatives import DERIVATIVE_TYPES, derivative_service
+
+
+async def backfill(object_id, force, dry_run):
+    created = 0
+    async with session_scope() as db:
+        query = select(ObjectImage).where(
+            ObjectImage.source_image_id.is_(None),
+            ObjectImage.image_type.in_(list(DERIVATIVE_TYPES))
+        )
+        if object_id:
+            query = query.where(ObjectImage.object_id == object_id)
+        originals = (await db.scalars(query.order_by(ObjectImage.created_at))).all()
+
+        derived = (await db.scalars(
+            select(ObjectImage).options(*IMAGE_WITH_BOXES).where(ObjectImage.source_image_id.is_not(None))
+        )).all()
+        derivatives_by_source = {}
+        for image in derived:
+            derivatives_by_source.setdefault(image.source_image_id, []).append(image)
+
+        for image in originals:
+            if not derivative_service.wants(image):
+                continue
+            existing = derivatives_by_source.get(image.id, [])
+            if existing and not force:
+                continue
+            if dry_run:
+                print(f"Would generate derivatives for {image.id} ({image.image_url})")
+                continue
+
+            for derivative in existing:
+                await db.delete(derivative)
+            await db.commit()
+            derivatives = await derivative_service.create_for_image(db, image)
+            # Collected after regenerating, so unchanged renders keep their blob.
+            await blob_store.collect(db, [derivative.blob_sha256 for derivative in existing])
+            created += len(derivatives)
+            print(f"{image.id}: {', '.join(d.image_url for d in derivatives)}")
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate derivatives for existing local uploads")
+    parser.add_argument(
+        "--object-id",
+        help="Only process the images of this object"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate images that already have derivatives"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List the images that would be processed without generating anything"
+    )
+
+    args = parser.parse_args()
+
+    if not derivative_service.enabled:
+        parser.error("Derivatives are disabled or Pillow is not installed (poetry install -E images)")
+
+    run_migrations(engine)
+    StoredBlob.__table__.create(bind=engine, checkfirst=True)
+
+    try:
+        created = asyncio.run(backfill(args.object_id, args.force, args.dry_run))
+    finally:
+        derivative_service.close()
+
+    print(f"Created {created} derivative image(s)")
+
+
+if __name__ == "__main__":
+    main()
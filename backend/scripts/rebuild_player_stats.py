@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Rebuild the player_stats aggregate table from attempt_history.
+
+Run this once after deploying the player_stats table, and any time the
+aggregate is suspected to have drifted from the attempt history.
+
+Usage (from the backend directory):
+    python -m scripts.rebuild_player_stats [--player-id PLAYER_ID]
+"""
+
+import argparse
+import asyncio
+
+from app.database import engine, session_scope
+from app.models import PlayerStatistics
+from app.services.player_stats import PlayerStatsService
+
+
+async def rebuild(player_id):
+    async with session_scope() as db:
+        return await PlayerStatsService.rebuild(db, player_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild player_stats from attempt history")
+    parser.add_argument(
+        "--player-id",
+        help="Only rebuild the statistics of this player"
+    )
+    
+    args = parser.parse_args()
+    
+    PlayerStatistics.__table__.create(bind=engine, checkfirst=True)
+    
+    rebuilt = asyncio.run(rebuild(args.player_id))
+    
+    print(f"Rebuilt statistics for {rebuilt} player(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+import uuid
+
+import pytest
+
+# The app builds its engines and services from the environment at import
+# time, so point them at a scratch directory before anything imports app.
+TEST_DIR = tempfile.mkdtemp(prefix="speakeasy-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(TEST_DIR, "uploads")
+os.environ["UPLOAD_SPOOL_DIR"] = os.path.join(TEST_DIR, "spool")
+# Enforce foreign keys as Postgres does, so delete ordering bugs show up here.
+os.environ["SQLITE_FOREIGN_KEYS"] = "true"
+for name in (
+    "DATABASE_MODE", "CLOUDINARY_CREDENTIALS", "CLOUDINARY_CLOUD_NAME", "CLOUDINARY_API_KEY",
+    "CLOUDINARY_API_SECRET", "CLOUDINARY_FAKE"
+):
+    os.environ.pop(name, None)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def player(client):
+    response = client.post("/players/", json={"name": f"Player {uuid.uuid4().hex[:8]}"})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture
+def make_object(client):
+    def make(name=None, category="Animals"):
+        response = client.post(
+            "/objects/", json={"name": name or f"Object {uuid.uuid4().hex[:8]}", "category": category}
+        )
+        assert response.status_code == 200
+        return response.json()
+    return make
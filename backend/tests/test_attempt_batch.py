@@ -0,0 +1,78 @@
+import uuid
+
+
+def say_word(player, obj, **extra):
+    return {
+        "type": "say_word",
+        "player_id": player["id"],
+        "object_id": obj["id"],
+        "spoken_text": obj["name"],
+        **extra
+    }
+
+
+def submit(client, *attempts):
+    response = client.post("/game/attempts/batch", json={"attempts": list(attempts)})
+    assert response.status_code == 200
+    return response.json()
+
+
+def total_attempts(client, player):
+    return client.get(f"/players/{player['id']}/stats").json()["total_attempts"]
+
+
+def test_offset_timestamps_are_stored_as_naive_utc(client, player, make_object):
+    obj = make_object()
+
+    result = submit(client, say_word(player, obj, created_at="2025-01-01T10:00:00+02:00"))
+
+    assert result["accepted"] == 1
+    history = client.get(f"/players/{player['id']}/history").json()
+    assert [attempt["created_at"] for attempt in history] == ["2025-01-01T08:00:00"]
+
+
+def test_resent_batch_with_client_ids_is_not_counted_twice(client, player, make_object):
+    obj = make_object()
+    attempts = [
+        say_word(player, obj, client_attempt_id=str(uuid.uuid4())),
+        say_word(player, obj, client_attempt_id=str(uuid.uuid4())),
+    ]
+
+    first = submit(client, *attempts)
+    second = submit(client, *attempts)
+
+    assert (first["accepted"], first["duplicates"]) == (2, 0)
+    assert (second["accepted"], second["duplicates"], second["rejected"]) == (0, 2, 0)
+    assert [r["attempt_id"] for r in second["results"]] == [r["attempt_id"] for r in first["results"]]
+    assert all(r["duplicate"] and r["success"] for r in second["results"])
+    assert total_attempts(client, player) == 2
+
+
+def test_resent_batch_without_client_ids_is_deduplicated_by_timestamp(client, player, make_object):
+    obj = make_object()
+    attempt = say_word(player, obj, created_at="2025-03-04T05:06:07.123456Z")
+
+    submit(client, attempt)
+    resent = submit(client, attempt)
+
+    assert (resent["accepted"], resent["duplicates"]) == (0, 1)
+    assert total_attempts(client, player) == 1
+
+
+def test_repeated_client_id_within_a_batch_is_recorded_once(client, player, make_object):
+    obj = make_object()
+    attempt = say_word(player, obj, client_attempt_id="offline-1")
+
+    result = submit(client, attempt, attempt)
+
+    assert (result["accepted"], result["duplicates"]) == (1, 1)
+    assert result["results"][1]["attempt_id"] == result["results"][0]["attempt_id"]
+    assert total_attempts(client, player) == 1
+
+
+def test_attempts_without_timestamps_are_never_deduplicated(client, player, make_object):
+    obj = make_object()
+
+    result = submit(client, say_word(player, obj), say_word(player, obj))
+
+    assert (result["accepted"], result["duplicates"]) == (2, 0)
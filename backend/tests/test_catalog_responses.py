@@ -0,0 +1,73 @@
+import uuid
+
+from app.database import session_scope
+from app.models import Object
+from app.services.catalog import catalog_cache
+from app.testing import assert_max_queries
+
+
+def current_snapshot(client):
+    async def get():
+        async with session_scope() as db:
+            return await catalog_cache.get(db)
+    return client.portal.call(get)
+
+
+def test_not_modified_is_answered_before_the_body_is_built(client, make_object):
+    obj = make_object(category="Shapes")
+    for url in ("/objects/?category=Shapes", f"/objects/{obj['id']}", "/objects/categories"):
+        etag = client.get(url).headers["etag"]
+        snapshot = current_snapshot(client)
+        snapshot.responses._entries.clear()
+
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert (response.status_code, response.headers["etag"]) == (304, etag)
+        assert len(snapshot.responses) == 0
+
+
+def test_any_content_coding_of_the_etag_is_not_modified(client, make_object):
+    for _ in range(12):
+        make_object(category="Tools")
+    identity = client.get("/objects/?category=Tools", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/objects/?category=Tools", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == identity.headers["etag"][:-1] + '-gzip"'
+
+    response = client.get(
+        "/objects/?category=Tools",
+        headers={"Accept-Encoding": "identity", "If-None-Match": gzipped.headers["etag"]}
+    )
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == gzipped.headers["etag"]
+
+
+def test_objects_written_by_another_worker_are_found(client, player):
+    snapshot = current_snapshot(client)
+
+    # Committed without rebuilding this worker's snapshot, as another worker would.
+    async def create_elsewhere():
+        async with session_scope() as db:
+            obj = Object(name=f"Object {uuid.uuid4().hex[:8]}", category="Elsewhere")
+            db.add(obj)
+            await db.commit()
+            return obj.id
+    object_id = client.portal.call(create_elsewhere)
+    assert current_snapshot(client) is snapshot
+
+    assert client.get(f"/objects/{object_id}").status_code == 200
+    assert current_snapshot(client) is not snapshot
+    response = client.post("/game/say-word", json={
+        "player_id": player["id"], "object_id": object_id, "spoken_text": "hello"
+    })
+    assert response.status_code == 200
+
+
+def test_unknown_ids_do_not_reload_the_snapshot(client):
+    snapshot = current_snapshot(client)
+
+    with assert_max_queries(1):
+        assert client.get(f"/objects/{uuid.uuid4()}").status_code == 404
+    assert client.get(f"/objects/images/{uuid.uuid4()}").status_code == 404
+    assert current_snapshot(client) is snapshot
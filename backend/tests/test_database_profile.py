@@ -0,0 +1,58 @@
+from sqlalchemy import create_engine
+
+from app.database_profile import DatabaseProfile, pool_status
+
+
+def test_profile_is_read_from_the_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "12")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    monkeypatch.setenv("SQLITE_JOURNAL_MODE", "DELETE")
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT", "250")
+
+    profile = DatabaseProfile.from_env()
+
+    assert (profile.pool_size, profile.max_overflow, profile.pool_pre_ping) == (12, 10, False)
+    assert "PRAGMA journal_mode=DELETE" in profile.sqlite_pragmas()
+    assert "PRAGMA busy_timeout=250" in profile.sqlite_pragmas()
+    assert profile.engine_kwargs("postgresql://db/speakeasy")["pool_size"] == 12
+    # In-memory SQLite shares one connection, so there is no pool to size.
+    assert profile.engine_kwargs("sqlite://") == {}
+    assert profile.engine_kwargs("sqlite:///:memory:") == {}
+
+
+def test_pragmas_are_applied_to_every_connection(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLITE_MMAP_SIZE", "1048576")
+    monkeypatch.setenv("SQLITE_FOREIGN_KEYS", "true")
+    profile = DatabaseProfile.from_env()
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    engine = create_engine(url, **profile.engine_kwargs(url))
+    profile.apply(engine)
+
+    for _ in range(2):
+        with engine.connect() as conn:
+            pragmas = {
+                name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+                for name in ("journal_mode", "synchronous", "mmap_size", "cache_size", "busy_timeout", "foreign_keys")
+            }
+            assert pragmas == {
+                "journal_mode": "wal",
+                "synchronous": 1,  # NORMAL
+                "mmap_size": 1048576,
+                "cache_size": -64000,
+                "busy_timeout": 5000,
+                "foreign_keys": 1,
+            }
+
+    status = pool_status(engine)
+    assert status["class"] == "QueuePool"
+    assert (status["size"], status["checkedout"]) == (5, 0)
+    engine.dispose()
+
+
+def test_health_reports_the_profile_and_pools(client):
+    health = client.get("/health/database").json()
+
+    assert health["dialect"] == "sqlite"
+    assert health["profile"]["sqlite_journal_mode"] == "WAL"
+    assert {"sync", "async"} <= set(health["pools"])
+    assert all("status" in pool for pool in health["pools"].values())
@@ -0,0 +1,91 @@
+import io
+import time
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from app.services.derivatives import DerivativeService  # noqa: E402
+
+
+def png_bytes(size=(640, 480)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 120, 40)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def wait_for_job(client, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/objects/uploads/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Upload job {job_id} did not finish")
+
+
+def test_one_upload_counts_as_one_image(client, make_object):
+    obj = make_object(category="Fruit")
+
+    response = client.post(
+        f"/objects/{obj['id']}/images/upload?image_type=flashcard",
+        content=png_bytes(),
+        headers={"Content-Type": "image/png"}
+    )
+    job = wait_for_job(client, response.json()["job_id"])
+
+    assert job["status"] == "completed", job["error"]
+    assert sorted(d["image_type"] for d in job["derivatives"]) == ["flashcard", "thumbnail"]
+
+    listed = next(item for item in client.get("/objects/?category=Fruit").json() if item["id"] == obj["id"])
+    assert listed["image_count"] == 1
+    derivative_urls = {d["image_type"]: d["image_url"] for d in job["derivatives"]}
+    assert listed["thumbnail_url"] == derivative_urls["thumbnail"]
+    assert listed["flashcard_url"] == derivative_urls["flashcard"]
+
+    images = client.get(f"/objects/{obj['id']}").json()["images"]
+    assert [image["id"] for image in images] == [job["image"]["id"]]
+    assert {d["id"] for d in images[0]["derivatives"]} == {d["id"] for d in job["derivatives"]}
+    assert client.get(f"/objects/{obj['id']}/images").json() == images
+
+
+def upload_flashcard(client, obj):
+    response = client.post(
+        f"/objects/{obj['id']}/images/upload?image_type=flashcard",
+        content=png_bytes(),
+        headers={"Content-Type": "image/png"}
+    )
+    job = wait_for_job(client, response.json()["job_id"])
+    assert job["status"] == "completed", job["error"]
+    assert len(job["derivatives"]) == 2
+    return job
+
+
+# conftest turns on SQLite foreign keys, so deleting an original before its
+# derivatives fails here as it would on Postgres.
+def test_deleting_an_image_deletes_its_derivatives_first(client, make_object):
+    obj = make_object()
+    job = upload_flashcard(client, obj)
+
+    response = client.delete(f"/objects/images/{job['image']['id']}")
+
+    assert response.status_code == 200
+    for image in [job["image"], *job["derivatives"]]:
+        assert client.get(f"/objects/images/{image['id']}").status_code == 404
+
+
+def test_deleting_an_object_deletes_derivatives_first(client, make_object):
+    obj = make_object()
+    upload_flashcard(client, obj)
+    upload_flashcard(client, obj)
+
+    response = client.delete(f"/objects/{obj['id']}")
+
+    assert response.status_code == 200
+    assert client.get(f"/objects/{obj['id']}").status_code == 404
+
+
+def test_unknown_derivative_format_is_rejected_up_front():
+    assert DerivativeService(image_format="jpeg").image_format == "JPEG"
+    with pytest.raises(ValueError, match="DERIVATIVE_FORMAT must be 'webp' or 'jpeg', got 'png'"):
+        DerivativeService(image_format="png")
@@ -0,0 +1,88 @@
+from app.services.score_cache import score_cache
+
+
+def stream(client, player, obj):
+    return client.websocket_connect(f"/game/say-word/stream?player_id={player['id']}&object_id={obj['id']}")
+
+
+def history(client, player):
+    return client.get(f"/players/{player['id']}/history").json()
+
+
+def test_binary_frame_records_last_partial_and_closes_1003(client, player, make_object):
+    obj = make_object()
+
+    with stream(client, player, obj) as websocket:
+        websocket.send_json({"type": "partial", "text": obj["name"]})
+        correct = websocket.receive_json()
+        websocket.send_json({"type": "partial", "text": "Obj"})
+        partial = websocket.receive_json()
+        websocket.send_bytes(b"\x00\x01")
+        result = websocket.receive_json()
+        closed = websocket.receive()
+
+    assert correct["type"] == "correct"
+    assert partial["type"] == "partial"
+    assert (result["type"], result["spoken_text"]) == ("result", "Obj")
+    assert (result["score"], result["is_correct"]) == (partial["score"], partial["is_correct"])
+    assert closed == {"type": "websocket.close", "code": 1003, "reason": "Messages must be JSON text frames"}
+    assert [attempt["id"] for attempt in history(client, player)] == [result["attempt_id"]]
+
+
+def test_final_transcript_is_recorded_over_a_better_partial(client, player, make_object):
+    obj = make_object()
+
+    with stream(client, player, obj) as websocket:
+        websocket.send_json({"type": "partial", "text": obj["name"]})
+        correct = websocket.receive_json()
+        websocket.send_json({"type": "final", "text": "Obj"})
+        final = websocket.receive_json()
+        result = websocket.receive_json()
+
+    assert correct["type"] == "correct"
+    assert final["type"] == "partial"
+    assert (result["spoken_text"], result["score"], result["is_correct"]) == ("Obj", final["score"], False)
+    attempts = history(client, player)
+    assert [(attempt["spoken_text"], attempt["is_correct"]) for attempt in attempts] == [("Obj", False)]
+
+
+def test_invalid_json_gets_an_error_and_the_stream_continues(client, player, make_object):
+    obj = make_object()
+
+    with stream(client, player, obj) as websocket:
+        websocket.send_text("not json")
+        error = websocket.receive_json()
+        websocket.send_json({"type": "final", "text": obj["name"]})
+        correct = websocket.receive_json()
+        result = websocket.receive_json()
+
+    assert error == {"type": "error", "detail": "Messages must be JSON"}
+    assert correct["type"] == "correct"
+    assert (result["score"], result["is_correct"]) == (100, True)
+
+
+def test_partials_are_not_cached(client, player, make_object):
+    obj = make_object()
+    before = len(score_cache)
+
+    with stream(client, player, obj) as websocket:
+        for text in ("o", "ob", "obj"):
+            websocket.send_json({"type": "partial", "text": text})
+            websocket.receive_json()
+        assert len(score_cache) == before
+        websocket.send_json({"type": "final", "text": "obje"})
+        websocket.receive_json()
+        websocket.receive_json()
+
+    assert len(score_cache) == before + 1
+
+
+def test_client_hanging_up_still_records_the_last_transcript(client, player, make_object):
+    obj = make_object()
+
+    with stream(client, player, obj) as websocket:
+        websocket.send_json({"type": "partial", "text": "Obj"})
+        partial = websocket.receive_json()
+
+    attempts = history(client, player)
+    assert [(attempt["spoken_text"], attempt["score"]) for attempt in attempts] == [("Obj", partial["score"])]
@@ -0,0 +1,45 @@
+import os
+import uuid
+
+from app.database import session_scope
+from app.services.blob_store import blob_store
+from app.testing import assert_max_queries
+from scripts.gc_blobs import adopt_legacy
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+def test_adopted_legacy_url_redirects_to_its_blob(client, make_object):
+    obj = make_object()
+    legacy_url = f"/uploads/{uuid.uuid4()}.png"
+    path = blob_store.absolute_path(legacy_url[len("/uploads/"):])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(PNG)
+    client.post(f"/objects/{obj['id']}/images", json={"image_url": legacy_url})
+    assert client.get(legacy_url).content == PNG
+
+    async def adopt():
+        async with session_scope() as db:
+            return await adopt_legacy(db, dry_run=False)
+    assert client.portal.call(adopt) >= 1
+
+    assert not os.path.exists(path)
+    redirect = client.get(legacy_url, follow_redirects=False)
+    blob_url = redirect.headers["location"]
+    assert redirect.status_code == 301
+    assert blob_url.startswith("/uploads/blobs/")
+    assert client.get(legacy_url).content == PNG
+
+    variant = client.get(f"{legacy_url}?variant=thumbnail", follow_redirects=False)
+    assert variant.headers["location"] == f"{blob_url}?variant=thumbnail"
+    assert client.get(f"/uploads/{uuid.uuid4()}.png").status_code == 404
+
+
+def test_only_legacy_shaped_paths_are_looked_up(client):
+    for path in ("missing.png", f"nested/{uuid.uuid4()}.png", f"{uuid.uuid4().hex}.png", "fake-cloudinary/x.jpg"):
+        with assert_max_queries(0):
+            assert client.get(f"/uploads/{path}").status_code == 404
+
+    with assert_max_queries(1):
+        assert client.get(f"/uploads/{uuid.uuid4()}.jpeg").status_code == 404
@@ -0,0 +1,34 @@
+import threading
+
+from sqlalchemy import create_engine, select
+
+from app.database import database_profile
+from app.migrations import MIGRATIONS, run_migrations, schema_version
+
+
+def test_concurrent_workers_apply_each_migration_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    database_profile.apply(engine)
+    workers = 4
+    barrier = threading.Barrier(workers)
+    results, errors = [], []
+
+    def start_worker():
+        barrier.wait()
+        try:
+            results.append(run_migrations(engine))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=start_worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(len(pending) for pending in results) == [0] * (workers - 1) + [len(MIGRATIONS)]
+    with engine.connect() as conn:
+        versions = conn.execute(select(schema_version.c.version)).scalars().all()
+    assert sorted(versions) == sorted(migration.version for migration in MIGRATIONS)
+    engine.dispose()
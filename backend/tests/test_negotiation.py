@@ -0,0 +1,103 @@
+import json
+
+import msgpack
+import pytest
+
+from app.database import session_scope
+from app.services.catalog import catalog_cache
+
+MSGPACK = {"Accept": "application/msgpack"}
+
+
+def vary(response):
+    return {value.strip().lower() for value in response.headers.get("vary", "").split(",")}
+
+
+def test_every_negotiated_response_varies_on_accept(client, player, make_object):
+    obj = make_object()
+    json_list = client.get("/objects/")
+    progress = client.get(f"/progress/{player['id']}")
+    responses = [
+        json_list,
+        client.get("/objects/", headers={"If-None-Match": json_list.headers["etag"]}),
+        client.get(f"/objects/{obj['id']}", headers=MSGPACK),
+        progress,
+        client.get(f"/progress/{player['id']}", headers={"If-None-Match": progress.headers["etag"]}),
+        client.post("/progress/record", json={"player_id": player["id"], "object_id": obj["id"], "rating": 5}),
+        client.get("/objects/missing"),
+    ]
+
+    assert [response.status_code for response in responses] == [200, 304, 200, 200, 304, 200, 404]
+    assert all("accept" in vary(response) for response in responses)
+    assert "accept-encoding" in vary(responses[0])
+
+
+def test_catalog_msgpack_bodies_are_cached_next_to_json(client, make_object, monkeypatch):
+    for _ in range(12):
+        make_object(category="Vehicles")
+    url = "/objects/?category=Vehicles"
+    as_json = client.get(url, headers={"Accept-Encoding": "identity"})
+
+    packed = []
+    real_packb = msgpack.packb
+    monkeypatch.setattr(msgpack, "packb", lambda value: packed.append(value) or real_packb(value))
+    first = client.get(url, headers={**MSGPACK, "Accept-Encoding": "gzip"})
+    second = client.get(url, headers={**MSGPACK, "Accept-Encoding": "identity"})
+
+    assert len(packed) == 1
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["etag"] == as_json.headers["etag"][:-1] + '-msgpack-gzip"'
+    assert second.headers["etag"] == as_json.headers["etag"][:-1] + '-msgpack"'
+    assert msgpack.unpackb(first.content) == msgpack.unpackb(second.content) == json.loads(as_json.content)
+    assert first.headers["content-type"] == second.headers["content-type"] == "application/msgpack"
+
+    async def snapshot():
+        async with session_scope() as db:
+            return await catalog_cache.get(db)
+    keys = list(client.portal.call(snapshot).responses._entries)
+    assert (("list", "Vehicles", 0, 100, None), "application/msgpack") in keys
+
+    not_modified = client.get(
+        url, headers={**MSGPACK, "Accept-Encoding": "identity", "If-None-Match": second.headers["etag"]}
+    )
+    assert (not_modified.status_code, not_modified.headers["etag"]) == (304, second.headers["etag"])
+
+
+def revalidate(client, url, etag, **headers):
+    return client.get(url, headers={**MSGPACK, "If-None-Match": etag, **headers})
+
+
+@pytest.mark.parametrize("path, accept_encoding", [
+    ("/objects/categories", "gzip"),
+    ("/objects/?category=Vehicles", "gzip"),
+    ("/objects/?category=Vehicles", "identity"),
+    ("/progress/{player_id}", "gzip"),
+    ("/progress/{player_id}/summary", "gzip"),
+])
+def test_msgpack_200_and_304_agree_on_the_etag(client, player, make_object, path, accept_encoding):
+    for _ in range(12):
+        make_object(category="Vehicles")
+    url = path.format(player_id=player["id"])
+
+    response = client.get(url, headers={**MSGPACK, "Accept-Encoding": accept_encoding})
+    compressed = response.headers.get("content-encoding") == "gzip"
+    not_modified = revalidate(client, url, response.headers["etag"], **{"Accept-Encoding": accept_encoding})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert response.headers["etag"].endswith('-msgpack-gzip"' if compressed else '-msgpack"')
+    assert (not_modified.status_code, not_modified.headers["etag"]) == (304, response.headers["etag"])
+
+
+@pytest.mark.parametrize("path", ["/objects/", "/objects/categories", "/progress/{player_id}"])
+def test_json_etags_do_not_revalidate_msgpack(client, player, make_object, path):
+    make_object()
+    url = path.format(player_id=player["id"])
+    etag = client.get(url, headers={"Accept-Encoding": "identity"}).headers["etag"]
+    gzip_etag = client.get(url, headers={"Accept-Encoding": "gzip"}).headers["etag"]
+
+    for json_etag in {etag, gzip_etag}:
+        response = revalidate(client, url, json_etag)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/msgpack"
+        assert response.headers["etag"] in (etag[:-1] + '-msgpack"', etag[:-1] + '-msgpack-gzip"')
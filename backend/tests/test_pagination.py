@@ -0,0 +1,68 @@
+import uuid
+
+import pytest
+
+from app.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+
+
+def list_urls(player):
+    return ["/players/", f"/players/{player['id']}/history", "/objects/"]
+
+
+@pytest.mark.parametrize("params", [
+    {"limit": 0},
+    {"limit": -1},
+    {"limit": MAX_PAGE_SIZE + 1},
+    {"skip": -1},
+])
+def test_out_of_range_page_parameters_are_rejected(client, player, params):
+    for url in list_urls(player):
+        assert client.get(url, params=params).status_code == 422, url
+
+
+@pytest.mark.parametrize("limit", [1, MAX_PAGE_SIZE])
+def test_page_size_bounds_are_accepted(client, player, limit):
+    for url in list_urls(player):
+        response = client.get(url, params={"limit": limit})
+        assert response.status_code == 200, url
+        assert len(response.json()) <= limit
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm90IGpzb24", "WyJhIl0", "WzEsMl0"])
+def test_invalid_cursor_is_rejected(client, player, cursor):
+    for url in list_urls(player):
+        assert client.get(url, params={"cursor": cursor}).status_code == 400, url
+
+
+def test_object_pages_follow_the_cursor(client, make_object):
+    category = f"Paging {uuid.uuid4().hex[:8]}"
+    created = {make_object(category=category)["id"] for _ in range(3)}
+
+    seen, cursor = [], None
+    for _ in range(len(created)):
+        params = {"category": category, "limit": 1, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/objects/", params=params)
+        page = response.json()
+        assert len(page) == 1
+        seen += [obj["id"] for obj in page]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+
+    assert cursor is None
+    assert set(seen) == created
+
+
+def test_history_pages_follow_the_cursor(client, player, make_object):
+    obj = make_object()
+    attempts = [
+        {"type": "say_word", "player_id": player["id"], "object_id": obj["id"], "spoken_text": obj["name"]}
+        for _ in range(3)
+    ]
+    client.post("/game/attempts/batch", json={"attempts": attempts})
+
+    first = client.get(f"/players/{player['id']}/history", params={"limit": 2})
+    assert len(first.json()) == 2
+    second = client.get(
+        f"/players/{player['id']}/history", params={"limit": 2, "cursor": first.headers[NEXT_CURSOR_HEADER]}
+    )
+    assert len(second.json()) == 1
+    assert NEXT_CURSOR_HEADER not in second.headers
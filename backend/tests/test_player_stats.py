@@ -0,0 +1,78 @@
+from sqlalchemy import update
+
+from app.database import session_scope
+from app.models import PlayerStatistics
+from app.services.player_stats import PlayerStatsService
+from app.testing import assert_max_queries
+
+
+def play(client, player, make_object):
+    obj = make_object()
+    image = client.post(f"/objects/{obj['id']}/images", json={
+        "image_url": "https://example.com/scene.jpg", "image_type": "find_object",
+        "bounding_boxes": [{"x": 0.4, "y": 0.4, "width": 0.2, "height": 0.2}]
+    }).json()
+
+    say_word = [
+        client.post("/game/say-word", json={
+            "player_id": player["id"], "object_id": obj["id"], "spoken_text": text
+        }).json()
+        for text in (obj["name"], "zzz")
+    ]
+    find_object = [
+        client.post("/game/find-object", json={
+            "player_id": player["id"], "object_image_id": image["id"], "tap_x": x, "tap_y": y
+        }).json()
+        for x, y in ((0.5, 0.5), (0.95, 0.95))
+    ]
+    batch = client.post("/game/attempts/batch", json={"attempts": [
+        {"type": "say_word", "player_id": player["id"], "object_id": obj["id"], "spoken_text": obj["name"]},
+        {"type": "find_object", "player_id": player["id"], "object_image_id": image["id"],
+         "tap_x": 0.5, "tap_y": 0.5},
+    ]}).json()["results"]
+    return say_word + find_object + batch
+
+
+def stats(client, player):
+    with assert_max_queries(1):
+        return client.get(f"/players/{player['id']}/stats").json()
+
+
+def test_stats_follow_every_attempt(client, player, make_object):
+    attempts = play(client, player, make_object)
+    scores = [attempt["score"] for attempt in attempts]
+
+    assert stats(client, player) == {
+        "player_id": player["id"],
+        "player_name": player["name"],
+        "total_attempts": 6,
+        "correct_attempts": 4,
+        "accuracy_percentage": round(4 / 6 * 100, 2),
+        "say_word_attempts": 3,
+        "say_word_correct": 2,
+        "find_object_attempts": 3,
+        "find_object_correct": 2,
+        "average_score": round(sum(scores) / 6, 2),
+    }
+
+
+def test_rebuild_restores_drifted_stats(client, player, make_object):
+    play(client, player, make_object)
+    expected = stats(client, player)
+
+    async def drift_and_rebuild():
+        async with session_scope() as db:
+            await db.execute(
+                update(PlayerStatistics)
+                .where(PlayerStatistics.player_id == player["id"])
+                .values(say_word_attempts=0, find_object_correct=99)
+            )
+            await db.commit()
+            return await PlayerStatsService.rebuild(db, player["id"])
+
+    assert client.portal.call(drift_and_rebuild) == 1
+    assert stats(client, player) == expected
+
+
+def test_player_without_attempts_has_empty_stats(client, player):
+    assert stats(client, player)["total_attempts"] == 0
@@ -0,0 +1,32 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+
+CONCURRENT_RECORDS = 20
+LEARNED_MESSAGE = "Congratulations! You learned this word!"
+
+
+# Runs on the TestClient's event loop, so the requests share the app's engine
+# and really interleave instead of queueing one by one behind the portal.
+async def record_concurrently(payload, count):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(*(client.post("/progress/record", json=payload) for _ in range(count)))
+
+
+def test_concurrent_records_count_every_practice_and_learn_once(client, player, make_object):
+    obj = make_object()
+    payload = {"player_id": player["id"], "object_id": obj["id"], "rating": 5}
+
+    responses = client.portal.call(record_concurrently, payload, CONCURRENT_RECORDS)
+
+    assert [response.status_code for response in responses] == [200] * CONCURRENT_RECORDS
+    bodies = [response.json() for response in responses]
+    assert sorted(body["practice_count"] for body in bodies) == list(range(1, CONCURRENT_RECORDS + 1))
+    assert [body["message"] for body in bodies].count(LEARNED_MESSAGE) == 1
+
+    progress = client.get(f"/progress/{player['id']}").json()
+    assert [(p["object_id"], p["practice_count"]) for p in progress] == [(obj["id"], CONCURRENT_RECORDS)]
+    assert client.get(f"/progress/{player['id']}/summary").json()["total_learned"] == 1
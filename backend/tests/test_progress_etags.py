@@ -0,0 +1,56 @@
+import pytest
+
+from app.testing import assert_max_queries
+
+PATHS = ["/progress/{player_id}", "/progress/{player_id}/summary"]
+
+
+def get(client, path, player, etag=None):
+    headers = {"Accept-Encoding": "identity"}
+    if etag:
+        headers["If-None-Match"] = etag
+    return client.get(path.format(player_id=player["id"]), headers=headers)
+
+
+def record(client, player, obj, rating=5):
+    client.post("/progress/record", json={"player_id": player["id"], "object_id": obj["id"], "rating": rating})
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_unchanged_progress_is_304_after_one_query(client, player, make_object, path):
+    record(client, player, make_object())
+    etag = get(client, path, player).headers["etag"]
+
+    with assert_max_queries(1):
+        response = get(client, path, player, etag)
+
+    assert (response.status_code, response.headers["etag"], response.content) == (304, etag, b"")
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_every_record_changes_the_etag(client, player, make_object, path):
+    obj = make_object()
+    record(client, player, obj)
+    etag = get(client, path, player).headers["etag"]
+
+    # Even a record that changes nothing the summary shows bumps the version.
+    record(client, player, obj, rating=1)
+    response = get(client, path, player, etag)
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert get(client, path, player, response.headers["etag"]).status_code == 304
+
+
+def test_etags_are_per_player_and_per_url(client, make_object, player):
+    other = client.post("/players/", json={"name": "Other"}).json()
+    obj = make_object()
+    record(client, player, obj)
+    record(client, other, obj)
+
+    etags = {
+        get(client, path, someone).headers["etag"] for path in PATHS for someone in (player, other)
+    }
+    assert len(etags) == 4
+    assert get(client, PATHS[0], other, get(client, PATHS[0], player).headers["etag"]).status_code == 200
+    assert "etag" not in get(client, PATHS[0], {"id": "no-such-player"}).headers
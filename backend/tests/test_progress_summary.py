@@ -0,0 +1,47 @@
+from app.testing import assert_max_queries
+
+
+def record(client, player, obj, rating):
+    response = client.post("/progress/record", json={
+        "player_id": player["id"], "object_id": obj["id"], "rating": rating
+    })
+    assert response.status_code == 200
+
+
+def summary(client, player, query=""):
+    with assert_max_queries(1):
+        return client.get(f"/progress/{player['id']}/summary{query}").json()
+
+
+def test_learned_counter_counts_each_word_once(client, player, make_object):
+    first, second = make_object(), make_object()
+    for rating in (2, 5, 5, 1, 4):
+        record(client, player, first, rating)
+    record(client, player, second, 3)
+
+    result = summary(client, player)
+    assert result == {"player_id": player["id"], "total_learned": 1, "total_stars": 1, "progress_by_object": None}
+
+    record(client, player, second, 4)
+    record(client, player, second, 5)
+    assert summary(client, player)["total_learned"] == 2
+
+
+def test_progress_by_object_is_opt_in(client, player, make_object):
+    obj = make_object()
+    record(client, player, obj, 5)
+
+    response = client.get(f"/progress/{player['id']}/summary?expand=progress_by_object").json()
+
+    assert response["total_learned"] == 1
+    assert list(response["progress_by_object"]) == [obj["id"]]
+    assert response["progress_by_object"][obj["id"]]["practice_count"] == 1
+
+
+def test_reset_clears_the_counter(client, player, make_object):
+    record(client, player, make_object(), 5)
+
+    client.delete(f"/progress/{player['id']}")
+
+    assert summary(client, player)["total_learned"] == 0
+    assert summary(client, {"id": "no-such-player"})["total_learned"] == 0
@@ -0,0 +1,34 @@
+import pytest
+
+from app.services.pronunciation import PronunciationEngine
+from app.services.score_cache import ScoreCache
+from app.services.scoring import ScoringService
+
+WORDS = ["Bear", "Rabbit", "Cat", "Teddy Bear"]
+
+# Right, close, sound-alike and wrong answers.
+ATTEMPTS = [
+    ("Bear", "bear"), ("Bear", "bare"), ("Bear", "bread"), ("Rabbit", "rabit"),
+    ("Rabbit", "rabid"), ("Teddy Bear", "ted bare"), ("Cat", "dog"), ("Cat", "123"),
+]
+
+
+@pytest.fixture
+def engine():
+    return PronunciationEngine(WORDS, cache=ScoreCache())
+
+
+@pytest.mark.parametrize("target, spoken", ATTEMPTS)
+def test_every_engine_path_matches_score_pronunciation(engine, target, spoken):
+    expected = ScoringService.score_pronunciation(target, spoken)
+
+    results = [
+        engine.score(target, spoken),
+        engine.score(target, spoken),  # from the cache
+        engine.score_pairs([(target, spoken)])[0],
+        engine.score_hypotheses(target, [spoken, "zzz"])[1],
+    ]
+    matrix = engine.score_matrix([spoken], [target])
+    results.append((int(matrix.scores[0, 0]), bool(matrix.is_correct[0, 0]), matrix.feedback(0, 0)))
+
+    assert results == [expected] * len(results)
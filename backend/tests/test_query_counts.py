@@ -0,0 +1,68 @@
+import pytest
+
+from app.services.catalog import catalog_cache
+from app.testing import assert_max_queries
+
+OBJECT_COUNT = 5
+
+
+# Enough related rows that a per-row lazy load would blow every budget below.
+@pytest.fixture
+def populated(client, player, make_object):
+    objects = []
+    for _ in range(OBJECT_COUNT):
+        obj = make_object()
+        for image_type in ("flashcard", "find_object"):
+            response = client.post(f"/objects/{obj['id']}/images", json={
+                "image_url": f"https://example.com/{obj['id']}-{image_type}.jpg",
+                "image_type": image_type,
+                "bounding_boxes": [{"x": 0.1, "y": 0.1, "width": 0.2, "height": 0.2}] * 2,
+            })
+            assert response.status_code == 200
+        client.post("/progress/record", json={"player_id": player["id"], "object_id": obj["id"], "rating": 4})
+        objects.append(obj)
+
+    attempts = [
+        {"type": "say_word", "player_id": player["id"], "object_id": obj["id"], "spoken_text": obj["name"]}
+        for obj in objects
+    ]
+    client.post("/game/attempts/batch", json={"attempts": attempts})
+    return player, objects
+
+
+# A cold catalog loads objects, images and bounding boxes with one query each.
+def test_object_list_loads_the_catalog_in_three_queries(client, populated):
+    catalog_cache.invalidate()
+    with assert_max_queries(3):
+        assert client.get("/objects/").status_code == 200
+
+
+def test_object_detail_loads_the_catalog_in_three_queries(client, populated):
+    _, objects = populated
+    catalog_cache.invalidate()
+    with assert_max_queries(3):
+        response = client.get(f"/objects/{objects[0]['id']}")
+    assert response.status_code == 200
+    assert all(image["bounding_boxes"] for image in response.json()["images"])
+
+
+def test_warm_catalog_reads_run_no_queries(client, populated):
+    _, objects = populated
+    client.get("/objects/")
+    with assert_max_queries(0):
+        client.get("/objects/")
+        client.get(f"/objects/{objects[0]['id']}")
+
+
+def test_player_history_is_two_queries(client, populated):
+    player, objects = populated
+    with assert_max_queries(2):
+        response = client.get(f"/players/{player['id']}/history")
+    assert len(response.json()) == len(objects)
+
+
+def test_player_progress_is_two_queries(client, populated):
+    player, objects = populated
+    with assert_max_queries(2):
+        response = client.get(f"/progress/{player['id']}")
+    assert len(response.json()) == len(objects)
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import session_scope
+from app.services.progress import ProgressService
+
+START = datetime(2026, 1, 5, 9, 0)
+
+
+def record(client, player, obj, rating, now):
+    async def run():
+        async with session_scope() as db:
+            await ProgressService.touch_player(db, player["id"])
+            await ProgressService.record(db, player["id"], obj["id"], rating, now=now)
+            await db.commit()
+    client.portal.call(run)
+    return client.get(f"/progress/{player['id']}/{obj['id']}").json()
+
+
+def test_sm2_intervals_grow_with_ease_and_reset_on_a_miss(client, player, make_object):
+    obj = make_object()
+    now = START
+    schedule = []
+    for rating in (5, 5, 5, 2, 4):
+        progress = record(client, player, obj, rating, now)
+        schedule.append((progress["interval_days"], progress["repetitions"], round(progress["ease_factor"], 2)))
+        assert datetime.fromisoformat(progress["next_due_at"]) == now + timedelta(days=progress["interval_days"])
+        now = datetime.fromisoformat(progress["next_due_at"])
+
+    assert schedule == [
+        (1, 1, 2.6),
+        (6, 2, 2.7),
+        (16, 3, 2.8),  # round(6 * 2.7)
+        (1, 0, 2.48),
+        (1, 1, 2.48),
+    ]
+
+
+def test_ease_never_drops_below_the_floor(client, player, make_object):
+    obj = make_object()
+    for day in range(10):
+        progress = record(client, player, obj, 0, START + timedelta(days=day))
+
+    assert progress["ease_factor"] == pytest.approx(1.3)
+    assert (progress["interval_days"], progress["repetitions"]) == (1, 0)
+
+
+def test_due_queue_is_ordered_by_due_date(client, player, make_object):
+    objects = [make_object() for _ in range(4)]
+    # Due 3, 1 and 2 days ago, and one due tomorrow.
+    for obj, days_ago in zip(objects, (4, 2, 3, 0)):
+        record(client, player, obj, 2, datetime.utcnow() - timedelta(days=days_ago))
+
+    due = client.get(f"/progress/{player['id']}/due").json()
+    assert [p["object_id"] for p in due] == [objects[0]["id"], objects[2]["id"], objects[1]["id"]]
+
+    limited = client.get(f"/progress/{player['id']}/due?limit=2").json()
+    assert [p["object_id"] for p in limited] == [objects[0]["id"], objects[2]["id"]]
+
+    upcoming = client.get(f"/progress/{player['id']}/due?include_upcoming=true").json()
+    assert upcoming[-1]["object_id"] == objects[3]["id"]
+
+    challenge = client.get(f"/game/challenge/{player['id']}").json()
+    assert challenge["object_id"] == objects[0]["id"]
@@ -0,0 +1,84 @@
+import random
+import uuid
+
+import pytest
+
+from app.database import session_scope
+from app.services.catalog import catalog_cache
+from app.services.sampling import SamplingIndex
+
+
+# The exact chance of each item, read off the alias table.
+def probabilities(index):
+    n = len(index)
+    chances = [0.0] * n
+    for i in range(n):
+        keep = 1.0 if index._probability is None else index._probability[i]
+        chances[i] += keep / n
+        if keep < 1.0:
+            chances[index._alias[i]] += (1.0 - keep) / n
+    return chances
+
+
+@pytest.mark.parametrize("weights", [[1, 1, 1], [1, 2, 3, 4], [0.5, 0, 7, 0.25, 0.25], [5]])
+def test_alias_table_matches_the_weights(weights):
+    index = SamplingIndex(range(len(weights)), weights)
+
+    assert probabilities(index) == pytest.approx([w / sum(weights) for w in weights])
+
+
+def test_samples_follow_the_weights():
+    index = SamplingIndex("abc", [1, 3, 0])
+    rng = random.Random(7)
+
+    picks = [index.sample(rng) for _ in range(20000)]
+
+    assert picks.count("c") == 0
+    assert picks.count("b") / len(picks) == pytest.approx(0.75, abs=0.02)
+
+
+def test_bad_indexes_are_rejected():
+    with pytest.raises(IndexError):
+        SamplingIndex([]).sample()
+    with pytest.raises(ValueError):
+        SamplingIndex("ab", [1])
+    with pytest.raises(ValueError):
+        SamplingIndex("ab", [0, 0])
+
+
+def test_balanced_sampling_makes_every_category_equally_likely(client, make_object):
+    small, large = f"Small {uuid.uuid4().hex[:6]}", f"Large {uuid.uuid4().hex[:6]}"
+    make_object(category=small)
+    for _ in range(4):
+        make_object(category=large)
+
+    async def snapshot():
+        async with session_scope() as db:
+            return await catalog_cache.get(db)
+    index = client.portal.call(snapshot).balanced_playable_objects
+    by_category = {}
+    for obj, chance in zip(index.items, probabilities(index)):
+        by_category[obj.category] = by_category.get(obj.category, 0.0) + chance
+
+    assert by_category[small] == pytest.approx(by_category[large])
+    assert by_category[small] == pytest.approx(1 / len(by_category))
+
+
+def test_only_images_with_boxes_are_playable(client, make_object):
+    category = f"Scenes {uuid.uuid4().hex[:6]}"
+    obj = make_object(category=category)
+    client.post(f"/objects/{obj['id']}/images", json={
+        "image_url": "https://example.com/empty.jpg", "image_type": "find_object"
+    })
+    boxed = client.post(f"/objects/{obj['id']}/images", json={
+        "image_url": "https://example.com/boxed.jpg", "image_type": "find_object",
+        "bounding_boxes": [{"x": 0.1, "y": 0.1, "width": 0.2, "height": 0.2}]
+    }).json()
+
+    picks = {
+        client.get(f"/game/random-image-with-boxes?category={category}").json()["id"] for _ in range(20)
+    }
+
+    assert picks == {boxed["id"]}
+    assert client.get("/game/random-image-with-boxes?category=Nowhere").status_code == 404
+    assert client.get(f"/game/random-object?category={category}").json()["id"] == obj["id"]
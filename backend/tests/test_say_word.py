@@ -0,0 +1,48 @@
+from app.services.scoring import ScoringService
+
+
+def say_word(client, player, obj, **body):
+    return client.post("/game/say-word", json={"player_id": player["id"], "object_id": obj["id"], **body})
+
+
+def test_best_hypothesis_wins_and_is_recorded(client, player, make_object):
+    obj = make_object()
+
+    response = say_word(client, player, obj, hypotheses=[
+        {"text": "zzz", "confidence": 0.9},
+        {"text": obj["name"], "confidence": 0.4},
+        {"text": obj["name"][:-1], "confidence": 0.8},
+    ]).json()
+
+    assert (response["hypothesis_index"], response["spoken_text"]) == (1, obj["name"])
+    assert (response["score"], response["is_correct"]) == (100, True)
+    history = client.get(f"/players/{player['id']}/history").json()
+    assert [(attempt["id"], attempt["spoken_text"]) for attempt in history] == [(response["attempt_id"], obj["name"])]
+
+
+def test_ties_go_to_confidence_then_rank(client, player, make_object):
+    obj = make_object(name="Cat Toy")
+    tied = [{"text": "bat toy"}, {"text": "hat toy"}]
+
+    assert say_word(client, player, obj, hypotheses=tied).json()["hypothesis_index"] == 0
+    tied[1]["confidence"] = 0.3
+    assert say_word(client, player, obj, hypotheses=tied).json()["hypothesis_index"] == 1
+
+
+def test_one_transcript_scores_like_score_pronunciation(client, player, make_object):
+    obj = make_object()
+    expected = ScoringService.score_pronunciation(obj["name"], "Obj")
+
+    for body in ({"spoken_text": "Obj"}, {"hypotheses": [{"text": "Obj", "confidence": 0.5}]}):
+        response = say_word(client, player, obj, **body).json()
+        assert response["hypothesis_index"] == 0
+        assert (response["score"], response["is_correct"], response["feedback"]) == expected
+
+
+def test_hypotheses_are_validated(client, player, make_object):
+    obj = make_object()
+
+    assert say_word(client, player, obj).status_code == 422
+    assert say_word(client, player, obj, hypotheses=[]).status_code == 422
+    assert say_word(client, player, obj, hypotheses=[{"text": "a"}] * 11).status_code == 422
+    assert say_word(client, player, obj, hypotheses=[{"text": "a", "confidence": 1.5}]).status_code == 422
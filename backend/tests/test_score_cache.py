@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+from app.services.pronunciation import PronunciationEngine
+from app.services.score_cache import ScoreCache, score_cache
+from app.services.scoring import ScoringService
+
+RESULT = (80, True, "Great job!")
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    return clock
+
+
+def test_hits_misses_and_lru_eviction():
+    cache = ScoreCache(max_entries=2)
+    cache.put("Cat", "ca", RESULT)
+    cache.put("Dog", "da", RESULT)
+    assert cache.get("Cat", "ca") == RESULT  # now the most recently used
+    cache.put("Ball", "bal", RESULT)
+
+    assert cache.get("Dog", "da") is None
+    assert cache.get("Cat", "ca") == RESULT
+    assert cache.get("Ball", "bal") == RESULT
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 1, 1)
+    assert stats["hit_rate"] == 0.75
+
+
+def test_entries_expire(clock):
+    cache = ScoreCache(ttl_seconds=60)
+    cache.put("Cat", "ca", RESULT)
+
+    clock.now += 59
+    assert cache.get("Cat", "ca") == RESULT
+    clock.now += 2
+    assert cache.get("Cat", "ca") is None
+    assert (len(cache), cache.expirations) == (0, 1)
+
+
+def test_changing_the_thresholds_empties_the_cache(monkeypatch):
+    cache = ScoreCache()
+    cache.put("Cat", "ca", RESULT)
+
+    monkeypatch.setattr(ScoringService, "CORRECT_THRESHOLD", ScoringService.CORRECT_THRESHOLD + 5)
+
+    assert cache.get("Cat", "ca") is None
+    assert cache.invalidations == 1
+
+
+def test_removed_targets_are_dropped():
+    cache = ScoreCache()
+    cache.put("Cat", "ca", RESULT)
+    cache.put("Dog", "da", RESULT)
+
+    cache.invalidate_targets(["Cat"])
+
+    assert cache.get("Cat", "ca") is None
+    assert cache.get("Dog", "da") == RESULT
+
+
+def test_a_zero_size_cache_stores_nothing():
+    cache = ScoreCache(max_entries=0)
+    cache.put("Cat", "ca", RESULT)
+
+    assert cache.get("Cat", "ca") is None
+    assert (len(cache), cache.misses) == (0, 0)
+
+
+def test_engine_reuses_results_for_the_same_normalized_text():
+    cache = ScoreCache()
+    engine = PronunciationEngine(["Cat"], cache=cache)
+
+    first = engine.score("Cat", "ca")
+    assert engine.score("Cat", "  CA ") == first
+    assert engine.score("Cat", "cab", use_cache=False) == ScoringService.score_pronunciation("Cat", "cab")
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+
+
+def test_deleting_an_object_drops_its_cached_scores(client, make_object):
+    obj = make_object()
+    score_cache.put(obj["name"], "xyz", RESULT)
+    assert any(key[0] == obj["name"] for key in score_cache._entries)
+
+    client.delete(f"/objects/{obj['id']}")
+
+    assert not any(key[0] == obj["name"] for key in score_cache._entries)
+    assert client.get("/health/scoring-cache").json()["invalidations"] >= 1
@@ -0,0 +1,108 @@
+import io
+import os
+import time
+
+import pytest
+
+from app.static_files import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL
+
+UPLOAD_DIR = os.environ["UPLOAD_DIR"]
+PNG = b"\x89PNG\r\n\x1a\n" + os.urandom(64)
+
+
+def wait_for_job(client, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/objects/uploads/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Upload job {job_id} did not finish")
+
+
+def upload(client, obj, content, image_type="find_object"):
+    response = client.post(
+        f"/objects/{obj['id']}/images/upload?image_type={image_type}",
+        content=content,
+        headers={"Content-Type": "image/png"}
+    )
+    job = wait_for_job(client, response.json()["job_id"])
+    assert job["status"] == "completed", job["error"]
+    return job
+
+
+def write(relative_path, content=b"hello"):
+    path = os.path.join(UPLOAD_DIR, *relative_path.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+def test_blobs_are_immutable_with_their_sha256_as_etag(client, make_object):
+    url = upload(client, make_object(), PNG)["image"]["image_url"]
+    assert url.startswith("/uploads/blobs/")
+
+    response = client.get(url)
+    etag = response.headers["etag"]
+
+    assert response.content == PNG
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert etag == f'"{url.rsplit("/", 1)[1].split(".")[0]}"'
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_other_files_revalidate(client):
+    write("plain/notes.txt")
+
+    response = client.get("/uploads/plain/notes.txt")
+
+    assert response.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+    assert client.get("/uploads/plain/notes.txt", headers={
+        "If-Modified-Since": response.headers["last-modified"]
+    }).status_code == 304
+
+
+def test_failed_preconditions_are_412(client, make_object):
+    url = upload(client, make_object(), PNG)["image"]["image_url"]
+    etag = client.get(url).headers["etag"]
+
+    assert client.get(url, headers={"If-Match": '"other"'}).status_code == 412
+    assert client.get(url, headers={"If-Match": f"W/{etag}"}).status_code == 412
+    assert client.get(url, headers={"If-Match": f'"other", {etag}'}).status_code == 200
+    assert client.get(url, headers={"If-Match": "*"}).status_code == 200
+    stale = client.get(url, headers={"If-Unmodified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"})
+    assert (stale.status_code, stale.headers["etag"]) == (412, etag)
+
+
+def test_variant_serves_the_derivative_or_the_original(client, make_object):
+    image_module = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    image_module.new("RGB", (800, 600), (10, 20, 30)).save(buffer, "PNG")
+    job = upload(client, make_object(), buffer.getvalue(), image_type="flashcard")
+    url = job["image"]["image_url"]
+    thumbnail = next(d["image_url"] for d in job["derivatives"] if d["image_type"] == "thumbnail")
+
+    response = client.get(f"{url}?variant=thumbnail")
+
+    assert response.content == client.get(thumbnail).content
+    assert response.headers["content-location"] == thumbnail
+    assert response.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+    original = upload(client, make_object(), PNG)["image"]["image_url"]
+    assert client.get(f"{original}?variant=thumbnail").content == PNG
+
+
+@pytest.mark.parametrize("path", [
+    ".hidden",
+    "plain/.env",
+    "blobs/ab/unfinished.tmp",
+    "blobs/not-a-blob.png",
+    "%2e%2e/speakeasy-escape.txt",
+    "plain/..%2F..%2Fspeakeasy-escape.txt",
+])
+def test_hidden_unfinished_and_outside_files_are_404(client, path):
+    for name in (".hidden", "plain/.env", "blobs/ab/unfinished.tmp", "blobs/not-a-blob.png"):
+        write(name)
+    with open(os.path.join(os.path.dirname(UPLOAD_DIR), "speakeasy-escape.txt"), "wb") as f:
+        f.write(b"secret")
+
+    assert client.get(f"/uploads/{path}").status_code == 404
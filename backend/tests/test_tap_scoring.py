@@ -0,0 +1,84 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.services.scoring import TAP_TOLERANCE, BoxIndex, ScoringService
+
+EPSILON = 1e-9
+
+BOX_SETS = {
+    "single": [(0.2, 0.2, 0.3, 0.3)],
+    "clamped_at_origin": [(0.0, 0.0, 0.1, 0.1)],
+    "clamped_at_far_edge": [(0.9, 0.9, 0.1, 0.1)],
+    "zero_size": [(0.5, 0.5, 0.0, 0.0)],
+    "overlapping": [(0.2, 0.2, 0.4, 0.4), (0.3, 0.3, 0.4, 0.4), (0.25, 0.25, 0.1, 0.1)],
+    "identical": [(0.4, 0.4, 0.2, 0.2), (0.4, 0.4, 0.2, 0.2)],
+    "whole_image": [(0.0, 0.0, 1.0, 1.0)],
+    "empty": [],
+    "crowded": [
+        (rng.uniform(0, 0.9), rng.uniform(0, 0.9), rng.uniform(0, 0.1), rng.uniform(0, 0.1))
+        for rng in [random.Random(7)] for _ in range(12)
+    ],
+}
+
+
+# Taps on and just either side of each box's edges, tolerance borders and
+# centre, plus a coarse grid over the whole image.
+def probe_taps(boxes):
+    grid = np.linspace(0, 1, 11).tolist()
+    taps = {(tap_x, tap_y) for tap_x in grid for tap_y in grid}
+    for x, y, width, height in boxes:
+        xs = _around(x, x + width, x - TAP_TOLERANCE, x + width + TAP_TOLERANCE, x + width / 2)
+        ys = _around(y, y + height, y - TAP_TOLERANCE, y + height + TAP_TOLERANCE, y + height / 2)
+        taps.update((tap_x, tap_y) for tap_x in xs for tap_y in ys)
+    return sorted(taps)
+
+
+def _around(*values):
+    around = {value + offset for value in values for offset in (-EPSILON, 0.0, EPSILON)}
+    return [value for value in around if 0 <= value <= 1]
+
+
+# The original per-tap loop: best score wins, ties go to the earliest box.
+def scalar_hit_test(boxes, tap_x, tap_y):
+    best_score, position = 0, -1
+    for index, box in enumerate(boxes):
+        is_inside, score = ScoringService.check_tap_location(tap_x, tap_y, *box)
+        if is_inside and (position < 0 or score > best_score):
+            best_score, position = score, index
+    return position >= 0, best_score, position
+
+
+@pytest.mark.parametrize("name", BOX_SETS)
+def test_check_tap_locations_matches_check_tap_location(name):
+    boxes = BOX_SETS[name]
+    taps = probe_taps(boxes)
+
+    hits, scores = ScoringService.check_tap_locations([x for x, _ in taps], [y for _, y in taps], boxes)
+
+    assert hits.shape == scores.shape == (len(taps), len(boxes))
+    for row, (tap_x, tap_y) in enumerate(taps):
+        for column, box in enumerate(boxes):
+            expected = ScoringService.check_tap_location(tap_x, tap_y, *box)
+            assert (bool(hits[row, column]), int(scores[row, column])) == expected, (tap_x, tap_y, box)
+
+
+@pytest.mark.parametrize("name", BOX_SETS)
+def test_box_index_matches_check_tap_location(name):
+    boxes = BOX_SETS[name]
+    taps = probe_taps(boxes)
+
+    hits, scores, positions = BoxIndex(boxes).hit_test([x for x, _ in taps], [y for _, y in taps])
+
+    for row, (tap_x, tap_y) in enumerate(taps):
+        actual = (bool(hits[row]), int(scores[row]), int(positions[row]))
+        assert actual == scalar_hit_test(boxes, tap_x, tap_y), (tap_x, tap_y)
+
+
+def test_empty_image_misses_every_tap():
+    hits, scores, positions = BoxIndex([]).hit_test([0.0, 0.5, 1.0], [0.0, 0.5, 1.0])
+
+    assert not hits.any()
+    assert scores.tolist() == [0, 0, 0]
+    assert positions.tolist() == [-1, -1, -1]
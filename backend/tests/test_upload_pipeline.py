@@ -0,0 +1,118 @@
+import time
+
+import pytest
+
+from app.database import session_scope
+from app.services.derivatives import DerivativeService
+from app.services.upload_pipeline import UploadPipeline, UploadQueueFull, upload_pipeline
+from app.upload_stream import SpooledUpload
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+def upload(client, obj, image_type="find_object"):
+    return client.post(
+        f"/objects/{obj['id']}/images/upload?image_type={image_type}",
+        content=PNG,
+        headers={"Content-Type": "image/png"}
+    )
+
+
+def wait_for_job(client, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/objects/uploads/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Upload job {job_id} did not finish")
+
+
+def test_any_worker_can_answer_a_poll(client, make_object):
+    obj = make_object()
+    job = wait_for_job(client, upload(client, obj).json()["job_id"])
+    assert job["status"] == "completed", job["error"]
+
+    # A pipeline that never saw the job stands in for another worker process.
+    async def poll_elsewhere():
+        async with session_scope() as db:
+            return await UploadPipeline().get(db, job["job_id"])
+
+    elsewhere = client.portal.call(poll_elsewhere)
+    assert elsewhere.model_dump(mode="json") == job
+    assert client.get("/objects/uploads/not-a-job").status_code == 404
+    assert client.get("/health/uploads").json()["jobs"]["completed"] >= 1
+
+
+class FlakyStorage:
+    is_configured = True
+
+    def __init__(self, failures):
+        self.failures = failures
+
+    def upload_image(self, file_data, folder, public_id):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("storage unavailable")
+        return {"url": f"https://example.com/{folder}/{public_id}.png"}
+
+
+class RecordingPipeline(UploadPipeline):
+    def __init__(self, **kwargs):
+        super().__init__(derivatives=DerivativeService(enabled=False), retry_delay=0, **kwargs)
+        self.statuses = []
+
+    async def _set_status(self, job, status, error=None):
+        self.statuses.append(status.value)
+        await super()._set_status(job, status, error)
+
+
+def run_job(client, obj, tmp_path, pipeline):
+    path = tmp_path / "upload.png"
+    path.write_bytes(PNG)
+    upload = SpooledUpload(str(path), len(PNG), "0" * 64, "image/png", ".png")
+
+    async def run():
+        job = await pipeline.submit(obj["id"], "find_object", upload, folder="tests", public_id=obj["id"])
+        await pipeline.close()
+        return job.job_id
+
+    job = client.get(f"/objects/uploads/{client.portal.call(run)}").json()
+    assert not path.exists()
+    return job
+
+
+def test_failed_attempts_are_retried(client, make_object, tmp_path):
+    obj = make_object()
+    pipeline = RecordingPipeline(storage=FlakyStorage(failures=1), max_attempts=3)
+
+    job = run_job(client, obj, tmp_path, pipeline)
+
+    assert pipeline.statuses == ["uploading", "retrying", "uploading", "completed"]
+    assert (job["status"], job["attempts"], job["error"]) == ("completed", 2, None)
+    assert job["image"]["image_url"] == f"https://example.com/tests/{obj['id']}.png"
+    assert client.get(f"/objects/{obj['id']}").json()["images"] == [job["image"]]
+
+
+def test_a_job_fails_after_its_last_attempt(client, make_object, tmp_path):
+    obj = make_object()
+    pipeline = RecordingPipeline(storage=FlakyStorage(failures=5), max_attempts=2)
+
+    job = run_job(client, obj, tmp_path, pipeline)
+
+    assert pipeline.statuses == ["uploading", "retrying", "uploading", "failed"]
+    assert (job["status"], job["attempts"], job["image"]) == ("failed", 2, None)
+    assert job["error"] == "Upload failed after 2 attempt(s): storage unavailable"
+    assert client.get(f"/objects/{obj['id']}").json()["images"] == []
+
+
+def test_a_full_queue_answers_503(client, make_object, monkeypatch):
+    obj = make_object()
+    monkeypatch.setattr(upload_pipeline, "max_pending", 0)
+
+    response = upload(client, obj)
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+    with pytest.raises(UploadQueueFull):
+        client.portal.call(upload_pipeline.submit, obj["id"], "find_object", None, "tests", "full")
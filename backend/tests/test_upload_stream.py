@@ -0,0 +1,110 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.upload_stream import multipart_file_chunks, spool_upload
+
+BOUNDARY = "speakeasy-test-boundary"
+PNG_HEAD = b"\x89PNG\r\n\x1a\n" + b"\x00" * 8
+PIECE = 1024
+
+
+def multipart(*parts):
+    body = b""
+    for name, filename, data in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+        body += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + data + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+# A chunked request with no Content-Length, delivered PIECE bytes at a time.
+class StreamedRequest:
+    def __init__(self, body):
+        self.pieces = [body[i:i + PIECE] for i in range(0, len(body), PIECE)]
+        self.received = 0
+
+    async def receive(self):
+        self.received += 1
+        piece = self.pieces[self.received - 1]
+        return {"type": "http.request", "body": piece, "more_body": self.received < len(self.pieces)}
+
+    def request(self):
+        headers = [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]
+        return Request({"type": "http", "method": "POST", "headers": headers}, self.receive)
+
+
+def spool(streamed, spool_dir, max_bytes):
+    return asyncio.run(spool_upload(
+        multipart_file_chunks(streamed.request(), max_bytes=max_bytes), str(spool_dir), max_bytes=max_bytes
+    ))
+
+
+def test_multipart_file_is_spooled_without_other_fields(tmp_path):
+    data = PNG_HEAD + os.urandom(5000)
+    streamed = StreamedRequest(multipart(("note", None, b"x" * 3000), ("file", "a.png", data)))
+
+    upload = spool(streamed, tmp_path, max_bytes=8192)
+
+    assert (upload.size, upload.media_type) == (len(data), "image/png")
+    with open(upload.path, "rb") as f:
+        assert f.read() == data
+
+
+def test_oversized_file_is_rejected_while_streaming(tmp_path):
+    streamed = StreamedRequest(multipart(("file", "a.png", PNG_HEAD + b"\x00" * 100 * PIECE)))
+
+    with pytest.raises(HTTPException) as error:
+        spool(streamed, tmp_path, max_bytes=4 * PIECE)
+
+    assert error.value.status_code == 413
+    assert streamed.received <= 6 < len(streamed.pieces)
+    assert os.listdir(tmp_path) == []
+
+
+def test_oversized_body_without_a_file_is_rejected_while_streaming(tmp_path):
+    streamed = StreamedRequest(multipart(("note", None, b"x" * 100 * PIECE), ("file", "a.png", PNG_HEAD)))
+
+    with pytest.raises(HTTPException) as error:
+        spool(streamed, tmp_path, max_bytes=PIECE)
+
+    assert error.value.status_code == 413
+    assert streamed.received < len(streamed.pieces)
+
+
+def test_non_image_is_rejected_on_its_first_bytes(tmp_path):
+    streamed = StreamedRequest(multipart(("file", "a.png", b"not an image" + b"\x00" * 100 * PIECE)))
+
+    with pytest.raises(HTTPException) as error:
+        spool(streamed, tmp_path, max_bytes=1000 * PIECE)
+
+    assert error.value.status_code == 415
+    assert streamed.received <= 2
+
+
+@pytest.mark.parametrize("body, detail", [
+    (multipart(("note", None, b"hello")), "Missing file field"),
+    (multipart(("file", None, PNG_HEAD)), "Missing file field"),
+    (b"--other\r\ngarbage", "Invalid multipart body"),
+])
+def test_bad_multipart_bodies_are_rejected(tmp_path, body, detail):
+    with pytest.raises(HTTPException) as error:
+        spool(StreamedRequest(body), tmp_path, max_bytes=8192)
+
+    assert (error.value.status_code, error.value.detail) == (400, detail)
+
+
+def test_upload_endpoint_accepts_multipart_and_raw_bodies(client, make_object):
+    obj = make_object()
+    url = f"/objects/{obj['id']}/images/upload"
+
+    multipart_response = client.post(url, files={"file": ("a.png", PNG_HEAD, "image/png")})
+    raw_response = client.post(url, content=PNG_HEAD + b"\x01", headers={"Content-Type": "image/png"})
+    missing = client.post(url, files={"other": ("a.png", PNG_HEAD, "image/png")})
+    not_image = client.post(url, files={"file": ("a.png", b"GIF-ish but not quite", "image/png")})
+
+    assert (multipart_response.status_code, raw_response.status_code) == (202, 202)
+    assert (missing.status_code, missing.json()["detail"]) == (400, "Missing file field")
+    assert not_image.status_code == 415